@@ -1,29 +1,31 @@
+import asyncio
 import json
-from typing import Dict, Any, Optional
-from app.services.cerebras import cerebras_service
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+from app.services.resilience import llm_session
 from app.agent.stages import SalesStage
 from app.agent.intelligence import EXIT_CONDITIONS
+from app.agent.intent_classifier import intent_classifier
+from app.agent.json_stream import IncrementalJSONParser
+from app.agent.response_cache import CacheKey, previous_reply, prompt_hash, response_cache
+from app.agent.schemas import AnalysisResult, BatchAnalysisResult, EARLY_ANALYSIS_FIELDS
+from app.config import settings
+from app.container import services
+from app.logging import logger
+from app.utils.metrics import metrics
 
-ANALYSIS_PROMPT = """You are a Conversation Analyzer for a formal sales process.
-Your job is to analyze the latest User message and the history to provide structured feedback.
-
-Stages:
+STAGES_GUIDE = """Stages:
 - GREETING: Initial hello.
 - QUALIFICATION: Determining role, company, and fit.
 - PROBLEM: Identifying pain points and business challenges.
 - SOLUTION: Presenting product value.
 - OBJECTION: Handling pricing or trust issues.
-- CLOSING: Next steps / meeting booking.
+- CLOSING: Next steps / meeting booking."""
 
-Output strictly valid JSON:
-{{
+# The analysis object, escaped for str.format like the templates it goes into
+ANALYSIS_FIELDS = """{{
   "intent": "string (one of: greeting, providing_info, sharing_pain, interest, affirmation, objection, clarification, pricing_query, curiosity, evasion, other)",
-  "intent_definitions": {{
-    "interest": "User explicitly likes the solution or wants to move forward (e.g., 'sounds good', 'I like that').",
-    "curiosity": "User asks a 'how it works' or product feature question without clear acceptance yet.",
-    "affirmation": "Simple 'yes', 'okay', 'correct'.",
-    "clarification": "User asks about the sales process or repeats a question for understanding."
-  }},
+  "is_vague": "boolean",
+  "recommended_action": "stay or advance",
   "extracted_info": {{
     "role": "string or null",
     "company": "string or null",
@@ -32,43 +34,370 @@ Output strictly valid JSON:
     "concerns_addressed": "boolean or null",
     "meeting_intent": "boolean or null",
     "meeting_locked": "boolean or null"
-  }},
-  "is_vague": "boolean",
-  "recommended_action": "stay or advance"
-}}
+  }}
+}}"""
+
+INTENT_GUIDE = """Intent definitions:
+- interest: User explicitly likes the solution or wants to move forward (e.g., 'sounds good', 'I like that').
+- curiosity: User asks a 'how it works' or product feature question without clear acceptance yet.
+- affirmation: Simple 'yes', 'okay', 'correct'.
+- clarification: User asks about the sales process or repeats a question for understanding."""
 
-Current Stage: {current_stage}
+TURN_TEMPLATE = """Current Stage: {current_stage}
 History:
 {history}
 
 Latest User Message: {user_text}
 """
 
+ANALYSIS_PROMPT = (
+    "You are a Conversation Analyzer for a formal sales process.\n"
+    "Your job is to analyze the latest User message and the history to provide structured feedback.\n\n"
+    + STAGES_GUIDE
+    + "\n\nOutput strictly valid JSON, with the keys in this order:\n"
+    + ANALYSIS_FIELDS
+    + "\n\n" + INTENT_GUIDE + "\n\n"
+    + TURN_TEMPLATE
+)
+
+# Several sessions' turns in one request (ANALYZER_BATCH)
+BATCH_ANALYSIS_PROMPT = (
+    "You are a Conversation Analyzer for a formal sales process.\n"
+    "Below are several independent conversations, each with its own id, stage and history. "
+    "Analyze the latest User message of each one on its own; never carry information from one conversation to another.\n\n"
+    + STAGES_GUIDE
+    + '\n\nOutput strictly valid JSON of the form {{"results": [...]}}, with one object per conversation, in the order given. '
+    'Each object has "id" (the conversation\'s id) followed by these keys, in this order:\n'
+    + ANALYSIS_FIELDS
+    + "\n\n" + INTENT_GUIDE + "\n\n"
+    + "{conversations}"
+)
+BATCH_CONVERSATION = "### Conversation {id}\n" + TURN_TEMPLATE
+
+# Returned when the analyzer output can't be used
+DEFAULT_ANALYSIS: Dict[str, Any] = {
+    "intent": "other",
+    "extracted_info": {},
+    "is_vague": True,
+    "recommended_action": "stay"
+}
+
 class ConversationAnalyzer:
+    def __init__(self):
+        # Strong references to fire-and-forget shadow comparisons
+        self._background: set = set()
+        # Cached analyses are only reused under the same prompt and model (which may differ per stage)
+        self.prompt_hash = {
+            stage: prompt_hash(ANALYSIS_PROMPT, services.model_router.route("analyzer", stage.value).model)
+            for stage in SalesStage
+        }
+        self.batcher: Optional[AnalyzerBatcher] = None
+        if settings.ANALYZER_BATCH:
+            self.batcher = AnalyzerBatcher(settings.ANALYZER_BATCH_WINDOW_MS / 1000, settings.ANALYZER_BATCH_MAX_SIZE)
+
     async def analyze(self, user_text: str, history: list, current_stage: SalesStage) -> Dict[str, Any]:
+        pending = self.begin(user_text, history, current_stage)
+        try:
+            return await pending.result()
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+
+    def begin(self, user_text: str, history: list, current_stage: SalesStage) -> "AnalysisStream":
+        """
+        Starts analyzing a turn. `early()` on the returned stream resolves with
+        intent / is_vague / recommended_action as soon as they are known
+        (before extracted_info completes when ANALYZER_STREAMING is on),
+        `result()` with the full validated analysis.
+        """
+        if settings.INTENT_PRECLASSIFIER:
+            local, confidence = intent_classifier.classify(user_text, current_stage)
+            metrics.incr("intent_preclassifier_total")
+            if local is not None and confidence >= settings.INTENT_PRECLASSIFIER_THRESHOLD:
+                metrics.incr("intent_preclassifier_hits", intent=local["intent"])
+                if settings.INTENT_PRECLASSIFIER_SHADOW:
+                    task = asyncio.create_task(self._shadow_compare(local, user_text, history, current_stage))
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                return AnalysisStream(lambda stream: _resolved(local))
+        return self._begin_llm(user_text, history, current_stage)
+
+    def _begin_llm(self, user_text: str, history: list, current_stage: SalesStage, use_cache: bool = True) -> "AnalysisStream":
+        key = None
+        if use_cache:
+            prompt = self.prompt_hash[current_stage]
+            key = response_cache.key("analyzer", current_stage, prompt, user_text, previous_reply(history))
+        cached = response_cache.get(key)
+        if cached is not None:
+            return AnalysisStream(lambda stream: _resolved(dict(cached, extracted_info=dict(cached["extracted_info"]))))
+        messages = self._messages(user_text, history, current_stage)
+        labels = {"purpose": "analyzer", "stage": current_stage.value}
+        if settings.ANALYZER_STREAMING:
+            return AnalysisStream(lambda stream: self._streamed_attempts(stream, messages, labels, key))
+        if self.batcher is not None:
+            return AnalysisStream(
+                lambda stream: self._batched_attempts(user_text, history, current_stage, messages, labels, key)
+            )
+        return AnalysisStream(lambda stream: self._buffered_attempts(messages, labels, key))
+
+    async def _shadow_compare(self, local: Dict[str, Any], user_text: str, history: list, current_stage: SalesStage):
+        """Runs the LLM analyzer off the critical path to measure agreement with a local hit."""
+        try:
+            remote = await self._begin_llm(user_text, list(history), current_stage, use_cache=False).result()
+        except Exception as e:
+            logger.error(f"[Analyzer] Shadow comparison failed: {e}")
+            return
+        agreed = remote.get("intent") == local["intent"]
+        metrics.incr("intent_preclassifier_agree" if agreed else "intent_preclassifier_disagree", intent=local["intent"])
+        if not agreed:
+            logger.info("[Analyzer] Pre-classifier disagreement: local={} llm={} text='{:.50}'", local["intent"], remote.get("intent"), user_text)
+
+    def _messages(self, user_text: str, history: list, current_stage: SalesStage) -> List[Dict[str, str]]:
         prompt = ANALYSIS_PROMPT.format(
             current_stage=current_stage.value,
             history=history[-5:], # Last 5 for context
             user_text=user_text
         )
-        
-        messages = [{"role": "system", "content": prompt}]
-        response_text = await cerebras_service.chat_completion(messages, temperature=0.1)
-        
-        try:
-            # Simple cleanup in case LLM adds markdown wrappers
-            data = response_text.strip()
-            if data.startswith("```json"):
-                data = data[7:-3]
-            elif data.startswith("```"):
-                data = data[3:-3]
-            return json.loads(data)
-        except Exception:
+        return [{"role": "system", "content": prompt}]
+
+    async def _batched_attempts(
+        self, user_text: str, history: list, current_stage: SalesStage,
+        messages: List[Dict[str, str]], labels: Dict[str, str], key: Optional[CacheKey],
+    ) -> Dict[str, Any]:
+        # Counted per turn; the batch's own upstream call is analyzer_batch_requests
+        metrics.incr("analyzer_requests", mode="batched")
+        analysis = await self.batcher.analyze(user_text, history, current_stage)
+        if analysis is None:
+            # Alone in its window, or the batch answer for it was unusable
+            return await self._buffered_attempts(messages, labels, key)
+        return self._remember(key, analysis)
+
+    async def _buffered_attempts(
+        self, messages: List[Dict[str, str]], labels: Dict[str, str], key: Optional[CacheKey] = None
+    ) -> Dict[str, Any]:
+        for attempt in range(settings.ANALYZER_MAX_RETRIES + 1):
+            metrics.incr("analyzer_requests", mode="buffered")
+            response_text = await services.cerebras.chat_completion(
+                messages, temperature=0.1, response_format=self._response_format(), labels=labels
+            )
+            try:
+                return self._remember(key, self._validate(_extract_json(response_text)))
+            except ValueError as e:
+                self._record_failure(e, attempt)
+        return dict(DEFAULT_ANALYSIS, extracted_info={})
+
+    async def _streamed_attempts(
+        self, stream: "AnalysisStream", messages: List[Dict[str, str]], labels: Dict[str, str], key: Optional[CacheKey] = None
+    ) -> Dict[str, Any]:
+        for attempt in range(settings.ANALYZER_MAX_RETRIES + 1):
+            metrics.incr("analyzer_requests", mode="streamed")
+            parser = IncrementalJSONParser()
+            deltas = services.cerebras.stream_chat_completion(
+                messages, temperature=0.1, response_format=self._response_format(), labels=labels
+            )
+            try:
+                async for delta in deltas:
+                    for field, _ in parser.feed(delta):
+                        if field in EARLY_ANALYSIS_FIELDS:
+                            stream.publish_early(parser.fields)
+            finally:
+                await deltas.aclose()
+
+            try:
+                return self._remember(key, self._validate(parser.fields if parser.done else parser.parse_buffer()))
+            except ValueError as e:
+                self._record_failure(e, attempt)
+        return dict(DEFAULT_ANALYSIS, extracted_info={})
+
+    @staticmethod
+    def _response_format(schema=AnalysisResult, name: str = "conversation_analysis") -> Optional[Dict[str, Any]]:
+        mode = settings.ANALYZER_RESPONSE_FORMAT
+        if mode == "json_object":
+            return {"type": "json_object"}
+        if mode == "json_schema":
             return {
-                "intent": "other",
-                "extracted_info": {},
-                "is_vague": True,
-                "recommended_action": "stay"
+                "type": "json_schema",
+                "json_schema": {"name": name, "schema": schema.model_json_schema()},
             }
+        return None
+
+    @staticmethod
+    def _validate(data: Any) -> Dict[str, Any]:
+        """Validates parsed output against the typed schema. Raises ValueError when invalid."""
+        return AnalysisResult.model_validate(data).model_dump()
+
+    @staticmethod
+    def _remember(key: Optional[CacheKey], analysis: Dict[str, Any]) -> Dict[str, Any]:
+        # Only analyses that extracted nothing carry over to another caller's turn
+        if key is not None and all(v is None for v in analysis["extracted_info"].values()):
+            response_cache.put(key, dict(analysis, extracted_info=dict(analysis["extracted_info"]), source="cache"))
+        return analysis
+
+    @staticmethod
+    def _record_failure(error: Exception, attempt: int):
+        metrics.incr("analyzer_parse_failures", attempt=attempt)
+        logger.warning(f"[Analyzer] Invalid output (attempt {attempt + 1}/{settings.ANALYZER_MAX_RETRIES + 1}): {str(error)[:200]}")
+
+
+class AnalyzerBatcher:
+    """
+    Micro-batches analyzer calls across sessions. Requests arriving within
+    `window` seconds of the first one (up to `max_size`) go out as a single
+    BATCH_ANALYSIS_PROMPT completion, and the answer is split back out per
+    conversation. A request that ends up alone, or whose entry in the answer
+    is missing or invalid, resolves to None so its caller makes its own call.
+    """
+
+    def __init__(self, window: float, max_size: int):
+        self.window = window
+        self.max_size = max_size
+        self._queue: List[Tuple[asyncio.Future, str, list, SalesStage]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+
+    async def analyze(self, user_text: str, history: list, current_stage: SalesStage) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((future, user_text, history[-5:], current_stage))
+        if len(self._queue) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Requests whose turn was cancelled (barge-in) while waiting are dropped
+        batch = [request for request in self._queue if not request[0].done()]
+        self._queue = []
+        if not batch:
+            return
+        metrics.observe("analyzer_batch_size", len(batch))
+        if len(batch) == 1:
+            batch[0][0].set_result(None)
+            return
+        task = asyncio.create_task(self._send(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: List[Tuple[asyncio.Future, str, list, SalesStage]]):
+        # Serves several sessions, so it isn't queued under whichever one flushed it
+        llm_session.set(None)
+        conversations = "\n".join(
+            BATCH_CONVERSATION.format(id=i, current_stage=stage.value, history=history, user_text=text)
+            for i, (_, text, history, stage) in enumerate(batch, 1)
+        )
+        messages = [{"role": "system", "content": BATCH_ANALYSIS_PROMPT.format(conversations=conversations)}]
+        metrics.incr("analyzer_batch_requests")
+        try:
+            response_text = await services.cerebras.chat_completion(
+                messages,
+                temperature=0.1,
+                response_format=ConversationAnalyzer._response_format(BatchAnalysisResult, "conversation_analysis_batch"),
+                labels={"purpose": "analyzer_batch"},
+            )
+            results = _batch_results(response_text)
+        except ValueError as e:
+            logger.warning(f"[Analyzer] Invalid batch output for {len(batch)} turns: {str(e)[:200]}")
+            results = {}
+        except Exception as e:
+            for future, *_ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for i, (future, *_) in enumerate(batch, 1):
+            if future.done():
+                continue
+            try:
+                analysis = ConversationAnalyzer._validate(results[str(i)])
+            except (KeyError, ValueError):
+                metrics.incr("analyzer_batch_fallbacks")
+                analysis = None
+            future.set_result(analysis)
+
+
+class AnalysisStream:
+    """
+    Handle on one in-flight analysis. Early fields come from the first
+    attempt that produced them and are a hint until `result()` resolves.
+    """
+
+    def __init__(self, run: Callable[["AnalysisStream"], Awaitable[Dict[str, Any]]]):
+        self._early: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(run))
+
+    async def early(self) -> Dict[str, Any]:
+        return await asyncio.shield(self._early)
+
+    async def result(self) -> Dict[str, Any]:
+        return await asyncio.shield(self._task)
+
+    def cancel(self):
+        """
+        Stops the analysis. The shields above keep it running when a waiter is
+        cancelled, so a turn that is abandoned (barge-in) calls this itself.
+        """
+        self._task.cancel()
+        self._early.cancel()
+
+    def publish_early(self, fields: Dict[str, Any]):
+        """Publishes the early fields once all of them have arrived and validate."""
+        if self._early.done() or not all(k in fields for k in EARLY_ANALYSIS_FIELDS):
+            return
+        try:
+            early = AnalysisResult.model_validate({k: fields[k] for k in EARLY_ANALYSIS_FIELDS}).model_dump()
+        except ValueError:
+            return
+        metrics.incr("analyzer_early_decisions")
+        self._set_early(early)
+
+    def _set_early(self, fields: Dict[str, Any]):
+        if not self._early.done():
+            self._early.set_result({k: fields.get(k) for k in EARLY_ANALYSIS_FIELDS})
+
+    async def _run(self, run) -> Dict[str, Any]:
+        try:
+            result = await run(self)
+        except asyncio.CancelledError:
+            self._early.cancel()
+            raise
+        except Exception as e:
+            if not self._early.done():
+                self._early.set_exception(e)
+                # Consumers may only await result(); don't warn about an unretrieved early error
+                self._early.exception()
+            raise
+        self._set_early(result)
+        return result
+
+
+async def _resolved(result: Dict[str, Any]) -> Dict[str, Any]:
+    return result
+
+
+def _batch_results(response_text: str) -> Dict[str, Any]:
+    """Maps conversation id -> raw analysis from a batch completion. Raises ValueError without a results list."""
+    data = _extract_json(response_text)
+    results = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(results, list):
+        raise ValueError("no results list in batch analyzer output")
+    return {str(item["id"]): item for item in results if isinstance(item, dict) and "id" in item}
+
+
+def _extract_json(response_text: str) -> Any:
+    """Parses the JSON object out of a completion, tolerating markdown fences and stray prose."""
+    data = (response_text or "").strip()
+    start, end = data.find("{"), data.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError("no JSON object in analyzer output")
+    return json.loads(data[start:end + 1])
+
 
-analyzer = ConversationAnalyzer()
\ No newline at end of file
+def __getattr__(name: str):
+    # The shared instance lives in app.container; built on first use
+    if name == "analyzer":
+        return services.analyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
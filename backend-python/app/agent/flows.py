@@ -0,0 +1,101 @@
+"""
+Declarative conversation flows, one per session `mode` (tenant).
+
+A flow is plain JSON-compatible data, compiled and validated by
+app.agent.stage_machine at startup:
+
+    initial         stage a new session starts in
+    nudge           {"after_turns": n, "max_nudges": m}: nudge on turns n+1 .. n+m in a stage
+    stages.<stage>
+        next             stage a regular advance goes to (null: end of flow)
+        advance_intents  analyzer intents that may trigger a regular advance
+        requires         metadata fields that must be truthy before a regular advance
+        jumps            {intent: stage}: move immediately, bypassing the guards above
+        terminal         never advance; once `requires` is met, lock the session
+        nudge            false to never nudge in this stage
+
+Extra or replacement flows can be loaded from a JSON file (FLOW_DEFINITIONS_PATH)
+holding an object of {mode: flow}.
+"""
+from typing import Any, Dict
+
+SDR_FLOW: Dict[str, Any] = {
+    "initial": "greeting",
+    "nudge": {"after_turns": 2, "max_nudges": 2},
+    "stages": {
+        "greeting": {
+            "next": "qualification",
+            "advance_intents": ["greeting", "affirmation", "pricing_query", "sharing_pain", "other"],
+            "requires": [],
+            "jumps": {
+                "pricing_query": "qualification",
+                "sharing_pain": "problem",
+                "affirmation": "qualification",
+            },
+        },
+        "qualification": {
+            "next": "problem",
+            "advance_intents": ["providing_info", "affirmation"],
+            "requires": ["role", "company"],
+        },
+        "problem": {
+            "next": "solution",
+            "advance_intents": ["sharing_pain", "affirmation"],
+            "requires": ["pain_points"],
+        },
+        "solution": {
+            "next": "objection",
+            # "interest" here means they liked the value
+            "advance_intents": ["interest", "affirmation"],
+            "requires": ["value_accepted"],  # Explicit confirmation needed
+        },
+        "objection": {
+            "next": "closing",
+            "advance_intents": ["affirmation"],
+            "requires": ["concerns_addressed"],
+        },
+        "closing": {
+            "terminal": True,
+            "requires": ["meeting_locked"],
+            "nudge": False,
+        },
+    },
+}
+
+# Inbound support: no qualification or objection handling, straight from
+# the caller's problem to a fix and a follow-up.
+SUPPORT_FLOW: Dict[str, Any] = {
+    "initial": "greeting",
+    "nudge": {"after_turns": 3, "max_nudges": 1},
+    "stages": {
+        "greeting": {
+            "next": "problem",
+            "advance_intents": ["greeting", "affirmation", "sharing_pain", "providing_info", "other"],
+            "requires": [],
+            "jumps": {"sharing_pain": "problem", "pricing_query": "solution"},
+        },
+        "problem": {
+            "next": "solution",
+            "advance_intents": ["sharing_pain", "providing_info", "affirmation"],
+            "requires": ["pain_points"],
+        },
+        "solution": {
+            "next": "closing",
+            "advance_intents": ["affirmation", "interest"],
+            "requires": ["value_accepted"],
+            "jumps": {"objection": "problem"},
+        },
+        "closing": {
+            "terminal": True,
+            "requires": ["meeting_locked"],
+            "nudge": False,
+        },
+    },
+}
+
+DEFAULT_MODE = "sdr"
+
+FLOWS: Dict[str, Dict[str, Any]] = {
+    "sdr": SDR_FLOW,
+    "support": SUPPORT_FLOW,
+}
@@ -0,0 +1,124 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.container import services
+from app.logging import logger
+from app.utils.tokens import message_tokens
+
+SUMMARY_KEY = "history_summary"
+SUMMARIZED_COUNT_KEY = "history_summarized"
+
+SUMMARY_PROMPT = """You maintain a running summary of a sales call for the agent handling it.
+Update the summary with the new messages below. Keep every concrete fact the user shared
+(name, role, company, pain points, objections, agreed next steps) and drop small talk.
+Reply with the updated summary only, in at most 6 short bullet points.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+"""
+
+
+class HistoryManager:
+    """
+    Builds the history sent to the LLM under a token budget.
+    The last `keep_turns` exchanges stay verbatim; older messages are folded
+    into a rolling summary that is updated in the background, off the turn's
+    critical path. Until a fold lands, the oldest verbatim messages are
+    dropped as needed to respect the budget.
+    """
+
+    def __init__(self, token_budget: int, keep_turns: int, summarize: bool = True):
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.summarize = summarize
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    def context(self, session_id: str) -> List[Dict[str, str]]:
+        return self._build(session_id, *self._read(session_id))
+
+    async def load(self, session_id: str) -> List[Dict[str, str]]:
+        """context(), with the store reads run through SessionMemory.offload()."""
+        return self._build(session_id, *await services.session_memory.offload(self._read, session_id))
+
+    @staticmethod
+    def _read(session_id: str) -> Tuple[List[Dict[str, str]], Optional[str], int]:
+        history = services.session_memory.get_history(session_id)
+        summary = services.session_memory.get_metadata(session_id, SUMMARY_KEY)
+        summarized = min(services.session_memory.get_metadata(session_id, SUMMARIZED_COUNT_KEY) or 0, len(history))
+        return history, summary, summarized
+
+    def _build(
+        self, session_id: str, history: List[Dict[str, str]], summary: Optional[str], summarized: int
+    ) -> List[Dict[str, str]]:
+        keep_from = max(summarized, len(history) - self.keep_turns * 2)
+        if self.summarize and keep_from > summarized:
+            self._schedule_summary(session_id, summary, summarized, history[summarized:keep_from])
+
+        budget = self.token_budget
+        head: List[Dict[str, str]] = []
+        if summary:
+            head = [{"role": "system", "content": f"[CONVERSATION SUMMARY]\n{summary}"}]
+            budget -= message_tokens(head[0])
+
+        # Walk back from the newest message; always keep the latest one
+        verbatim = history[summarized:]
+        kept = 0
+        for message in reversed(verbatim):
+            cost = message_tokens(message)
+            if kept and cost > budget:
+                break
+            budget -= cost
+            kept += 1
+        if kept < len(verbatim):
+            logger.debug("[History] session={} trimmed {} messages to fit budget", session_id, len(verbatim) - kept)
+        return head + verbatim[len(verbatim) - kept:]
+
+    def _schedule_summary(self, session_id: str, summary: Optional[str], start: int, messages: List[Dict[str, str]]):
+        task = self._pending.get(session_id)
+        if task and not task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._pending[session_id] = loop.create_task(
+            self._fold(session_id, summary, start + len(messages), list(messages))
+        )
+
+    async def _fold(self, session_id: str, summary: Optional[str], upto: int, messages: List[Dict[str, str]]):
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        prompt = SUMMARY_PROMPT.format(summary=summary or "(none yet)", messages=transcript)
+        try:
+            updated = await services.cerebras.chat_completion(
+                [{"role": "system", "content": prompt}], temperature=0.2, max_tokens=250,
+                labels={"purpose": "summary"},
+            )
+        except Exception as e:
+            logger.error(f"[History] session={session_id} summarization failed: {e}")
+            return
+        finally:
+            self._pending.pop(session_id, None)
+        if await services.session_memory.offload(self._store_summary, session_id, updated.strip(), upto):
+            logger.info(f"[History] session={session_id} folded {len(messages)} messages into summary")
+
+    @staticmethod
+    def _store_summary(session_id: str, summary: str, upto: int) -> bool:
+        # The session may have been cleared while we were summarizing
+        if (services.session_memory.get_metadata(session_id, SUMMARIZED_COUNT_KEY) or 0) >= upto:
+            return False
+        if len(services.session_memory.get_history(session_id)) < upto:
+            return False
+        services.session_memory.set_metadata(session_id, SUMMARY_KEY, summary)
+        services.session_memory.set_metadata(session_id, SUMMARIZED_COUNT_KEY, upto)
+        return True
+
+
+history_manager = HistoryManager(
+    token_budget=settings.HISTORY_TOKEN_BUDGET,
+    keep_turns=settings.HISTORY_KEEP_TURNS,
+    summarize=settings.HISTORY_SUMMARIZE,
+)
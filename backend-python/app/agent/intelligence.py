@@ -1,23 +1,19 @@
 from typing import List, Dict, Set
+from app.agent.flows import SDR_FLOW
 from app.agent.stages import SalesStage
 
+# Views of the default (SDR) flow in app.agent.flows, which is the source of truth;
+# per-mode flow control goes through app.agent.stage_machine.
+
 # Required information to move OUT of a stage
 EXIT_CONDITIONS: Dict[SalesStage, List[str]] = {
-    SalesStage.GREETING: [],
-    SalesStage.QUALIFICATION: ["role", "company"],
-    SalesStage.PROBLEM: ["pain_points"],
-    SalesStage.SOLUTION: ["value_accepted"], # Logic: Explicit confirmation needed
-    SalesStage.OBJECTION: ["concerns_addressed"],
-    SalesStage.CLOSING: ["meeting_locked"],
+    SalesStage(stage): list(spec.get("requires") or []) for stage, spec in SDR_FLOW["stages"].items()
 }
 
 # Intents allowed to trigger an advance PER stage
 ALLOWED_ADVANCE_INTENTS: Dict[SalesStage, Set[str]] = {
-    SalesStage.GREETING: {"greeting", "information_request", "affirmation", "pricing_query", "sharing_pain", "other"},
-    SalesStage.QUALIFICATION: {"providing_info", "affirmation"},
-    SalesStage.PROBLEM: {"sharing_pain", "affirmation"},
-    SalesStage.SOLUTION: {"interest", "affirmation"}, # "interest" here means they liked the value
-    SalesStage.OBJECTION: {"acceptance", "affirmation"},
+    SalesStage(stage): set(spec["advance_intents"])
+    for stage, spec in SDR_FLOW["stages"].items() if spec.get("advance_intents")
 }
 
 # Metadata keys
@@ -0,0 +1,90 @@
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from app.agent.stages import SalesStage
+
+# Whole-utterance lexicons (after normalization)
+GREETINGS = {
+    "hi", "hello", "hey", "hiya", "hi there", "hello there", "hey there",
+    "good morning", "good afternoon", "good evening", "morning", "afternoon",
+    "hello can you hear me", "can you hear me", "are you there", "hello are you there",
+}
+AFFIRMATIONS = {
+    "yes", "yeah", "yep", "yup", "ya", "sure", "ok", "okay", "okey", "alright", "all right",
+    "correct", "right", "thats right", "exactly", "absolutely", "definitely", "of course",
+    "yes please", "sure thing", "go ahead", "go on", "uh huh", "mhm", "mm hmm", "i see", "got it",
+}
+CLARIFICATIONS = {
+    "what", "sorry", "pardon", "come again", "say that again", "what do you mean",
+    "can you repeat that", "could you repeat that", "repeat that", "sorry what",
+}
+EVASIONS = {
+    "i dont know", "dont know", "not sure", "no idea", "maybe", "whatever",
+    "id rather not say", "rather not say", "pass",
+}
+
+# Pattern lexicons for short utterances
+PRICING_PATTERN = re.compile(r"\b(how much|price|pricing|cost|costs|fee|fees|quote|per month|subscription)\b")
+CURIOSITY_PATTERN = re.compile(r"^(how does (it|this|that) work|what (do|does) (you|it|this) do|what is (this|it))\b")
+
+# Stages whose exit condition an affirmation can satisfy. The analyzer LLM
+# must see those turns, because it sets the boolean field in extracted_info.
+EXTRACTION_SENSITIVE_STAGES = {SalesStage.SOLUTION, SalesStage.OBJECTION, SalesStage.CLOSING}
+
+_NORMALIZE = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize(text: str) -> str:
+    text = text.lower().replace("'", "").replace("’", "")
+    return " ".join(_NORMALIZE.sub(" ", text).split())
+
+
+def _result(intent: str, action: str, is_vague: bool = False) -> Dict[str, Any]:
+    return {
+        "intent": intent,
+        "extracted_info": {},
+        "is_vague": is_vague,
+        "recommended_action": action,
+        "source": "preclassifier",
+    }
+
+
+class IntentPreClassifier:
+    """
+    CPU-only first pass over the analyzer's intent labels.
+    Only short, information-free utterances get a high confidence; anything
+    that could carry extractable facts is left to the LLM analyzer.
+    """
+
+    max_words = 8
+
+    def classify(self, user_text: str, current_stage: SalesStage) -> Tuple[Optional[Dict[str, Any]], float]:
+        text = normalize(user_text)
+        if not text:
+            return _result("other", "stay", is_vague=True), 0.6
+        words = text.split()
+        if len(words) > self.max_words:
+            return None, 0.0
+
+        if text in GREETINGS:
+            action = "advance" if current_stage == SalesStage.GREETING else "stay"
+            return _result("greeting", action), 0.95
+        if text in AFFIRMATIONS:
+            confidence = 0.5 if current_stage in EXTRACTION_SENSITIVE_STAGES else 0.95
+            return _result("affirmation", "advance"), confidence
+        if text in CLARIFICATIONS:
+            return _result("clarification", "stay"), 0.9
+        if text in EVASIONS:
+            return _result("evasion", "stay", is_vague=True), 0.85
+        if CURIOSITY_PATTERN.search(text):
+            return _result("curiosity", "stay"), 0.8
+        if PRICING_PATTERN.search(text):
+            # Short pricing questions rarely carry role/company details; in
+            # OBJECTION they are usually price pushback, which the LLM labels better
+            if current_stage == SalesStage.OBJECTION:
+                return _result("pricing_query", "stay"), 0.5
+            return _result("pricing_query", "stay"), 0.9 if len(words) <= 6 else 0.7
+        return None, 0.0
+
+
+intent_classifier = IntentPreClassifier()
@@ -0,0 +1,99 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for a streamed top-level JSON object.
+
+    `feed()` consumes text chunks and returns the top-level (key, value)
+    pairs that became complete in that chunk, so callers can act on early
+    fields before the rest of the object has arrived. Nested objects and
+    arrays are emitted whole once closed. Text before the first `{` (such as
+    a markdown fence) is ignored.
+    """
+
+    def __init__(self):
+        self._buf: List[str] = []
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._token_start = -1
+        self._expect = "key"  # key | colon | value | comma
+        self._key = None
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._buf)
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self._buf.append(chunk)
+        text = self.text
+        self._buf = [text]
+        emitted: List[Tuple[str, Any]] = []
+
+        i = self._pos
+        while i < len(text) and not self.done:
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        token = json.loads(text[self._token_start:i + 1])
+                        if self._expect == "key":
+                            self._key = token
+                            self._expect = "colon"
+                        elif self._expect == "value":
+                            emitted.append(self._emit(token))
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect in ("key", "value"):
+                    self._token_start = i
+            elif ch in "{[":
+                if self._depth == 1 and self._expect == "value":
+                    self._token_start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 1:
+                    if self._expect == "value" and self._token_start >= 0:
+                        emitted.append(self._emit(json.loads(text[self._token_start:i])))
+                    self.done = True
+                self._depth -= 1
+                if self._depth == 1 and self._expect == "value":
+                    emitted.append(self._emit(json.loads(text[self._token_start:i + 1])))
+            elif self._depth == 1:
+                if ch == ":" and self._expect == "colon":
+                    self._expect = "value"
+                    self._token_start = -1
+                elif ch == ",":
+                    if self._expect == "value" and self._token_start >= 0:
+                        emitted.append(self._emit(json.loads(text[self._token_start:i])))
+                    self._expect = "key"
+                elif self._expect == "value" and self._token_start < 0 and not ch.isspace():
+                    # Start of a literal: number, true, false, null
+                    self._token_start = i
+            i += 1
+        self._pos = i
+        return emitted
+
+    def _emit(self, value: Any) -> Tuple[str, Any]:
+        key = self._key
+        self.fields[key] = value
+        self._expect = "comma"
+        self._token_start = -1
+        return key, value
+
+    def parse_buffer(self) -> Dict[str, Any]:
+        """Parses the full buffered text as JSON (fallback once the stream ends)."""
+        text = self.text
+        start, end = text.find("{"), text.rfind("}")
+        if start < 0 or end < start:
+            raise ValueError("no JSON object in analyzer output")
+        return json.loads(text[start:end + 1])
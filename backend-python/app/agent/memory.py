@@ -1,53 +1,158 @@
-from typing import List, Dict, Optional, Any
-from collections import defaultdict
+import asyncio
+import contextvars
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from app.agent.session_state import DEFAULTS, SessionState
 from app.agent.stages import SalesStage
+from app.storage import SessionStore, build_event_log, build_session_store
+from app.storage.event_log import EventLog
+from app.utils.metrics import metrics
 
 
 class SessionMemory:
-    def __init__(self):
-        self._history: Dict[str, List[Dict[str, str]]] = defaultdict(list)
-        self._metadata: Dict[str, Dict[str, Any]] = defaultdict(dict)
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        events: Optional[EventLog] = None,
+        snapshot_every: int = 50,
+        max_sessions: int = 10000,
+    ):
+        if store is None:
+            from app.config import settings
+            store = build_session_store(settings, metadata_factory=SessionState)
+            events = build_event_log(settings)
+            snapshot_every = settings.EVENT_LOG_SNAPSHOT_EVERY
+            max_sessions = settings.SESSION_MAX_SESSIONS
+        self.store = store
+        # Every state change is mirrored to the event log, when one is configured
+        self.events = events
+        self.snapshot_every = snapshot_every
+        # Events since each session's last snapshot, least recently logged first. Sessions
+        # the store evicts are never cleared here, so past `max_sessions` the oldest count
+        # is dropped; that session just snapshots again on its next event.
+        self.max_sessions = max_sessions
+        self._since_snapshot: "OrderedDict[str, int]" = OrderedDict()
+        self._default_metadata = DEFAULTS
+        # One thread, so sections run one at a time and in the order they were submitted
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="session-store") if store.blocking else None
 
-        self._default_metadata = {
-            "stage": SalesStage.GREETING,
-            "mode": "SDR",
-            "intent": None,
-            "turns_in_stage": 0,
-        }
+    def offload(self, fn: Callable[..., Any], *args) -> "asyncio.Future":
+        """
+        Runs `fn(*args)`, a section of turn logic that reads or writes the
+        store, and returns a future of its result. With a blocking store
+        (Redis) it runs on the store thread so the round trips don't stall the
+        event loop; otherwise inline, before this returns.
+        """
+        loop = asyncio.get_running_loop()
+        if self._executor is not None:
+            return loop.run_in_executor(self._executor, contextvars.copy_context().run, fn, *args)
+        future = loop.create_future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
 
-    def _ensure_defaults(self, session_id: str):
-        for key, value in self._default_metadata.items():
-            self._metadata[session_id].setdefault(key, value)
+    def _log(self, session_id: str, kind: str, data: Any = None):
+        if self.events is None:
+            return
+        self.events.append(session_id, kind, data)
+        # First event seen by this process, then every `snapshot_every`
+        count = self._since_snapshot.pop(session_id, None)
+        if count is None or count + 1 >= self.snapshot_every:
+            history, metadata = self.store.load(session_id)
+            # Copies: the writer thread serializes them later
+            self.events.snapshot(session_id, list(history), dict(metadata))
+            count = 0
+        else:
+            count += 1
+        self._since_snapshot[session_id] = count
+        if len(self._since_snapshot) > self.max_sessions:
+            self._since_snapshot.popitem(last=False)
+
+    def record(self, session_id: str, kind: str, data: Any):
+        """Logs an event that doesn't change session state (e.g. analyzer results)."""
+        self._log(session_id, kind, data)
+
+    def restore(self, session_id: str, history: List[Dict[str, str]], metadata: Dict[str, Any]):
+        """Loads a session rebuilt from the event log into the store."""
+        for message in history:
+            # Fresh dicts with shared key and role strings rather than the decoder's copies
+            self.store.append_message(session_id, {"role": sys.intern(message["role"]), "content": message["content"]})
+        if metadata:
+            self.store.set_metadata(session_id, metadata)
+        metrics.incr("sessions_recovered")
 
     def add_message(self, session_id: str, role: str, content: str):
-        self._history[session_id].append(
-            {"role": role, "content": content}
-        )
+        # Roles are a handful of values shared by every message; intern the ones built at runtime
+        message = {"role": sys.intern(role), "content": content}
+        self.store.append_message(session_id, message)
+        self._log(session_id, "message", message)
         if role == "user":
-            self._ensure_defaults(session_id)
-            self._metadata[session_id]["turns_in_stage"] += 1
+            self.store.increment(session_id, "turns_in_stage")
+            self._log(session_id, "increment", {"key": "turns_in_stage", "amount": 1})
+
+    def get_history(self, session_id: str) -> List[Dict[str, str]]:
+        return self.store.get_history(session_id)
 
-    def get_history(self, session_id: str):
-        return self._history[session_id]
+    def has_session(self, session_id: str) -> bool:
+        return self.store.exists(session_id)
+
+    def active_sessions(self) -> Optional[int]:
+        return self.store.count()
 
     def clear_session(self, session_id: str):
-        self._history.pop(session_id, None)
-        self._metadata.pop(session_id, None)
+        self.store.delete(session_id)
+        if self.events is not None:
+            self.events.append(session_id, "delete")
+            self._since_snapshot.pop(session_id, None)
 
     def set_metadata(self, session_id: str, key: str, value: Any):
-        self._ensure_defaults(session_id)
-        self._metadata[session_id][key] = value
+        self.store.set_metadata(session_id, {key: value})
+        self._log(session_id, "metadata", {key: value})
 
     def get_metadata(self, session_id: str, key: str):
-        self._ensure_defaults(session_id)
-        return self._metadata[session_id].get(key, self._default_metadata.get(key))
+        value = self.store.get_metadata(session_id).get(key, self._default_metadata.get(key))
+        # Remote stores round-trip the stage as its string value
+        if key == "stage" and type(value) is str:
+            value = SalesStage(value)
+        return value
+
+    def state(self, session_id: str) -> SessionState:
+        """
+        Typed metadata for reading (attribute access, defaults already filled in).
+        In-process sessions return their live state, read-only like get_history();
+        other stores build one from their stored hash.
+        """
+        metadata = self.store.get_metadata(session_id)
+        return metadata if type(metadata) is SessionState else SessionState(metadata)
+
+    def get_metadata_snapshot(self, session_id: str) -> Dict[str, Any]:
+        """All metadata for a session in one store read, with defaults filled in."""
+        metadata = self.store.get_metadata(session_id)
+        if type(metadata) is SessionState:
+            return metadata.to_dict()
+        snapshot = dict(self._default_metadata)
+        snapshot.update(metadata)
+        if isinstance(snapshot["stage"], str):
+            snapshot["stage"] = SalesStage(snapshot["stage"])
+        return snapshot
 
     def advance_stage(self, session_id: str, next_stage: SalesStage):
-        self.set_metadata(session_id, "stage", next_stage)
-        self.set_metadata(session_id, "turns_in_stage", 0)
+        previous = self.get_metadata(session_id, "stage") if self.events is not None else None
+        self.store.set_metadata(session_id, {"stage": next_stage, "turns_in_stage": 0})
+        if previous is not None:
+            self._log(session_id, "stage", {"from_stage": previous, "stage": next_stage})
 
     def turns_in_stage(self, session_id: str) -> int:
         return self.get_metadata(session_id, "turns_in_stage")
 
 
-session_memory = SessionMemory()
+def __getattr__(name: str):
+    # The shared instance lives in app.container; built on first use
+    if name == "session_memory":
+        from app.container import services
+        return services.session_memory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
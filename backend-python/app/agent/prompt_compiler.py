@@ -0,0 +1,75 @@
+from typing import Dict, Optional, Tuple
+
+from app.agent.stages import SalesStage
+from app.agent.prompts import (
+    BASE_AGENT_PROMPT,
+    VOICE_CONVERSATION_WRAPPER,
+    STAGE_PROMPTS,
+    PRICING_GATE_MODIFIER,
+    SEMANTIC_LOCK_MODIFIER,
+    NUDGE_MODIFIER,
+    CLOSING_STEP_MODIFIER,
+    BEHAVIORAL_REFINEMENT_PROMPT,
+)
+
+PrefixKey = Tuple[SalesStage, bool, bool]
+
+
+class PromptCompiler:
+    """
+    Assembles the generation system prompt from a cached static prefix plus a
+    small per-turn context block.
+
+    The prefix depends only on (stage, locked, nudge), so it is built once per
+    combination and stays byte-identical across turns, which lets
+    provider-side prompt caching reuse it. Everything that changes turn to
+    turn goes after it.
+    """
+
+    def __init__(self):
+        self._prefixes: Dict[PrefixKey, str] = {}
+
+    def prefix(self, stage: SalesStage, locked: bool, nudge: bool) -> str:
+        key = (stage, locked, nudge)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            prefix = self._prefixes[key] = self._build_prefix(stage, locked, nudge)
+        return prefix
+
+    @staticmethod
+    def _build_prefix(stage: SalesStage, locked: bool, nudge: bool) -> str:
+        stage_instruction = STAGE_PROMPTS.get(stage, "")
+        parts = [
+            BASE_AGENT_PROMPT,
+            SEMANTIC_LOCK_MODIFIER.format(stage=stage.value, goal=stage_instruction),
+            PRICING_GATE_MODIFIER,
+        ]
+        if nudge:
+            parts.append(NUDGE_MODIFIER.format(goal=stage_instruction))
+        if locked:
+            parts.append(CLOSING_STEP_MODIFIER)
+        parts.append(f"\n\n{BEHAVIORAL_REFINEMENT_PROMPT}")
+        parts.append(f"\n\n{VOICE_CONVERSATION_WRAPPER}")
+        return "".join(parts)
+
+    @staticmethod
+    def context_block(role: Optional[str], company: Optional[str], pain_points: Optional[str], value_presented: bool) -> str:
+        return (
+            f"\n[USER CONTEXT]\n- Role: {role or 'Unknown'}\n- Company: {company or 'Unknown'}"
+            f"\n- Identified Pain Points: {pain_points or 'None yet'}\nValue Presented: {value_presented}"
+        )
+
+    def compile(
+        self,
+        stage: SalesStage,
+        locked: bool,
+        nudge: bool,
+        role: Optional[str] = None,
+        company: Optional[str] = None,
+        pain_points: Optional[str] = None,
+        value_presented: bool = False,
+    ) -> str:
+        return self.prefix(stage, locked, nudge) + self.context_block(role, company, pain_points, value_presented)
+
+
+prompt_compiler = PromptCompiler()
@@ -0,0 +1,142 @@
+"""
+Length control for spoken replies.
+
+The prompt asks for 2–3 sentences, but nothing held the model to it, and a
+reply that runs on costs generation time and then TTS time. Each stage has
+a budget:
+
+- `max_tokens`, sent with the request, is the hard cap;
+- once `max_words` words have streamed, or `max_seconds` have passed since
+  the first token, the reply ends at the next sentence boundary and the
+  upstream request is closed, so only whole sentences get spoken.
+
+Replies are also sent with stop sequences (REPLY_STOP): a second paragraph,
+or the model starting to write the caller's turn. The budgets leave room
+above the prompt's 2–3 sentences, so they catch replies that ran on, not
+ordinary ones.
+"""
+import math
+import sys
+import time
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, List, Mapping, Optional
+
+from app.agent.stages import SalesStage
+from app.config import settings
+from app.utils.metrics import metrics
+from app.utils.sentences import SentenceChunker
+
+
+@dataclass(frozen=True)
+class ReplyBudget:
+    max_tokens: Optional[int] = None
+    max_words: Optional[int] = None
+    max_seconds: Optional[float] = None
+
+
+# max_tokens leaves room to finish the sentence that crosses max_words (~1.3 tokens a word).
+# Solution and objection replies carry a proof point, so they get a little more.
+DEFAULT_BUDGETS = {
+    SalesStage.GREETING: ReplyBudget(max_tokens=80, max_words=30, max_seconds=3.0),
+    SalesStage.QUALIFICATION: ReplyBudget(max_tokens=90, max_words=40, max_seconds=3.0),
+    SalesStage.PROBLEM: ReplyBudget(max_tokens=90, max_words=40, max_seconds=3.0),
+    SalesStage.SOLUTION: ReplyBudget(max_tokens=110, max_words=50, max_seconds=4.0),
+    SalesStage.OBJECTION: ReplyBudget(max_tokens=110, max_words=50, max_seconds=4.0),
+    SalesStage.CLOSING: ReplyBudget(max_tokens=90, max_words=40, max_seconds=3.0),
+}
+
+_FIELDS = {f.name for f in fields(ReplyBudget)}
+
+
+class ReplyLengthController:
+    def __init__(
+        self,
+        budgets: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        stop: Optional[List[str]] = None,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.stop = list(stop or []) or None
+        self.budgets: Dict[SalesStage, ReplyBudget] = dict(DEFAULT_BUDGETS)
+        for stage, overrides in (budgets or {}).items():
+            if stage not in SalesStage._value2member_map_:
+                raise ValueError(f"Reply budget {stage!r}: unknown stage")
+            unknown = set(overrides) - _FIELDS
+            if unknown:
+                raise ValueError(f"Reply budget {stage!r}: unknown fields {', '.join(sorted(unknown))}")
+            self.budgets[SalesStage(stage)] = replace(self.budgets[SalesStage(stage)], **overrides)
+
+    def request_params(self, stage: SalesStage) -> Dict[str, Any]:
+        """max_tokens and stop sequences for the generation request."""
+        if not self.enabled:
+            return {}
+        return {"max_tokens": self.budgets[stage].max_tokens, "stop": self.stop}
+
+    def start(self, stage: SalesStage) -> Optional["ReplyLimit"]:
+        """Budget tracking for one reply at `stage` (None when there is nothing to enforce)."""
+        budget = self.budgets[stage]
+        if not self.enabled or not (budget.max_words or budget.max_seconds):
+            return None
+        return ReplyLimit(stage, budget)
+
+
+class ReplyLimit:
+    """
+    One reply's budget, fed each delta by the turn as it streams (a check
+    inline in the turn's loop rather than another async generator per delta).
+    """
+
+    __slots__ = ("stage", "max_words", "max_seconds", "words", "deadline", "over", "sentences", "previous", "head")
+
+    def __init__(self, stage: SalesStage, budget: ReplyBudget):
+        self.stage = stage
+        self.max_words = budget.max_words or sys.maxsize
+        self.max_seconds = budget.max_seconds or math.inf
+        self.words = 1
+        self.deadline: Optional[float] = None  # set on the first token
+        self.over: Optional[str] = None  # the budget that ran out: "words" or "seconds"
+        self.sentences: Optional[SentenceChunker] = None
+        self.previous = ""
+        self.head = ""
+
+    def ends(self, delta: str) -> bool:
+        """
+        True once a budget has run out and the sentence running at the time
+        closes in `delta`; `head` is then the part of `delta` to keep.
+        """
+        if self.sentences is None:
+            self.words += delta.count(" ")
+            if self.words > self.max_words:
+                self.over = "words"
+            elif self.deadline is None:
+                self.deadline = time.perf_counter() + self.max_seconds
+                self.previous = delta
+                return False
+            elif time.perf_counter() < self.deadline:
+                self.previous = delta
+                return False
+            else:
+                self.over = "seconds"
+            # Segmented from here on only; the previous delta may hold the terminator.
+            # Sentence ends only: no clause or length splits
+            self.sentences = SentenceChunker(clause_chars=sys.maxsize, max_chars=sys.maxsize)
+            self.sentences.push(self.previous)
+        else:
+            self.words += delta.count(" ")
+        if not self.sentences.push(delta):
+            return False
+        # Up to the boundary; the rest of the delta starts the next sentence
+        self.head = delta[:max(0, len(delta) - len(self.sentences.pending))].rstrip()
+        self.words += self.head.count(" ") - delta.count(" ")
+        metrics.incr("reply_budget_overruns", stage=self.stage.value, limit=self.over)
+        return True
+
+    def finish(self):
+        metrics.observe("reply_words", self.words, stage=self.stage.value)
+
+
+reply_length = ReplyLengthController(
+    budgets=settings.REPLY_BUDGETS,
+    stop=settings.REPLY_STOP,
+    enabled=settings.REPLY_LENGTH_CONTROL,
+)
@@ -0,0 +1,234 @@
+"""
+Cache of LLM outputs for repeated turns ("how much is it?", "who are you?").
+
+An entry is keyed by purpose (analyzer / generation), stage, a hash of the
+prompt it was produced from, a hash of the agent's previous reply and the
+user's normalized text. The previous reply is what a short answer answers:
+"yes" to "shall I book you a demo?" and "yes" to "are you the owner?" must
+not share an entry. A lookup tries that exact key first, then the nearest
+cached utterance in the same bucket by cosine similarity of a small local embedding:
+content words plus their character trigrams, with filler words ("um", "so",
+"this", "it") dropped, so "so how does this work?" finds "how does it work".
+Two utterances only match by similarity when they carry the same negation
+words: "I'm not interested" is close to "I'm really interested" by cosine,
+but means the opposite.
+"""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+from app.agent.intent_classifier import normalize
+from app.agent.stages import SalesStage
+from app.utils.metrics import metrics
+
+# Words whose presence doesn't change what a short question asks for
+FILLER_WORDS = frozenset({
+    "a", "an", "the", "this", "that", "it", "so", "um", "uh", "er", "hmm", "well", "like", "just",
+    "please", "hey", "ok", "okay", "actually", "really", "again", "then", "now", "guys", "exactly",
+})
+CONTRACTIONS = {
+    "im": "i am", "whats": "what is", "hows": "how is", "whos": "who is", "wheres": "where is", "its": "it is",
+    "youre": "you are", "dont": "do not", "doesnt": "does not", "isnt": "is not", "cant": "can not",
+    "wont": "will not", "didnt": "did not", "arent": "are not", "wasnt": "was not", "werent": "were not",
+    "havent": "have not", "hasnt": "has not", "couldnt": "could not", "wouldnt": "would not",
+    "shouldnt": "should not", "cannot": "can not",
+}
+# Words that flip what an utterance means (contractions are expanded first)
+NEGATION_WORDS = frozenset({"not", "no", "never", "nope", "nah", "none", "nothing", "nobody", "neither", "nor"})
+
+GRAM_WEIGHT = 0.25  # a shared trigram counts a quarter of a shared word
+
+
+class Vector(NamedTuple):
+    """Binary bag of content words and their trigrams, as sets so similarity is a C-level set intersection."""
+    words: FrozenSet[str]
+    grams: FrozenSet[str]
+    norm: float
+    negations: FrozenSet[str]
+
+
+class CacheKey(NamedTuple):
+    bucket: Tuple[str, str, str, str]  # purpose, stage, prompt hash, previous reply hash
+    text: str  # normalized user text
+
+
+class _Entry:
+    __slots__ = ("value", "expires", "vector")
+
+    def __init__(self, value: Any, expires: float, vector: Optional[Vector]):
+        self.value = value
+        self.expires = expires
+        self.vector = vector
+
+
+def prompt_hash(*parts: str) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def previous_reply(messages: Sequence[Dict[str, str]]) -> str:
+    """The last assistant message in `messages` ("" before the agent has spoken)."""
+    for message in reversed(messages):
+        if message["role"] == "assistant":
+            return message["content"]
+    return ""
+
+
+def embed(text: str) -> Optional[Vector]:
+    """Embeds normalized text; None when nothing but filler is left."""
+    words = frozenset(
+        w for w in " ".join(CONTRACTIONS.get(w, w) for w in text.split()).split() if w not in FILLER_WORDS
+    )
+    if not words:
+        return None
+    grams = frozenset(p[i:i + 3] for p in (f"<{w}>" for w in words) for i in range(len(p) - 2))
+    norm = math.sqrt(len(words) + GRAM_WEIGHT * GRAM_WEIGHT * len(grams))
+    return Vector(words, grams, norm, words & NEGATION_WORDS)
+
+
+def _cosine(a: Vector, b: Vector) -> float:
+    return (len(a.words & b.words) + GRAM_WEIGHT * GRAM_WEIGHT * len(a.grams & b.grams)) / (a.norm * b.norm)
+
+
+class ResponseCache:
+    """
+    LRU map bounded by `max_entries`, with entries expiring `ttl` seconds
+    after they are stored. `similarity` < 1 enables nearest-neighbour matching
+    for utterances of at most `max_words` words, over the `scan_limit` most
+    recently used entries of the bucket. Stages in `skip_stages` are never
+    cached (replies there depend on details the key doesn't capture).
+    """
+
+    max_words = 12
+    scan_limit = 128
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_entries: int = 5000,
+        ttl: float = 3600.0,
+        similarity: float = 0.92,
+        skip_stages: Iterable[SalesStage] = (),
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.skip_stages: FrozenSet[SalesStage] = frozenset(skip_stages)
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        # Per-bucket recency order of the keys that take part in similarity search
+        self._buckets: Dict[Tuple[str, str, str, str], "OrderedDict[CacheKey, None]"] = {}
+
+    @classmethod
+    def from_settings(cls, settings) -> "ResponseCache":
+        return cls(
+            enabled=settings.RESPONSE_CACHE,
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl=settings.RESPONSE_CACHE_TTL,
+            similarity=settings.RESPONSE_CACHE_SIMILARITY,
+            skip_stages=[SalesStage(s.strip()) for s in settings.RESPONSE_CACHE_SKIP_STAGES.split(",") if s.strip()],
+        )
+
+    def key(self, purpose: str, stage: SalesStage, prompt: str, user_text: str, reply: str = "") -> Optional[CacheKey]:
+        """
+        The cache key for a turn answering the agent's previous `reply`, or
+        None if this turn must not use the cache.
+        """
+        if not self.enabled or stage in self.skip_stages:
+            return None
+        text = normalize(user_text)
+        if not text:
+            return None
+        return CacheKey((purpose, stage.value, prompt, prompt_hash(reply)), text)
+
+    def get(self, key: Optional[CacheKey]) -> Optional[Any]:
+        if key is None:
+            return None
+        purpose = key.bucket[0]
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        match = "exact"
+        if entry is not None and entry.expires <= now:
+            self._remove(key)
+            entry = None
+        if entry is None and self.similarity < 1.0:
+            key, entry = self._nearest(key, now)
+            match = "semantic"
+        if entry is None:
+            metrics.incr("response_cache_misses", purpose=purpose)
+            return None
+        self._touch(key)
+        metrics.incr("response_cache_hits", purpose=purpose, match=match)
+        return entry.value
+
+    def put(self, key: Optional[CacheKey], value: Any):
+        if key is None:
+            return
+        searchable = self.similarity < 1.0 and len(key.text.split()) <= self.max_words
+        vector = embed(key.text) if searchable else None
+        self._entries[key] = _Entry(value, time.monotonic() + self.ttl, vector)
+        self._touch(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            metrics.incr("response_cache_evictions")
+
+    def clear(self):
+        self._entries.clear()
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _touch(self, key: CacheKey):
+        self._entries.move_to_end(key)
+        if self._entries[key].vector is not None:
+            bucket = self._buckets.setdefault(key.bucket, OrderedDict())
+            bucket[key] = None
+            bucket.move_to_end(key)
+
+    def _remove(self, key: CacheKey):
+        self._entries.pop(key, None)
+        bucket = self._buckets.get(key.bucket)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[key.bucket]
+
+    def _nearest(self, key: CacheKey, now: float) -> Tuple[CacheKey, Optional[_Entry]]:
+        bucket = self._buckets.get(key.bucket)
+        if not bucket or len(key.text.split()) > self.max_words:
+            return key, None
+        vector = embed(key.text)
+        if vector is None:
+            return key, None
+        best, best_score = None, self.similarity
+        for i, candidate in enumerate(reversed(bucket)):
+            if i >= self.scan_limit:
+                break
+            other = self._entries[candidate].vector
+            if other.negations != vector.negations:
+                continue
+            score = _cosine(vector, other)
+            if score >= best_score:
+                best, best_score = candidate, score
+        if best is None:
+            return key, None
+        entry = self._entries[best]
+        if entry.expires <= now:
+            self._remove(best)
+            return key, None
+        return best, entry
+
+
+def _build() -> ResponseCache:
+    from app.config import settings
+    return ResponseCache.from_settings(settings)
+
+
+response_cache = _build()
+metrics.gauge_callback("response_cache_entries", lambda: len(response_cache) if response_cache.enabled else None)
@@ -1,29 +1,44 @@
 import asyncio
-from typing import List, Tuple, Dict, Any
+import contextlib
+from dataclasses import dataclass, field
+from typing import List, Tuple, Dict, Any, AsyncIterator, Optional
 
 from app.agent.base_agent import BaseAgent
-import app.agent.memory as memory
 from app.agent.stages import SalesStage
-from app.agent.transitions import ALLOWED_TRANSITIONS
-from app.agent.prompts import (
-    BASE_AGENT_PROMPT,
-    VOICE_CONVERSATION_WRAPPER,
-    STAGE_PROMPTS,
-    PRICING_GATE_MODIFIER,
-    SEMANTIC_LOCK_MODIFIER,
-    NUDGE_MODIFIER,
-    CLOSING_STEP_MODIFIER,
-    BEHAVIORAL_REFINEMENT_PROMPT,
-)
-from app.agent.analyzer import analyzer
-from app.agent.intelligence import (
-    EXIT_CONDITIONS, 
-    PRICING_GATE_METADATA_KEY, 
-    SESSION_END_KEY, 
-    ALLOWED_ADVANCE_INTENTS
-)
-from app.services.cerebras import cerebras_service
-from app.logging import logger
+from app.agent.prompt_compiler import prompt_compiler
+from app.agent.analyzer import DEFAULT_ANALYSIS
+from app.agent.history import history_manager
+from app.agent.intelligence import PRICING_GATE_METADATA_KEY, SESSION_END_KEY
+from app.agent.reply_length import reply_length
+from app.agent.response_cache import CacheKey, previous_reply, prompt_hash, response_cache
+from app.agent.stage_machine import stage_machine
+from app.services.resilience import llm_session
+from app.config import settings
+from app.container import services
+from app.logging import log_category, logger, set_log_context
+from app.utils.metrics import metrics
+from app.utils.errors import LLMError
+from app.utils import streams
+from app.utils.tracing import TurnTrace
+
+# High-volume per-turn lines, sampled per LOG_SAMPLE
+guardrail_log = log_category("guardrail")
+flow_log = log_category("flow")
+turn_log = log_category("turn")
+
+
+@dataclass
+class PendingReply:
+    """A generated reply whose memory write and stage advance wait on its delivery."""
+    stage: SalesStage
+    analysis: Dict[str, Any]
+    parts: List[str] = field(default_factory=list)
+    # False for holding phrases and replies cut off mid-generation
+    advance: bool = True
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
 
 
 class SalesAgent(BaseAgent):
@@ -32,191 +47,396 @@ class SalesAgent(BaseAgent):
     Backend controls flow — LLM only generates language.
     """
 
+    def __init__(self):
+        # Voice replies awaiting their playback outcome, by session
+        self._pending: Dict[str, PendingReply] = {}
+
     def prepare_payload(self, session_id: str) -> Tuple[str, SalesStage]:
         """
         Calculates the correct system prompt and current stage based on memory.
         Applies guardrails, semantic locks, pricing gates, and nudges.
         """
         # ---------- Metadata ----------
-        mode = memory.session_memory.get_metadata(session_id, "mode")
-        current_stage = memory.session_memory.get_metadata(session_id, "stage")
-        value_presented = memory.session_memory.get_metadata(session_id, PRICING_GATE_METADATA_KEY) or False
-        is_locked = memory.session_memory.get_metadata(session_id, SESSION_END_KEY) or False
-        
-        # Ensure current_stage is a SalesStage enum
-        if isinstance(current_stage, str):
-            current_stage = SalesStage(current_stage)
+        meta = services.session_memory.state(session_id)
+        current_stage = meta.stage
+        value_presented = meta.value_presented or False
+        is_locked = meta.session_locked or False
+
+        # ---------- Guardrail: Stalling Nudge (flow's nudge policy) ----------
+        turns = meta.turns_in_stage
+        nudge = stage_machine.nudge(meta.mode, current_stage, turns)
+        if nudge:
+            guardrail_log.info("[Guardrail] Stalling detected (Turn {}) in {}. Nudging.", turns, current_stage.value)
+        elif nudge is False:
+            guardrail_log.info("[Guardrail] Max nudges reached for {}. Silence on nudge.", current_stage.value)
 
-        # ---------- Guardrail: Stalling Nudge (Max 2) ----------
-        turns = memory.session_memory.turns_in_stage(session_id)
-        nudge_text = ""
-        # Only nudge on the first 2 "stalled" turns (e.g. Turn 3 and 4)
-        if 2 < turns <= 4 and current_stage != SalesStage.CLOSING:
-            logger.info(f"[Guardrail] Stalling detected (Turn {turns}) in {current_stage.value}. Nudging.")
-            nudge_text = NUDGE_MODIFIER.format(goal=STAGE_PROMPTS.get(current_stage, ""))
-        elif turns > 4 and current_stage != SalesStage.CLOSING:
-            logger.info(f"[Guardrail] Max nudges reached for {current_stage.value}. Silence on nudge.")
-
-        # ---------- Context Injection ----------
-        # Fetch all relevant metadata to keep the prompt context-aware
-        role = memory.session_memory.get_metadata(session_id, "role")
-        company = memory.session_memory.get_metadata(session_id, "company")
-        pain_points = memory.session_memory.get_metadata(session_id, "pain_points")
-        
-        context_summary = f"\n[USER CONTEXT]\n- Role: {role or 'Unknown'}\n- Company: {company or 'Unknown'}\n- Identified Pain Points: {pain_points or 'None yet'}"
-        
         # ---------- Prompt Generation ----------
-        system_prompt = BASE_AGENT_PROMPT + context_summary
-        
-        # Add stage-specific precision
-        stage_instruction = STAGE_PROMPTS.get(current_stage, "")
-        
-        # Add Semantic Lock
-        system_prompt += SEMANTIC_LOCK_MODIFIER.format(
-            stage=current_stage.value,
-            goal=stage_instruction
+        # Static prefix (persona, semantic lock, pricing gate, nudge, closing,
+        # behavior rules) is precompiled; only the user context is per-turn.
+        system_prompt = prompt_compiler.compile(
+            current_stage,
+            locked=bool(is_locked),
+            nudge=bool(nudge),
+            role=meta.role,
+            company=meta.company,
+            pain_points=meta.pain_points,
+            value_presented=value_presented,
         )
-        
-        # Add Pricing Gate
-        system_prompt += f"\nValue Presented: {value_presented}"
-        system_prompt += PRICING_GATE_MODIFIER
-
-        # Add Nudge if stalling
-        if nudge_text:
-            system_prompt += nudge_text
-
-        # Handle Session Lock
-        if is_locked:
-            system_prompt += CLOSING_STEP_MODIFIER
-
-        # Add Behavioral Refinement
-        system_prompt += f"\n\n{BEHAVIORAL_REFINEMENT_PROMPT}"
 
-        system_prompt += f"\n\n{VOICE_CONVERSATION_WRAPPER}"
-
-        
         return system_prompt, current_stage
 
     def update_memory(self, session_id: str, role: str, content: str):
         """Update session memory with a new message."""
-        memory.session_memory.add_message(session_id, role, content)
+        services.session_memory.add_message(session_id, role, content)
 
     def advance_logic(self, session_id: str, current_stage: SalesStage, analysis: Dict[str, Any]):
         """
-        Determines if we should advance based on analyzer recommendation, intents, and exit conditions.
-        Implements smart jumping for high-priority intents.
+        Applies the session's flow (by `mode`) to this turn's analysis: smart
+        jumps, guarded advances, or locking the session at the terminal stage.
         """
-        if current_stage == SalesStage.CLOSING:
-            # If meeting is locked, lock the session
-            if memory.session_memory.get_metadata(session_id, "meeting_locked"):
-                logger.info("[Flow] Meeting locked. Locking session.")
-                memory.session_memory.set_metadata(session_id, SESSION_END_KEY, True)
-            return
+        meta = services.session_memory.state(session_id)
+        step = stage_machine.step(meta.mode, current_stage, analysis, meta)
+        flow_log.info("[Flow] {}", step.reason)
+        if step.lock and not meta.session_locked:
+            services.session_memory.set_metadata(session_id, SESSION_END_KEY, True)
+        if step.to is not None:
+            self._advance_stage(session_id, current_stage, step.to)
 
-        intent = analysis.get("intent")
-        should_advance = analysis.get("recommended_action") == "advance"
-        
-        # 1. Verification: Is the intent allowed for advancing?
-        allowed_intents = ALLOWED_ADVANCE_INTENTS.get(current_stage, set())
-        if should_advance and intent not in allowed_intents:
-            logger.info(f"[Flow] Intent '{intent}' not in advance list for {current_stage.value}. Blocking advance.")
-            should_advance = False
-
-        # 2. Verify all exit conditions for the current stage are met in metadata
-        required_info = EXIT_CONDITIONS.get(current_stage, [])
-        for field in required_info:
-            val = memory.session_memory.get_metadata(session_id, field)
-            if not val:
-                logger.info(f"[Flow] Missing required info '{field}' for stage {current_stage.value}. Staying.")
-                should_advance = False
-                break
-
-        # 3. Smart Jumping Logic (Override transition flow)
-        target_stage = None
-        if current_stage == SalesStage.GREETING:
-            if intent == "pricing_query":
-                logger.info("[Flow] Smart Jump: GREETING -> QUALIFICATION (via pricing query)")
-                target_stage = SalesStage.QUALIFICATION
-            elif intent == "sharing_pain":
-                logger.info("[Flow] Smart Jump: GREETING -> PROBLEM (via sharing pain)")
-                target_stage = SalesStage.PROBLEM
-            elif intent == "affirmation":
-                logger.info("[Flow] Smart Jump: GREETING -> QUALIFICATION (via affirmation)")
-                target_stage = SalesStage.QUALIFICATION
-
-        if should_advance or target_stage:
-            self._advance_stage(session_id, current_stage, target_stage=target_stage)
-        else:
-            logger.info(f"[Flow] Stage Lock: Staying in {current_stage.value}.")
+    def apply_analysis(self, session_id: str, analysis: Dict[str, Any]):
+        """Writes analyzer-extracted info into session metadata."""
+        for key, val in analysis.get("extracted_info", {}).items():
+            if val is not None:
+                services.session_memory.set_metadata(session_id, key, val)
+                # If we're providing value info, flip the pricing gate
+                if key == "value_accepted" and val is True:
+                     services.session_memory.set_metadata(session_id, PRICING_GATE_METADATA_KEY, True)
+
+    def analysis_hints(self, analysis: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Extra system instructions driven by the analysis of the current turn."""
+        hints = []
+        # Add extra instruction if intent was vague or evasive
+        if analysis.get("is_vague"):
+            hints.append({"role": "system", "content": "The user was vague or evasive. Gently but firmly ask for the missing information before proceeding."})
+            
+        if analysis.get("intent") == "curiosity":
+            hints.append({"role": "system", "content": "The user is curious about what you do. Briefly and humanly explain our value (AI that handles sales calls) before shifting back to your stage goal."})
+        return hints
+
+    async def _analyze(self, session_id: str, text: str, history: list, current_stage: SalesStage, pending=None) -> Dict[str, Any]:
+        if not text:
+            return dict(DEFAULT_ANALYSIS, extracted_info={}, is_vague=False)
+        try:
+            pending = pending or services.analyzer.begin(text, history, current_stage)
+            analysis = await pending.result()
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"[Analyzer] session={session_id} analysis failed: {e}")
+            return dict(DEFAULT_ANALYSIS, extracted_info={}, is_vague=False)
+        turn_log.info("[Analyzer] session={} intent={} action={}", session_id, analysis.get("intent"), analysis.get("recommended_action"))
+        await services.session_memory.offload(services.session_memory.record, session_id, "analysis", analysis)
+        return analysis
+
+    async def stream_response(self, text: str, session_id: str, defer_commit: bool = False) -> AsyncIterator[str]:
+        """
+        Runs one conversational turn and yields the reply as text deltas.
+        Memory and stage updates are applied once the reply is complete; if
+        the consumer stops early only the yielded text is recorded and the
+        stage holds. With `defer_commit`, both wait for finish_reply() to
+        report what was actually spoken.
+        An empty `text` generates a reply without recording or analyzing a user turn.
+        The task driving the turn calls enter_turn() first.
+        """
+        current_stage = await services.session_memory.offload(self._open_turn, session_id, text)
+        turn = TurnTrace(session_id, current_stage.value)
+        deltas = self._run_turn(text, session_id, current_stage, turn, defer_commit)
+        error, interrupted = None, False
+        try:
+            async for delta in deltas:
+                turn.mark_first_delta()
+                yield delta
+        except GeneratorExit:
+            # The consumer stopped early (e.g. barge-in)
+            interrupted = True
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            await deltas.aclose()
+            turn.end(error, **{"turn.interrupted": interrupted})
+
+    def _open_turn(self, session_id: str, text: str) -> SalesStage:
+        """Records the user's text and returns the stage the turn starts in."""
+        # A reply whose playback outcome never arrived is taken as delivered
+        pending = self._pending.pop(session_id, None)
+        if pending is not None:
+            self._commit(session_id, pending)
 
-    async def generate_response(self, text: str, session_id: str) -> str:
         # 1. Update user memory
-        self.update_memory(session_id, "user", text)
+        if text:
+            self.update_memory(session_id, "user", text)
         
         # 2. Get current state
-        current_stage = memory.session_memory.get_metadata(session_id, "stage")
+        current_stage = services.session_memory.get_metadata(session_id, "stage")
         if isinstance(current_stage, str):
             current_stage = SalesStage(current_stage)
-            
-        history = memory.session_memory.get_history(session_id)
+        return current_stage
+
+    async def _run_turn(
+        self, text: str, session_id: str, current_stage: SalesStage, turn: TurnTrace, defer_commit: bool
+    ) -> AsyncIterator[str]:
+        history = await history_manager.load(session_id)
+
+        if settings.PIPELINED_ANALYSIS and text:
+            final_stage, analysis, stream = await self._speculative_turn(session_id, text, history, current_stage, turn)
+        else:
+            final_stage, analysis, stream = await self._sequential_turn(session_id, text, history, current_stage, turn)
+
+        # 6. AI Generation
+        reply = PendingReply(final_stage, analysis)
+        generation = turn.start_phase("llm.generate", **{"sales.stage": final_stage.value})
+        limit = reply_length.start(final_stage)
+        try:
+            async for delta in stream:
+                # Past the stage's word/time budget the reply ends at the next sentence boundary
+                last = limit is not None and limit.ends(delta)
+                if last:
+                    delta = limit.head
+                    if not delta:
+                        break
+                if not reply.parts:
+                    generation.add_event("first_token")
+                reply.parts.append(delta)
+                yield delta
+                if last:
+                    break
+        except LLMError as e:
+            generation.record_exception(e)
+            if reply.parts:
+                raise
+            # Upstream is down or too slow: keep the caller talking instead of
+            # going silent, and hold the stage until a real reply goes out.
+            logger.warning(f"[SalesAgent] session={session_id} generation failed ({e}). Serving holding phrase.")
+            metrics.incr("llm_holding_phrases", stage=final_stage.value)
+            reply.parts.append(settings.LLM_HOLDING_PHRASE)
+            reply.advance = False
+            await services.session_memory.offload(self._settle, session_id, reply, defer_commit)
+            yield settings.LLM_HOLDING_PHRASE
+            return
+        except (asyncio.CancelledError, GeneratorExit):
+            # Barge-in: closing the stream above cancels the HTTP request; the
+            # partial reply is recorded (or handed to finish_reply) but never advances
+            reply.advance = False
+            if reply.parts:
+                await services.session_memory.offload(self._settle, session_id, reply, defer_commit, True)
+            raise
+        finally:
+            await stream.aclose()
+            generation.end()
+        if limit is not None:
+            limit.finish()
+
+        # 7./8. Update assistant memory and advance the stage machine
+        await services.session_memory.offload(self._settle, session_id, reply, defer_commit)
 
+    def _settle(self, session_id: str, reply: PendingReply, defer_commit: bool, interrupted: bool = False):
+        if defer_commit:
+            self._pending[session_id] = reply
+        else:
+            self._commit(session_id, reply, interrupted=interrupted)
+
+    def _commit(self, session_id: str, reply: PendingReply, spoken: Optional[str] = None, interrupted: bool = False):
+        """Records the reply (or its spoken part) and runs the stage logic unless it was cut off."""
+        text = reply.text if spoken is None else spoken
+        if text:
+            self.update_memory(session_id, "assistant", text)
+        if interrupted:
+            metrics.incr("turns_interrupted", stage=reply.stage.value)
+            flow_log.info(
+                "[Flow] session={} reply interrupted after {}/{} chars. Holding {}.",
+                session_id, len(text), len(reply.text), reply.stage.value,
+            )
+        elif reply.advance:
+            self.advance_logic(session_id, reply.stage, reply.analysis)
+
+    def finish_reply(self, session_id: str, spoken: str, interrupted: bool):
+        """
+        Playback outcome of a deferred reply: records the text the caller
+        actually heard and, only if it played out, applies the stage advance.
+        No-op when nothing is pending (e.g. say() phrases, or already settled).
+        """
+        reply = self._pending.pop(session_id, None)
+        if reply is None:
+            return
+        self._commit(session_id, reply, spoken=spoken if interrupted else None, interrupted=interrupted)
+
+    def drop_reply(self, session_id: str):
+        self._pending.pop(session_id, None)
+
+    def _build_messages(self, system_prompt: str, history: list, hints: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend(history)
+        messages.extend(hints)
+        return messages
+
+    @staticmethod
+    def _generate(messages: List[Dict[str, str]], stage: SalesStage, text: str) -> AsyncIterator[str]:
+        """
+        Streams the reply, or replays a cached one for the same stage, system
+        prompt + hints, previous reply and (normalized) user text.
+        """
+        key = None
+        if response_cache.enabled:
+            model = services.model_router.route("generation", stage.value).model
+            system = prompt_hash(model, *(m["content"] for m in messages if m["role"] == "system"))
+            key = response_cache.key("generation", stage, system, text, previous_reply(messages))
+            cached = response_cache.get(key)
+            if cached is not None:
+                return _replay(cached)
+        stream = services.cerebras.stream_chat_completion(
+            messages, labels={"purpose": "generation", "stage": stage.value}, **reply_length.request_params(stage)
+        )
+        return stream if key is None else _remember_reply(stream, key)
+
+    async def _sequential_turn(
+        self, session_id: str, text: str, history: list, current_stage: SalesStage, turn: TurnTrace
+    ) -> Tuple[SalesStage, Dict[str, Any], AsyncIterator[str]]:
         # 3. Analyze Input (Intent + Info Extraction)
-        analysis = await analyzer.analyze(text, history, current_stage)
-        logger.info(f"[Analyzer] session={session_id} intent={analysis.get('intent')} action={analysis.get('recommended_action')}")
+        with turn.phase("analyzer", metric="analyzer_seconds") as span:
+            analysis = await self._analyze(session_id, text, history, current_stage)
+            span.set_attribute("analysis.intent", str(analysis.get("intent")))
 
         # 4. Update Metadata with extracted info
-        for key, val in analysis.get("extracted_info", {}).items():
-            if val is not None:
-                memory.session_memory.set_metadata(session_id, key, val)
-                # If we're providing value info, flip the pricing gate
-                if key == "value_accepted" and val is True:
-                     memory.session_memory.set_metadata(session_id, PRICING_GATE_METADATA_KEY, True)
+        await services.session_memory.offload(self.apply_analysis, session_id, analysis)
 
         # 5. Prepare Payload (Strict Prompting)
-        system_prompt, final_stage = self.prepare_payload(session_id)
-        
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(history)
+        with turn.phase("prompt_assembly", metric="prompt_assembly_seconds"):
+            system_prompt, final_stage = await services.session_memory.offload(self.prepare_payload, session_id)
+            messages = self._build_messages(system_prompt, history, self.analysis_hints(analysis))
 
-        turns = memory.session_memory.turns_in_stage(session_id)
-        logger.info(
-            f"[SalesAgent] session={session_id} stage={final_stage.value} turns={turns}"
+        turns = await services.session_memory.offload(services.session_memory.turns_in_stage, session_id)
+        turn_log.info("[SalesAgent] session={} stage={} turns={}", session_id, final_stage.value, turns)
+        return final_stage, analysis, self._generate(messages, final_stage, text)
+
+    async def _speculative_turn(
+        self, session_id: str, text: str, history: list, current_stage: SalesStage, turn: TurnTrace
+    ) -> Tuple[SalesStage, Dict[str, Any], AsyncIterator[str]]:
+        """
+        Starts generation from the previous turn's metadata while the analyzer runs.
+        The speculative reply is kept only if the analysis leaves the prompt
+        unchanged and adds no hints; otherwise it is cancelled and regenerated.
+        """
+        with turn.phase("prompt_assembly", metric="prompt_assembly_seconds", speculative=True):
+            spec_prompt, spec_stage = await services.session_memory.offload(self.prepare_payload, session_id)
+            spec_messages = self._build_messages(spec_prompt, history, [])
+
+        queue: asyncio.Queue = asyncio.Queue()
+        pump = asyncio.create_task(
+            streams.pump(self._generate(spec_messages, spec_stage, text), queue)
         )
+        pending = None
+        try:
+            with turn.phase("analyzer", metric="analyzer_seconds") as span:
+                pending = services.analyzer.begin(text, history, current_stage)
+                # Early intent can already rule the speculation out (e.g. a vague turn
+                # adds a hint), so stop paying for speculative tokens right away.
+                with contextlib.suppress(Exception):
+                    if self.analysis_hints(await pending.early()):
+                        await _cancel(pump)
+                analysis = await self._analyze(session_id, text, history, current_stage, pending)
+                span.set_attribute("analysis.intent", str(analysis.get("intent")))
+            await services.session_memory.offload(self.apply_analysis, session_id, analysis)
+            with turn.phase("prompt_assembly", metric="prompt_assembly_seconds"):
+                system_prompt, final_stage = await services.session_memory.offload(self.prepare_payload, session_id)
+                hints = self.analysis_hints(analysis)
+        except BaseException:
+            if pending is not None:
+                pending.cancel()
+            await _cancel(pump)
+            raise
 
-        # 6. AI Generation
-        # Add extra instruction if intent was vague or evasive
-        if analysis.get("is_vague"):
-            messages.append({"role": "system", "content": "The user was vague or evasive. Gently but firmly ask for the missing information before proceeding."})
-            
-        if analysis.get("intent") == "product_curiosity":
-            messages.append({"role": "system", "content": "The user is curious about what you do. Briefly and humanly explain our value (AI that handles sales calls) before shifting back to your stage goal."})
+        if system_prompt == spec_prompt and final_stage == spec_stage and not hints and not pump.cancelled():
+            metrics.incr("speculation_hits", stage=final_stage.value)
+            turn_log.info("[Pipeline] session={} speculation hit in {}", session_id, final_stage.value)
+            return final_stage, analysis, _drain_queue(queue, pump)
 
-        response = await cerebras_service.chat_completion(messages)
+        await _cancel(pump)
+        metrics.incr("speculation_misses", stage=final_stage.value)
+        turn_log.info("[Pipeline] session={} speculation miss in {}. Regenerating.", session_id, final_stage.value)
+        messages = self._build_messages(system_prompt, history, hints)
+        return final_stage, analysis, self._generate(messages, final_stage, text)
 
-        # 7. Update assistant memory
-        self.update_memory(session_id, "assistant", response)
+    @staticmethod
+    def enter_turn(session_id: str):
+        """
+        Tags the calling task for a turn of `session_id`: its upstream calls (and
+        tasks it spawns) queue under the session, and its log lines carry the
+        session and a new turn id. Call it from the task that drives the turn;
+        set inside stream_response it would stick to whichever task consumes it.
+        """
+        llm_session.set(session_id)
+        set_log_context(session_id)
 
-        # 8. Advance Stage Machine logic
-        self.advance_logic(session_id, final_stage, analysis)
+    async def generate_response(self, text: str, session_id: str) -> str:
+        # Its own task, so the turn's context ends with the turn
+        return await asyncio.create_task(self._collect(text, session_id))
 
-        return response
+    async def _collect(self, text: str, session_id: str) -> str:
+        self.enter_turn(session_id)
+        parts = [delta async for delta in self.stream_response(text, session_id)]
+        return "".join(parts)
 
-    def _advance_stage(self, session_id: str, current_stage: SalesStage, target_stage: SalesStage = None):
-        if target_stage:
-            next_stage = target_stage
-        else:
-            allowed = ALLOWED_TRANSITIONS.get(current_stage, [])
-            next_stage = allowed[0] if allowed else None
-            
-        if next_stage:
-            logger.info(f"[Transition] {current_stage.value} -> {next_stage.value}")
-            memory.session_memory.advance_stage(session_id, next_stage)
-        else:
-            logger.info(f"[Flow] End of flow reached at {current_stage.value}")
+    def _advance_stage(self, session_id: str, current_stage: SalesStage, next_stage: SalesStage):
+        logger.info("[Transition] {} -> {}", current_stage.value, next_stage.value)
+        metrics.incr("stage_transitions", from_stage=current_stage.value, to_stage=next_stage.value)
+        services.session_memory.advance_stage(session_id, next_stage)
 
     # ---------- CLI / Text Testing ----------
     def handle_text(self, text: str, session_id: str = "default") -> str:
         return asyncio.run(self.generate_response(text, session_id))
 
 
-sales_agent = SalesAgent()
+async def _replay(reply: str) -> AsyncIterator[str]:
+    yield reply
+
+
+async def _remember_reply(stream: AsyncIterator[str], key: CacheKey) -> AsyncIterator[str]:
+    """Passes the stream through and caches the reply if it completes."""
+    parts: List[str] = []
+    try:
+        async for delta in stream:
+            parts.append(delta)
+            yield delta
+    finally:
+        await stream.aclose()
+    if parts:
+        response_cache.put(key, "".join(parts))
+
+
+async def _drain_queue(queue: asyncio.Queue, pump: asyncio.Task) -> AsyncIterator[str]:
+    try:
+        while True:
+            item = await queue.get()
+            if item is streams.END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        await _cancel(pump)
+
+
+async def _cancel(task: asyncio.Task):
+    if not task.done():
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def __getattr__(name: str):
+    # The shared instance lives in app.container; built on first use
+    if name == "sales_agent":
+        return services.sales_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
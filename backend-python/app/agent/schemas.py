@@ -0,0 +1,52 @@
+from typing import List, Literal, Optional, Union
+
+from pydantic import BaseModel, field_validator
+
+ANALYZER_INTENTS = (
+    "greeting", "providing_info", "sharing_pain", "interest", "affirmation", "objection",
+    "clarification", "pricing_query", "curiosity", "evasion", "other",
+)
+
+# Fields the generation path can act on before extracted_info is complete
+EARLY_ANALYSIS_FIELDS = ("intent", "is_vague", "recommended_action")
+
+
+class ExtractedInfo(BaseModel):
+    role: Optional[str] = None
+    company: Optional[str] = None
+    pain_points: Optional[Union[str, List[str]]] = None
+    value_accepted: Optional[bool] = None
+    concerns_addressed: Optional[bool] = None
+    meeting_intent: Optional[bool] = None
+    meeting_locked: Optional[bool] = None
+
+    @field_validator("pain_points")
+    @classmethod
+    def join_pain_points(cls, value):
+        if isinstance(value, list):
+            return "; ".join(str(v) for v in value) or None
+        return value
+
+
+class AnalysisResult(BaseModel):
+    """Typed analyzer output. Unknown keys (e.g. echoed intent_definitions) are ignored."""
+
+    intent: Literal[ANALYZER_INTENTS]
+    is_vague: bool = False
+    recommended_action: Literal["stay", "advance"] = "stay"
+    extracted_info: ExtractedInfo = ExtractedInfo()
+
+    @field_validator("intent", "recommended_action", mode="before")
+    @classmethod
+    def lowercase(cls, value):
+        return value.strip().lower() if isinstance(value, str) else value
+
+
+class BatchAnalysisItem(AnalysisResult):
+    id: Union[str, int]
+
+
+class BatchAnalysisResult(BaseModel):
+    """Analyzer output for a batch of conversations; items are validated one by one."""
+
+    results: List[BatchAnalysisItem]
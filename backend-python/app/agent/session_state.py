@@ -0,0 +1,105 @@
+"""
+Typed metadata of one session, as held by the in-process store.
+
+A metadata dict per session pays for a hash table sized for its keys, and
+every read falls back to the defaults for keys never written. Here the
+fields the agent reads each turn are __slots__, with their defaults set
+when the session is created. Other keys (client-supplied, or added later)
+go to `extra`, which is only allocated when used. It reads and writes like
+the dict it replaces (`get`, `[]`, `update`, `keys`), so the store and
+the event log treat both the same.
+"""
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from app.agent.schemas import ExtractedInfo
+from app.agent.stages import SalesStage
+
+# Always present, with these values until written
+DEFAULTS: Dict[str, Any] = {
+    "stage": SalesStage.GREETING,
+    "mode": "SDR",
+    "intent": None,
+    "turns_in_stage": 0,
+}
+
+# Everything the analyzer extracts (the flows' exit conditions draw on these), plus
+# the pricing gate / session lock flags, the history summary and the API's created_at
+FIELDS = (
+    *DEFAULTS,
+    *ExtractedInfo.model_fields,
+    "value_presented",
+    "session_locked",
+    "history_summary",
+    "history_summarized",
+    "created_at",
+)
+_FIELD_SET = frozenset(FIELDS)
+_OPTIONAL = tuple(name for name in FIELDS if name not in DEFAULTS)
+
+
+class SessionState:
+    """A None field counts as unset: it reads as the default and is left out of keys()."""
+
+    __slots__ = (*FIELDS, "extra")
+
+    def __init__(self, values: Optional[Mapping[str, Any]] = None):
+        self.stage = SalesStage.GREETING
+        self.mode = "SDR"
+        self.intent = None
+        self.turns_in_stage = 0
+        for name in _OPTIONAL:
+            setattr(self, name, None)
+        self.extra: Optional[Dict[str, Any]] = None
+        if values:
+            self.update(values)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+        elif self.extra is not None:
+            value = self.extra.get(key)
+        else:
+            value = None
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None and key not in DEFAULTS:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        if key in _FIELD_SET:
+            # Remote stores and the event log round-trip the stage as its string value
+            if key == "stage" and type(value) is str:
+                value = SalesStage(value)
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in DEFAULTS or self.get(key) is not None
+
+    def update(self, values: Mapping[str, Any]):
+        for key, value in values.items():
+            self[key] = value
+
+    def keys(self) -> Iterator[str]:
+        for name in FIELDS:
+            if name in DEFAULTS or getattr(self, name) is not None:
+                yield name
+        if self.extra:
+            yield from (key for key, value in self.extra.items() if value is not None)
+
+    __iter__ = keys
+
+    def items(self) -> Iterator:
+        return ((key, self.get(key)) for key in self.keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"SessionState({self.to_dict()!r})"
@@ -0,0 +1,249 @@
+"""
+Stage-machine engine: compiles the declarative flows in app.agent.flows into
+per-stage dispatch tables and evaluates one turn with dict lookups only.
+
+    python -m app.agent.stage_machine     # validation report for every flow
+"""
+import json
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from app.agent.flows import DEFAULT_MODE, FLOWS
+from app.agent.schemas import ANALYZER_INTENTS, ExtractedInfo
+from app.agent.stages import SalesStage
+from app.logging import logger
+
+# Metadata fields a guard can test: whatever the analyzer extracts, plus flags the agent sets
+GUARD_FIELDS = frozenset(ExtractedInfo.model_fields) | {"value_presented"}
+
+
+class FlowError(ValueError):
+    """A flow definition that can't be compiled."""
+
+
+class Step(NamedTuple):
+    """Outcome of one turn: the stage to move to (None: stay) and whether to lock the session."""
+    to: Optional[SalesStage]
+    lock: bool
+    reason: str
+
+
+_UNKNOWN_INTENT = (None, Step(None, False, "Unknown intent. Blocking advance."))
+
+
+class _Stage:
+    """A compiled stage. Every possible Step is built here, so evaluating a turn allocates nothing."""
+
+    __slots__ = ("stage", "next", "requires", "terminal", "nudge", "dispatch", "stay", "advance", "lock", "blocked_on")
+
+    def __init__(self, stage: SalesStage, next_stage: Optional[SalesStage], requires: Tuple[str, ...],
+                 terminal: bool, nudge: bool, jumps: Dict[str, SalesStage], advance_intents: FrozenSet[str]):
+        self.stage = stage
+        self.next = next_stage
+        self.requires = requires
+        self.terminal = terminal
+        self.nudge = nudge
+        name = stage.value
+        self.stay = Step(None, False, f"Stage Lock: Staying in {name}.")
+        self.lock = Step(None, True, f"{name} complete. Locking session.")
+        if next_stage is None:
+            self.advance = Step(None, False, f"End of flow reached at {name}")
+        else:
+            self.advance = Step(next_stage, False, f"Advancing {name} -> {next_stage.value}")
+        self.blocked_on = {
+            field: Step(None, False, f"Missing required info '{field}' for stage {name}. Staying.") for field in requires
+        }
+        # intent -> (jump Step, or None; Step when the intent may not advance, or None)
+        self.dispatch: Dict[str, Tuple[Optional[Step], Optional[Step]]] = {} if terminal else {
+            intent: (
+                Step(jumps[intent], False, f"Smart Jump: {name.upper()} -> {jumps[intent].value.upper()} (via {intent})")
+                if intent in jumps else None,
+                None if intent in advance_intents
+                else Step(None, False, f"Intent '{intent}' not in advance list for {name}. Blocking advance."),
+            )
+            for intent in ANALYZER_INTENTS
+        }
+
+    def missing(self, meta: Dict[str, Any]) -> Optional[Step]:
+        for field in self.requires:
+            if not meta.get(field):
+                return self.blocked_on[field]
+        return None
+
+
+class Flow:
+    """One compiled flow. Build with Flow.compile()."""
+
+    __slots__ = ("name", "initial", "stages", "nudge_from", "nudge_to", "warnings")
+
+    def __init__(self, name: str, initial: SalesStage, stages: Dict[SalesStage, _Stage],
+                 nudge_from: int, nudge_to: int, warnings: List[str]):
+        self.name = name
+        self.initial = initial
+        self.stages = stages
+        self.nudge_from = nudge_from
+        self.nudge_to = nudge_to
+        self.warnings = warnings
+
+    @classmethod
+    def compile(cls, name: str, definition: Dict[str, Any]) -> "Flow":
+        """Validates and compiles a flow. Raises FlowError on broken references; softer problems become warnings."""
+        warnings: List[str] = []
+        intents = frozenset(ANALYZER_INTENTS)
+
+        def stage_of(value: Any, where: str) -> SalesStage:
+            try:
+                return SalesStage(value)
+            except ValueError:
+                raise FlowError(f"flow '{name}': {where} refers to unknown stage '{value}'") from None
+
+        raw_stages = definition.get("stages") or {}
+        if not raw_stages:
+            raise FlowError(f"flow '{name}' has no stages")
+        declared = {stage_of(key, "stages") for key in raw_stages}
+        initial = stage_of(definition.get("initial", "greeting"), "initial")
+        if initial not in declared:
+            raise FlowError(f"flow '{name}': initial stage '{initial.value}' is not declared")
+
+        def declared_stage(value: Any, where: str) -> SalesStage:
+            stage = stage_of(value, where)
+            if stage not in declared:
+                raise FlowError(f"flow '{name}': {where} targets undeclared stage '{stage.value}'")
+            return stage
+
+        def known_intents(values, where: str) -> FrozenSet[str]:
+            unknown = sorted(set(values) - intents)
+            if unknown:
+                warnings.append(f"{where}: intents {unknown} are never emitted by the analyzer (unreachable)")
+            return frozenset(values) & intents
+
+        stages: Dict[SalesStage, _Stage] = {}
+        edges: Dict[SalesStage, List[SalesStage]] = {}
+        for key, spec in raw_stages.items():
+            stage = SalesStage(key)
+            where = f"{name}.{stage.value}"
+            terminal = bool(spec.get("terminal"))
+            next_stage = None if terminal or spec.get("next") is None else declared_stage(spec["next"], f"{where}.next")
+            requires = tuple(spec.get("requires") or ())
+            for field in requires:
+                if field not in GUARD_FIELDS:
+                    warnings.append(f"{where}.requires: '{field}' is never extracted or set, so this guard never passes")
+            advance = known_intents(spec.get("advance_intents") or (), f"{where}.advance_intents")
+            raw_jumps = spec.get("jumps") or {}
+            known_jumps = known_intents(raw_jumps, f"{where}.jumps")
+            jumps = {intent: declared_stage(target, f"{where}.jumps.{intent}") for intent, target in raw_jumps.items() if intent in known_jumps}
+            if terminal and (advance or jumps):
+                warnings.append(f"{where}: terminal stage ignores advance_intents/jumps")
+            if not terminal and next_stage is None and not jumps:
+                warnings.append(f"{where}: dead end (no next, no jumps, not terminal)")
+            if not terminal and next_stage is not None and not advance:
+                warnings.append(f"{where}: no advance_intents, so 'next' is never taken")
+
+            stages[stage] = _Stage(stage, next_stage, requires, terminal, spec.get("nudge", True), jumps, advance)
+            edges[stage] = ([next_stage] if next_stage else []) + list(jumps.values())
+
+        # Stages no path from `initial` reaches
+        seen, frontier = {initial}, [initial]
+        while frontier:
+            for target in edges[frontier.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    frontier.append(target)
+        for stage in sorted(declared - seen, key=list(SalesStage).index):
+            warnings.append(f"{name}.{stage.value}: unreachable from '{initial.value}'")
+
+        nudge = definition.get("nudge") or {}
+        after = int(nudge.get("after_turns", 2))
+        return cls(name, initial, stages, after, after + int(nudge.get("max_nudges", 0)), warnings)
+
+
+class StageMachine:
+    """Flows by session `mode`, compiled once; unknown modes use the default flow."""
+
+    def __init__(self, definitions: Dict[str, Dict[str, Any]], default_mode: str = DEFAULT_MODE):
+        self.flows = {mode.lower(): Flow.compile(mode.lower(), d) for mode, d in definitions.items()}
+        if default_mode not in self.flows:
+            raise FlowError(f"default flow '{default_mode}' is not defined")
+        self.default = self.flows[default_mode]
+        # Raw `mode` values seen so far (any casing, None) -> flow
+        self._by_mode: Dict[Optional[str], Flow] = {}
+
+    @classmethod
+    def from_settings(cls, settings) -> "StageMachine":
+        definitions = dict(FLOWS)
+        if settings.FLOW_DEFINITIONS_PATH:
+            with open(settings.FLOW_DEFINITIONS_PATH) as f:
+                definitions.update(json.load(f))
+        machine = cls(definitions)
+        for flow in machine.flows.values():
+            for warning in flow.warnings:
+                logger.warning(f"[Flow] {warning}")
+        if settings.FLOW_STRICT and any(flow.warnings for flow in machine.flows.values()):
+            raise FlowError("flow validation failed (FLOW_STRICT)")
+        return machine
+
+    def flow(self, mode: Optional[str]) -> Flow:
+        flow = self._by_mode.get(mode)
+        if flow is None:
+            flow = self.flows.get(mode.lower()) if mode else None
+            if flow is None:
+                logger.warning(f"[Flow] Unknown mode '{mode}'. Using the '{self.default.name}' flow.")
+                flow = self.default
+            # `mode` comes from clients; don't let arbitrary values grow the cache
+            if len(self._by_mode) < 256:
+                self._by_mode[mode] = flow
+        return flow
+
+    def step(self, mode: Optional[str], stage: SalesStage, analysis: Dict[str, Any], meta: Dict[str, Any]) -> Step:
+        """Evaluates one turn from the analysis and the (post-analysis) metadata snapshot."""
+        node = self.flow(mode).stages.get(stage)
+        if node is None:
+            return Step(None, False, f"Stage {stage.value} is not part of this flow. Staying.")
+        if node.terminal:
+            return node.stay if node.missing(meta) else node.lock
+
+        intent = analysis.get("intent")
+        jump, blocked = node.dispatch.get(intent, _UNKNOWN_INTENT)
+        if jump is not None:
+            return jump
+        if analysis.get("recommended_action") != "advance":
+            return node.stay
+        if blocked is not None:
+            return blocked
+        return node.missing(meta) or node.advance
+
+    def nudge(self, mode: Optional[str], stage: SalesStage, turns: int) -> Optional[bool]:
+        """True to nudge this turn, False once the stage's nudges are used up, None if not stalled."""
+        flow = self.flow(mode)
+        node = flow.stages.get(stage)
+        if node is None or not node.nudge or turns <= flow.nudge_from:
+            return None
+        return turns <= flow.nudge_to
+
+
+def _build() -> StageMachine:
+    from app.config import settings
+    return StageMachine.from_settings(settings)
+
+
+stage_machine = _build()
+
+
+def main():
+    from app.config import settings
+    definitions = dict(FLOWS)
+    if settings.FLOW_DEFINITIONS_PATH:
+        with open(settings.FLOW_DEFINITIONS_PATH) as f:
+            definitions.update(json.load(f))
+    for mode, definition in definitions.items():
+        try:
+            flow = Flow.compile(mode.lower(), definition)
+        except FlowError as e:
+            print(f"{mode}: ERROR {e}")
+            continue
+        print(f"{mode}: {len(flow.stages)} stages, {len(flow.warnings)} warning(s)")
+        for warning in flow.warnings:
+            print(f"  - {warning}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,8 @@
+from app.agent.flows import SDR_FLOW
 from app.agent.stages import SalesStage
 
+# Regular (non-jump) transitions of the default flow; see app.agent.flows
 ALLOWED_TRANSITIONS = {
-    SalesStage.GREETING: [SalesStage.QUALIFICATION],
-    SalesStage.QUALIFICATION: [SalesStage.PROBLEM],
-    SalesStage.PROBLEM: [SalesStage.SOLUTION],
-    SalesStage.SOLUTION: [SalesStage.OBJECTION],
-    SalesStage.OBJECTION: [SalesStage.CLOSING],
-    SalesStage.CLOSING: [],
+    SalesStage(stage): [SalesStage(spec["next"])] if spec.get("next") else []
+    for stage, spec in SDR_FLOW["stages"].items()
 }
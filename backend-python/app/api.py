@@ -0,0 +1,200 @@
+"""
+Async HTTP API for the Python core, matching the routes the Node gateway
+(backend-node/server.js) proxies to via PYTHON_AI_URL.
+
+    python -m app.api            # uvicorn, API_WORKERS processes
+"""
+import asyncio
+import contextlib
+import json
+import uuid
+import weakref
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.agent.intelligence import EXIT_CONDITIONS
+from app.agent.stages import SalesStage
+from app.config import settings
+from app.container import services
+from app.logging import logger
+from app.utils.metrics import metrics
+from app.utils.tracing import setup_tracing
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_: FastAPI):
+    setup_tracing()
+    # Build the agent at startup rather than on the first request
+    services.warm()
+    await services.cerebras.warm()
+    yield
+    await services.cerebras.aclose()
+
+
+app = FastAPI(title="AI Sales Agent - Python Core", lifespan=lifespan)
+
+# Turns for the same session run one at a time so history and stage stay
+# consistent; different sessions run concurrently on the event loop.
+# Weak values: a lock lives only while a turn holds or waits on it.
+_session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _session_lock(session_id: str) -> asyncio.Lock:
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = _session_locks[session_id] = asyncio.Lock()
+    return lock
+
+
+async def _restore_session(session_id: str):
+    """Rebuilds a session the store no longer has (restart, eviction) from the event log."""
+    memory = services.session_memory
+    events = memory.events
+    if events is None or await memory.offload(memory.has_session, session_id):
+        return
+    # A new session has no snapshot; don't wait on a flush of the log to find that out
+    if not events.has_snapshot(session_id):
+        return
+    state = await asyncio.to_thread(events.recover, session_id)
+    if state is not None:
+        await memory.offload(memory.restore, session_id, *state)
+        logger.info(f"[API] session={session_id} recovered from the event log")
+
+
+class NewSessionRequest(BaseModel):
+    custom_prompt: Optional[str] = None
+    mode: Optional[str] = None
+
+
+class MessageRequest(BaseModel):
+    # Stripped before the length checks, so whitespace-only text is a 422
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    text: str = Field(min_length=1, max_length=1000)
+    session_id: str = Field(min_length=1)
+
+
+def _session_info(session_id: str) -> Dict[str, Any]:
+    meta = services.session_memory.get_metadata_snapshot(session_id)
+    history = services.session_memory.get_history(session_id)
+    required = EXIT_CONDITIONS[SalesStage.QUALIFICATION]
+    return {
+        "session_id": session_id,
+        "created_at": meta.get("created_at"),
+        "message_count": len(history),
+        "stage": meta["stage"].value,
+        "qualification": {
+            "role": meta.get("role"),
+            "company": meta.get("company"),
+            "pain_points": meta.get("pain_points"),
+        },
+        "qualification_complete": all(meta.get(field) for field in required),
+    }
+
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy", "service": "python-ai", "timestamp": datetime.now(timezone.utc).isoformat()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint. Each API worker process keeps its own registry."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/session/new")
+async def new_session(payload: Optional[NewSessionRequest] = None):
+    session_id = str(uuid.uuid4())
+    memory = services.session_memory
+    await memory.offload(memory.set_metadata, session_id, "created_at", datetime.now(timezone.utc).isoformat())
+    if payload and payload.mode:
+        await memory.offload(memory.set_metadata, session_id, "mode", payload.mode)
+    return {"success": True, "session_id": session_id, "message": "New session created"}
+
+
+@app.post("/message")
+async def message(request: MessageRequest):
+    async with _session_lock(request.session_id):
+        await _restore_session(request.session_id)
+        response = await services.sales_agent.generate_response(request.text, request.session_id)
+        info = await services.session_memory.offload(_session_info, request.session_id)
+    return {
+        "success": True,
+        "response": response,
+        "session_id": request.session_id,
+        "stage": info["stage"],
+        "qualification": info["qualification"],
+        "qualification_complete": info["qualification_complete"],
+        "message_count": info["message_count"],
+    }
+
+
+@app.post("/message/stream")
+async def message_stream(request: MessageRequest):
+    """Server-sent events: one `delta` event per text chunk, then a `done` event with the session state."""
+
+    async def events():
+        # Iterated by the response's own task, which drives the turn
+        services.sales_agent.enter_turn(request.session_id)
+        async with _session_lock(request.session_id):
+            await _restore_session(request.session_id)
+            try:
+                async for delta in services.sales_agent.stream_response(request.text, request.session_id):
+                    yield f"event: delta\ndata: {json.dumps({'text': delta})}\n\n"
+            except Exception as e:
+                logger.error(f"[API] session={request.session_id} stream failed: {e}")
+                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+                return
+            info = await services.session_memory.offload(_session_info, request.session_id)
+        yield f"event: done\ndata: {json.dumps(info)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/session/{session_id}")
+async def get_session(session_id: str):
+    await _restore_session(session_id)
+    memory = services.session_memory
+    if not await memory.offload(memory.has_session, session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"success": True, **await memory.offload(_session_info, session_id)}
+
+
+@app.delete("/session/{session_id}")
+async def delete_session(session_id: str):
+    await _restore_session(session_id)
+    memory = services.session_memory
+    if not await memory.offload(memory.has_session, session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    await memory.offload(memory.clear_session, session_id)
+    return {"success": True, "session_id": session_id, "message": "Session deleted"}
+
+
+def run():
+    import uvicorn
+
+    # Workers are separate processes: share sessions with SESSION_STORE=redis
+    if settings.API_WORKERS > 1 and settings.SESSION_STORE == "memory":
+        logger.warning("API_WORKERS > 1 with SESSION_STORE=memory: sessions are not shared between workers")
+    uvicorn.run(
+        "app.api:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=settings.API_WORKERS,
+        loop="auto",
+        http="auto",
+        timeout_keep_alive=30,
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,4 @@
+from app.audio.chunker import SegmentedSynthesis, SentenceChunker
+from app.audio.phrase_cache import FillerPolicy, PhraseCache
+
+__all__ = ["FillerPolicy", "PhraseCache", "SegmentedSynthesis", "SentenceChunker"]
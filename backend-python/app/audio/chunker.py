@@ -0,0 +1,91 @@
+import asyncio
+from typing import AsyncIterable, AsyncIterator, Optional
+
+from livekit import rtc
+from livekit.agents import tts as lk_tts
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions
+
+from app.logging import logger
+from app.utils.metrics import metrics
+from app.utils.sentences import SentenceChunker, chunk_text
+from app.utils import streams
+
+
+class SegmentedSynthesis:
+    """
+    Sentence-chunked TTS for one reply.
+
+    Each segment is sent to `tts.synthesize` the moment the chunker closes it,
+    and audio is yielded in order. At most `lookahead` segments are queued or
+    synthesizing ahead of the one playing; past that the chunker stops
+    reading the LLM stream (backpressure). Closing the iterator (barge-in)
+    cancels in-flight syntheses and drops the queued segments.
+    """
+
+    def __init__(
+        self,
+        tts: lk_tts.TTS,
+        lookahead: int = 2,
+        clause_chars: int = 60,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ):
+        self.tts = tts
+        self.lookahead = lookahead
+        self.clause_chars = clause_chars
+        self.conn_options = conn_options
+
+    async def __call__(self, text: AsyncIterable[str]) -> AsyncIterator[rtc.AudioFrame]:
+        segments: asyncio.Queue = asyncio.Queue(maxsize=self.lookahead)
+        producer = asyncio.create_task(self._produce(text, segments))
+        current = None
+        try:
+            while (current := await segments.get()) is not streams.END:
+                if isinstance(current, BaseException):
+                    raise current
+                while (item := await current.frames.get()) is not streams.END:
+                    if isinstance(item, BaseException):
+                        raise item
+                    yield item
+        finally:
+            producer.cancel()
+            pending = [current] if isinstance(current, _Segment) else []
+            while not segments.empty():
+                item = segments.get_nowait()
+                if isinstance(item, _Segment):
+                    pending.append(item)
+            flushed = [s for s in pending if not s.task.done()]
+            for segment in pending:
+                segment.task.cancel()
+            await asyncio.wait([producer, *(s.task for s in pending)])
+            if flushed:
+                metrics.incr("tts_segments_flushed", len(flushed))
+                logger.info(f"[TTS] Reply cut off. Dropped {len(flushed)} pending segment(s).")
+
+    async def _produce(self, text: AsyncIterable[str], segments: asyncio.Queue):
+        try:
+            async for chunk in chunk_text(text, SentenceChunker(clause_chars=self.clause_chars)):
+                segment = _Segment(chunk)
+                # Blocks while `lookahead` segments are already ahead of playback
+                await segments.put(segment)
+                segment.start(self.tts, self.conn_options)
+                metrics.incr("tts_segments")
+            await segments.put(streams.END)
+        except Exception as e:
+            await segments.put(e)
+
+
+class _Segment:
+    __slots__ = ("text", "frames", "task")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.frames: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self, tts: lk_tts.TTS, conn_options: APIConnectOptions):
+        self.task = asyncio.create_task(streams.pump(self._synthesize(tts, conn_options), self.frames))
+
+    async def _synthesize(self, tts: lk_tts.TTS, conn_options: APIConnectOptions) -> AsyncIterator[rtc.AudioFrame]:
+        async with tts.synthesize(self.text, conn_options=conn_options) as stream:
+            async for event in stream:
+                yield event.frame
@@ -0,0 +1,190 @@
+import asyncio
+import contextlib
+import hashlib
+import mmap
+import os
+import random
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Optional, Sequence
+
+from livekit import rtc
+from livekit.agents import tts as lk_tts
+
+from app.logging import logger
+from app.utils.metrics import metrics
+from app.utils import streams
+
+# Frames handed to the room's audio source; 20ms is what the LiveKit TTS plugins emit
+FRAME_MS = 20
+SAMPLE_WIDTH = 2  # int16 PCM
+
+
+class PhraseCache:
+    """
+    Pre-synthesized audio for fixed utterances (greeting, fillers, holding lines).
+
+    Each phrase is rendered once per (provider, model, voice, sample rate, text)
+    and stored as headerless int16 PCM under a content-addressed path, so
+    every worker process and restart shares the same files. Reads are mmap'd:
+    playback slices frames out of the page cache without copying the file.
+    """
+
+    def __init__(self, cache_dir: str, tts: lk_tts.TTS, voice: str):
+        self.cache_dir = Path(cache_dir)
+        self.tts = tts
+        self.voice = voice
+        self.sample_rate = tts.sample_rate
+        self.num_channels = tts.num_channels
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._rendering: Dict[str, asyncio.Task] = {}
+
+    def key(self, text: str) -> str:
+        identity = "|".join((self.tts.provider, self.tts.model, self.voice, str(self.sample_rate), str(self.num_channels), text))
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def path(self, text: str) -> Path:
+        digest = self.key(text)
+        return self.cache_dir / digest[:2] / f"{digest}.pcm"
+
+    # ---------- Rendering ----------
+    async def prerender(self, phrases: Iterable[str]):
+        """Renders every phrase that isn't on disk yet; failures are logged, not raised."""
+        results = await asyncio.gather(*(self.render(p) for p in phrases), return_exceptions=True)
+        for phrase, result in zip(phrases, results):
+            if isinstance(result, Exception):
+                logger.error(f"[PhraseCache] Failed to render '{phrase}': {result!r}")
+
+    async def render(self, text: str) -> Path:
+        path = self.path(text)
+        if path.exists():
+            metrics.incr("phrase_cache_hits")
+            return path
+        # Concurrent jobs asking for the same phrase share one synthesis
+        task = self._rendering.get(text)
+        if task is None:
+            task = self._rendering[text] = asyncio.ensure_future(self._synthesize(text, path))
+            task.add_done_callback(lambda _: self._rendering.pop(text, None))
+        return await asyncio.shield(task)
+
+    async def _synthesize(self, text: str, path: Path) -> Path:
+        metrics.incr("phrase_cache_misses")
+        chunks = []
+        async with self.tts.synthesize(text) as stream:
+            async for event in stream:
+                chunks.append(bytes(event.frame.data.cast("B")))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so readers never map a partial file
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(b"".join(chunks))
+        os.replace(tmp, path)
+        logger.info(f"[PhraseCache] Rendered '{text[:40]}' -> {path.name}")
+        return path
+
+    # ---------- Playback ----------
+    def pcm(self, text: str) -> Optional[memoryview]:
+        """The phrase's PCM as a read-only view over the mmap'd file, or None if not rendered."""
+        key = self.key(text)
+        mapped = self._maps.get(key)
+        if mapped is None:
+            path = self.path(text)
+            if not path.exists() or path.stat().st_size == 0:
+                return None
+            with open(path, "rb") as f:
+                mapped = self._maps[key] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mapped)
+
+    def has(self, text: str) -> bool:
+        return self.pcm(text) is not None
+
+    async def frames(self, text: str) -> AsyncIterator[rtc.AudioFrame]:
+        """Yields the cached phrase as 20ms frames (rendering it first on a miss)."""
+        data = self.pcm(text)
+        if data is None:
+            await self.render(text)
+            data = self.pcm(text)
+        samples_per_frame = self.sample_rate * FRAME_MS // 1000
+        frame_bytes = samples_per_frame * self.num_channels * SAMPLE_WIDTH
+        for offset in range(0, len(data), frame_bytes):
+            # AudioFrame keeps the view: no copy until the room's audio source takes the frame
+            chunk = data[offset:offset + frame_bytes]
+            yield rtc.AudioFrame(
+                data=chunk,
+                sample_rate=self.sample_rate,
+                num_channels=self.num_channels,
+                samples_per_channel=len(chunk) // (self.num_channels * SAMPLE_WIDTH),
+            )
+
+    def close(self):
+        """Unmaps cached phrases; maps still referenced by frames in flight are left to the GC."""
+        for mapped in self._maps.values():
+            with contextlib.suppress(BufferError):
+                mapped.close()
+        self._maps.clear()
+
+
+class FillerPolicy:
+    """
+    Covers LLM latency with a cached filler ("Let me see.") when the first
+    reply text takes longer than `threshold` seconds. Wraps the agent's
+    tts_node: the filler's frames play straight from the cache while the real
+    reply is synthesized behind it.
+    """
+
+    def __init__(self, cache: PhraseCache, phrases: Sequence[str], threshold: float, seed: Optional[int] = None):
+        self.cache = cache
+        self.phrases = list(phrases)
+        self.threshold = threshold
+        self._rng = random.Random(seed)
+        self._last: Optional[str] = None
+
+    def pick(self) -> Optional[str]:
+        """A rendered filler, not the same one twice in a row."""
+        ready = [p for p in self.phrases if self.cache.has(p)]
+        if len(ready) > 1 and self._last in ready:
+            ready.remove(self._last)
+        if not ready:
+            return None
+        self._last = self._rng.choice(ready)
+        return self._last
+
+    async def cover(
+        self,
+        text: AsyncIterable[str],
+        synthesize: Callable[[AsyncIterable[str]], AsyncIterable[rtc.AudioFrame]],
+    ) -> AsyncIterator[rtc.AudioFrame]:
+        """Audio for `text` via `synthesize`, preceded by a filler if the first delta is late."""
+        deltas = text.__aiter__()
+        first = asyncio.ensure_future(deltas.__anext__())
+
+        async def replay() -> AsyncIterator[str]:
+            try:
+                yield await first
+            except StopAsyncIteration:
+                return
+            async for delta in deltas:
+                yield delta
+
+        try:
+            done, _ = await asyncio.wait({first}, timeout=self.threshold)
+            filler = None if done else self.pick()
+            if filler is None:
+                async for frame in synthesize(replay()):
+                    yield frame
+                return
+
+            metrics.incr("fillers_played")
+            logger.info(f"[Filler] No reply text after {self.threshold:.1f}s. Playing '{filler}'.")
+            queue: asyncio.Queue = asyncio.Queue()
+            pump = asyncio.create_task(streams.pump(synthesize(replay()), queue))
+            try:
+                async for frame in self.cache.frames(filler):
+                    yield frame
+                while (item := await queue.get()) is not streams.END:
+                    if isinstance(item, BaseException):
+                        raise item
+                    yield item
+            finally:
+                pump.cancel()
+                await asyncio.wait([pump])
+        finally:
+            first.cancel()
@@ -1,4 +1,5 @@
 import os
+from typing import Any, Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -6,19 +7,122 @@ class Settings(BaseSettings):
 
     # Cerebras
     CEREBRAS_API_KEY: str
+    CEREBRAS_BASE_URL: Optional[str] = None  # e.g. a local mock server
+    # Models (app/services/model_router.py): the default, a fallback raced in when it is slow,
+    # and per-purpose / per-stage overrides as JSON, e.g. {"analyzer": {"model": "llama3.1-8b"}}
+    LLM_MODEL: str = "llama3.3-70b"
+    LLM_FALLBACK_MODEL: str = ""
+    LLM_FALLBACK_AFTER: float = 1.0  # seconds to a response (or first token) before the fallback starts
+    LLM_ROUTES: Dict[str, Dict[str, Any]] = {}
 
-    # Cartesia
-    CARTESIA_API_KEY: str
+    # Cerebras client resilience
+    LLM_TIMEOUT: float = 20.0  # per-call deadline (seconds)
+    LLM_FIRST_TOKEN_TIMEOUT: float = 5.0  # streaming: deadline for the first delta
+    LLM_CONNECT_TIMEOUT: float = 2.0
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE: int = 20
+    LLM_KEEPALIVE_EXPIRY: float = 60.0
+    LLM_WARM_CONNECTION: bool = True
+    LLM_MAX_RETRIES: int = 2
+    LLM_BACKOFF_BASE: float = 0.2
+    LLM_BACKOFF_MAX: float = 2.0
+    LLM_HEDGING: bool = False  # fire a second request when the first exceeds the rolling percentile
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_BREAKER_FAILURES: int = 5
+    LLM_BREAKER_RESET: float = 15.0  # seconds before a half-open trial
+    LLM_HOLDING_PHRASE: str = "Sorry, give me just a second, I'm having a little trouble on my end."
+    # Client-side rate limit for Cerebras calls per process (calls/s; 0 disables), queued fairly across sessions
+    LLM_RATE_LIMIT: float = 0.0
+    LLM_RATE_BURST: float = 0.0  # calls allowed at once after an idle spell; 0 = one second's worth
 
-    # LiveKit
-    LIVEKIT_API_KEY: str
-    LIVEKIT_API_SECRET: str
-    LIVEKIT_URL: str
+    # Cartesia and LiveKit: only the voice worker needs these (its plugins and CLI report them missing)
+    CARTESIA_API_KEY: Optional[str] = None
+    LIVEKIT_API_KEY: Optional[str] = None
+    LIVEKIT_API_SECRET: Optional[str] = None
+    LIVEKIT_URL: Optional[str] = None
 
     # App
     ENV: str = "development"
     LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"  # "text" or "json" (one object per line, with session and turn)
+    LOG_ENQUEUE: bool = False  # write log lines from a background thread
+    LOG_SAMPLE: str = ""  # per-category share of sessions to log, e.g. "flow=0.1,guardrail=0.1"
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    API_WORKERS: int = 1
+
+    # LiveKit worker: max wait for a participant (and for first audio) before greeting
+    GREETING_READY_TIMEOUT: float = 10.0
+    # Admission: concurrent calls per worker (0 = no cap) and the load at which dispatch skips it
+    # (unset: LiveKit's default, 0.7 in production and off in development)
+    WORKER_MAX_SESSIONS: int = 0
+    WORKER_LOAD_THRESHOLD: Optional[float] = None
+
+    # Pre-rendered phrase audio (greeting, fillers, holding lines)
+    AUDIO_CACHE_DIR: str = ".audio_cache"
+    # Play a cached filler when no reply text arrives within FILLER_THRESHOLD seconds
+    FILLERS_ENABLED: bool = False
+    FILLER_THRESHOLD: float = 1.0
+    # Split replies at sentence/clause boundaries and synthesize each segment as it closes
+    TTS_CHUNKING: bool = True
+    TTS_LOOKAHEAD_SEGMENTS: int = 2  # segments synthesized ahead of the one playing
+    TTS_CLAUSE_CHARS: int = 60  # clause breaks only split segments at least this long
+
+    # Observability: per-turn spans are exported over OTLP/HTTP when an endpoint is set
+    OTEL_EXPORTER_OTLP_ENDPOINT: Optional[str] = None
+    OTEL_SERVICE_NAME: str = "ai-sales-agent"
+
+    # Session storage: "memory", "redis" or "sqlite"
+    SESSION_STORE: str = "memory"
+    SESSION_MAX_SESSIONS: int = 10000
+    SESSION_IDLE_TTL: float = 3600  # seconds
+    REDIS_URL: str = "redis://localhost:6379/0"
+    SESSION_SQLITE_PATH: str = "sessions.db"
+    # Append-only session event log (recovery + analytics); empty disables it
+    EVENT_LOG_DIR: str = ""
+    EVENT_LOG_SEGMENT_MB: int = 64
+    EVENT_LOG_FLUSH_INTERVAL: float = 0.2  # seconds a batch may wait before it is written
+    EVENT_LOG_SNAPSHOT_EVERY: int = 50  # events per session between snapshots
+
+    # Conversation history sent to the LLM
+    HISTORY_TOKEN_BUDGET: int = 1500
+    HISTORY_KEEP_TURNS: int = 6  # user/assistant exchanges kept verbatim
+    HISTORY_SUMMARIZE: bool = True
+
+    # Local intent pre-classifier in front of the analyzer LLM
+    INTENT_PRECLASSIFIER: bool = False
+    INTENT_PRECLASSIFIER_THRESHOLD: float = 0.85
+    # Also run the LLM on local hits (in the background) to measure agreement
+    INTENT_PRECLASSIFIER_SHADOW: bool = False
+
+    # Analyzer output handling
+    ANALYZER_RESPONSE_FORMAT: str = "json_object"  # json_object | json_schema | none
+    ANALYZER_STREAMING: bool = False  # parse incrementally, expose early fields
+    ANALYZER_MAX_RETRIES: int = 1
+    # Micro-batch analyzer calls from concurrent sessions into one request (not with ANALYZER_STREAMING)
+    ANALYZER_BATCH: bool = False
+    ANALYZER_BATCH_WINDOW_MS: float = 5.0  # how long the first request of a batch waits for company
+    ANALYZER_BATCH_MAX_SIZE: int = 8
+
+    # Cache of analyzer results and replies for repeated turns (app/agent/response_cache.py)
+    RESPONSE_CACHE: bool = False
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+    RESPONSE_CACHE_TTL: float = 3600  # seconds
+    RESPONSE_CACHE_SIMILARITY: float = 0.92  # nearest-neighbour threshold; 1.0 for exact matches only
+    RESPONSE_CACHE_SKIP_STAGES: str = "closing"  # comma-separated stages never served from the cache
+
+    # Conversation flows (app/agent/flows.py); a JSON file of {mode: flow} adds or replaces flows
+    FLOW_DEFINITIONS_PATH: str = ""
+    FLOW_STRICT: bool = False  # refuse to start on flow validation warnings
+
+    # Reply length (app/agent/reply_length.py): per-stage max_tokens, plus word and time budgets
+    # past which a reply ends at the next sentence boundary
+    REPLY_LENGTH_CONTROL: bool = True
+    REPLY_BUDGETS: Dict[str, Dict[str, Any]] = {}  # per-stage overrides, e.g. {"solution": {"max_words": 70}}
+    REPLY_STOP: List[str] = ["\nUser:", "\nuser:", "\n\n"]  # stop sequences for replies
+
+    # Agent pipeline
+    # Start generation with the previous turn's metadata while the analyzer runs
+    PIPELINED_ANALYSIS: bool = False
 
 settings = Settings()
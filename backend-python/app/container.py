@@ -0,0 +1,91 @@
+"""
+Process-wide services, built on first use.
+
+Reading `services.cerebras` (or `model_router`, `session_memory`,
+`analyzer`, `sales_agent`) imports and constructs that service the first time, then
+stores it as a plain attribute, so later reads cost no more than a module
+global. Entry points thereby load only what they use. The text CLI
+reaches its prompt before the Cerebras SDK is imported, and the LiveKit
+worker's main process, which only dispatches jobs, never builds the agent
+at all. The old module-level names (`app.services.cerebras.cerebras_service`
+and the like) still resolve, through the container.
+"""
+import threading
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from app.agent.analyzer import ConversationAnalyzer
+    from app.agent.memory import SessionMemory
+    from app.agent.sales_agent import SalesAgent
+    from app.services.cerebras import CerebrasService
+    from app.services.model_router import ModelRouter
+
+
+class service:
+    """
+    Like functools.cached_property, but builds under a lock so a background
+    warm() and a first use on another thread never build twice.
+    """
+
+    def __init__(self, build: Callable[[Any], Any]):
+        self.build = build
+        self.name = build.__name__
+        self.lock = threading.Lock()
+        self.__doc__ = build.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with self.lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.build(instance)
+        return instance.__dict__[self.name]
+
+
+class Services:
+    @service
+    def model_router(self) -> "ModelRouter":
+        from app.config import settings
+        from app.services.model_router import ModelRouter
+        return ModelRouter.from_settings(settings)
+
+    @service
+    def cerebras(self) -> "CerebrasService":
+        from app.services.cerebras import CerebrasService
+        return CerebrasService(self.model_router)
+
+    @service
+    def session_memory(self) -> "SessionMemory":
+        from app.agent.memory import SessionMemory
+        from app.utils.metrics import metrics
+        session_memory = SessionMemory()
+        metrics.gauge_callback("active_sessions", session_memory.active_sessions)
+        return session_memory
+
+    @service
+    def analyzer(self) -> "ConversationAnalyzer":
+        from app.agent.analyzer import ConversationAnalyzer
+        return ConversationAnalyzer()
+
+    @service
+    def sales_agent(self) -> "SalesAgent":
+        from app.agent.sales_agent import SalesAgent
+        return SalesAgent()
+
+    def built(self, name: str) -> bool:
+        return name in self.__dict__
+
+    def warm(self, *names: str):
+        """Builds the named services (all of them by default) now rather than on first use."""
+        for name in names or ("session_memory", "cerebras", "analyzer", "sales_agent"):
+            getattr(self, name)
+
+    def warm_in_background(self, *names: str) -> threading.Thread:
+        """warm() on a daemon thread, e.g. while a CLI waits for input."""
+        thread = threading.Thread(target=self.warm, args=names, name="services-warm", daemon=True)
+        thread.start()
+        return thread
+
+
+services = Services()
+
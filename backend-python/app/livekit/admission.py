@@ -0,0 +1,73 @@
+"""
+Admission control for the LiveKit worker.
+
+LiveKit dispatch asks each worker for its load (0..1) and stops sending it
+jobs once the load reaches `load_threshold`. The load reported here is the
+larger of CPU utilisation and the share of `max_sessions` in use, scaled
+so that `max_sessions` concurrent calls land exactly on the threshold.
+Load is only sampled periodically, so `request` also turns jobs away at
+the hard cap.
+
+Both hooks run in the worker's main process (jobs run in their own
+processes), where `AgentServer.active_jobs` lists the calls in progress.
+"""
+import threading
+from typing import Optional
+
+from livekit.agents import JobRequest
+from livekit.agents.utils.hw import get_cpu_monitor
+
+from app.logging import logger
+from app.utils.metrics import metrics
+
+
+class Admission:
+    def __init__(self, max_sessions: int = 0, load_threshold: float = 0.7, cpu_interval: float = 0.5):
+        self.max_sessions = max_sessions
+        self.load_threshold = load_threshold
+        self.cpu_interval = cpu_interval
+        self._worker = None
+        self._cpu = 0.0
+        self._sampler: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_settings(cls, settings) -> "Admission":
+        threshold = settings.WORKER_LOAD_THRESHOLD
+        return cls(settings.WORKER_MAX_SESSIONS, 0.7 if threshold is None else threshold)
+
+    def worker_options(self, settings) -> dict:
+        """WorkerOptions arguments that install these hooks."""
+        options = dict(request_fnc=self.request, load_fnc=self.load)
+        if settings.WORKER_LOAD_THRESHOLD is not None:
+            options["load_threshold"] = settings.WORKER_LOAD_THRESHOLD
+        return options
+
+    @property
+    def active(self) -> int:
+        return len(self._worker.active_jobs) if self._worker is not None else 0
+
+    def load(self, worker) -> float:
+        """`load_fnc`: called by LiveKit from an executor thread, so it never blocks on sampling."""
+        self._worker = worker
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._sample_cpu, name="admission-cpu", daemon=True)
+            self._sampler.start()
+        load = self._cpu
+        if self.max_sessions > 0:
+            load = max(load, self.load_threshold * self.active / self.max_sessions)
+        metrics.set_gauge("worker_load", load)
+        return min(load, 1.0)
+
+    async def request(self, req: JobRequest):
+        """`request_fnc`: accepts the job unless the worker is already at its session cap."""
+        if self.max_sessions > 0 and self.active >= self.max_sessions:
+            metrics.incr("worker_jobs_rejected")
+            logger.warning(f"[Admission] At capacity ({self.active}/{self.max_sessions} sessions). Rejecting job {req.id}.")
+            await req.reject(terminate=False)
+            return
+        await req.accept()
+
+    def _sample_cpu(self):
+        monitor = get_cpu_monitor()
+        while True:
+            self._cpu = monitor.cpu_percent(interval=self.cpu_interval)
@@ -1,14 +1,194 @@
+"""
+Logging setup.
+
+LOG_FORMAT=json writes one JSON object per line, tagged with the session
+and turn being handled. LOG_ENQUEUE hands lines to a writer thread so
+stdout I/O never blocks the event loop. LOG_SAMPLE keeps only a share of
+the high-volume per-turn categories (see log_category), e.g.
+"flow=0.1,guardrail=0.1".
+"""
+import atexit
+import itertools
+import json
+import queue
+import random
 import sys
+import threading
+import zlib
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, TextIO, Tuple
+
 from loguru import logger
 from app.config import settings
+from app.utils.metrics import metrics
+
+TEXT_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+
+# (session id, turn id, sampling draw) of the turn being handled; set by the agent per turn
+log_context: ContextVar[Optional[Tuple[str, int, float]]] = ContextVar("log_context", default=None)
+_turn_ids = itertools.count(1)
+
+
+def set_log_context(session_id: str):
+    """Tags log lines from here on (in this task) with the session and a new turn id."""
+    draw = zlib.crc32(session_id.encode("utf-8")) / 0xFFFFFFFF
+    log_context.set((session_id, next(_turn_ids), draw))
+
+
+class SampledLogger:
+    """
+    Logger for one high-volume category. A `rate` share of sessions keep
+    their lines (all turns of a kept session, so its flow reads end to end);
+    lines outside a turn are sampled individually. Dropped lines cost
+    neither formatting nor I/O.
+    """
+
+    __slots__ = ("category", "rate", "_logger")
+
+    def __init__(self, category: str, rate: float = 1.0):
+        self.category = category
+        self.rate = rate
+        self._logger = logger.bind(category=category).opt(depth=1)
+
+    def _keep(self) -> bool:
+        if self.rate >= 1.0:
+            return True
+        context = log_context.get()
+        if (context[2] if context is not None else random.random()) < self.rate:
+            return True
+        metrics.incr("log_lines_sampled_out", category=self.category)
+        return False
+
+    def debug(self, message: str, *args: Any):
+        if self._keep():
+            self._logger.debug(message, *args)
+
+    def info(self, message: str, *args: Any):
+        if self._keep():
+            self._logger.info(message, *args)
+
+
+_categories: Dict[str, SampledLogger] = {}
+_rates: Dict[str, float] = {}
+
+
+def log_category(category: str) -> SampledLogger:
+    """The (shared) logger for a category; its rate follows LOG_SAMPLE, default 1."""
+    sampled = _categories.get(category)
+    if sampled is None:
+        sampled = _categories[category] = SampledLogger(category, _rates.get(category, 1.0))
+    return sampled
+
+
+def _sample_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in spec.split(","):
+        if item.strip():
+            category, _, rate = item.partition("=")
+            rates[category.strip()] = float(rate)
+    return rates
+
+
+class QueueSink:
+    """
+    Sink that queues messages for a writer thread. Unlike loguru's
+    `enqueue=True` nothing is pickled, so the caller only pays for a
+    queue put; `render` (e.g. JSON encoding) runs on the writer thread.
+    """
+
+    def __init__(self, stream: TextIO, render: Callable[[Any], str] = str):
+        self.stream = stream
+        self.render = render
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def __call__(self, message):
+        self._queue.put(message)
+
+    def stop(self):
+        """Writes out what is queued and ends the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+            self.stream.write(self.render(message))
+            if self._queue.empty():
+                self.stream.flush()
+        self.stream.flush()
+
+
+def render_json(message) -> str:
+    record = message.record
+    line = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        # The formatted message, which includes the traceback if there is one
+        "message": str(message).rstrip("\n"),
+    }
+    line.update(record["extra"])
+    return json.dumps(line, default=str) + "\n"
+
+
+def _json_writer(stream: TextIO) -> Callable[[Any], None]:
+    # Flushed per line, as loguru does for a stream it writes itself, so lines aren't held in a pipe's buffer
+    def write(message):
+        stream.write(render_json(message))
+        stream.flush()
+    return write
+
+
+def _add_context(record):
+    context = log_context.get()
+    if context is not None:
+        record["extra"]["session"], record["extra"]["turn"] = context[0], context[1]
+
+
+_sink: Optional[QueueSink] = None
+
+
+def setup_logging(
+    log_format: Optional[str] = None,
+    enqueue: Optional[bool] = None,
+    sample: Optional[str] = None,
+    level: Optional[str] = None,
+    stream: TextIO = sys.stdout,
+):
+    """(Re)configures the single stdout sink; arguments override the matching settings."""
+    global _sink, _rates
+    log_format = (log_format or settings.LOG_FORMAT).lower()
+    enqueue = settings.LOG_ENQUEUE if enqueue is None else enqueue
+    level = level or settings.LOG_LEVEL
 
-def setup_logging():
     logger.remove()
-    logger.add(
-        sys.stdout,
-        colorize=True,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        level=settings.LOG_LEVEL,
-    )
+    if _sink is not None:
+        _sink.stop()
+        _sink = None
+    json_lines = log_format == "json"
+    logger.configure(patcher=_add_context if json_lines else None)
+
+    if json_lines:
+        # The "{message}" format keeps formatting on the caller down to the message itself
+        sink = QueueSink(stream, render_json) if enqueue else _json_writer(stream)
+        logger.add(sink, format="{message}", level=level)
+    else:
+        sink = QueueSink(stream) if enqueue else stream
+        logger.add(sink, colorize=True, format=TEXT_FORMAT, level=level)
+    if enqueue:
+        _sink = sink
+
+    _rates = _sample_rates(settings.LOG_SAMPLE if sample is None else sample)
+    for category, sampled in _categories.items():
+        sampled.rate = _rates.get(category, 1.0)
+
 
 setup_logging()
@@ -1,6 +1,5 @@
-from app.agent.sales_agent import sales_agent
-import app.agent.memory as memory
 from app.agent.prompts import BASE_AGENT_PROMPT
+from app.container import services
 
 BEHAVIORAL_REFINEMENT_PROMPT = """
 You are a senior human sales and customer success expert with 10+ years of experience.
@@ -48,21 +47,23 @@ Your goal is to sound unmistakably human, confident, adaptive, and effective —
 
 def run():
     session_id = "cli_test_session"
+    # Import and build the agent (Cerebras SDK included) while the user types
+    services.warm_in_background()
     
     print("\n--- ConvergsAI Hardened Sales CLI ---")
     print("Ready. Type 'exit' to quit.\n")
 
     while True:
         # Get current state for display
-        stage = memory.session_memory.get_metadata(session_id, "stage")
-        turns = memory.session_memory.turns_in_stage(session_id)
+        stage = services.session_memory.get_metadata(session_id, "stage")
+        turns = services.session_memory.turns_in_stage(session_id)
         
         user_input = input(f"[{stage.value if hasattr(stage, 'value') else stage} - Turn {turns}] User: ")
         
         if user_input.lower() == "exit":
             break
 
-        response = sales_agent.handle_text(user_input, session_id)
+        response = services.sales_agent.handle_text(user_input, session_id)
         print(f"Agent: {response}\n")
 
 if __name__ == "__main__":
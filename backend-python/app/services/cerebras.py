@@ -1,32 +1,320 @@
 import os
-from typing import List, Dict, Any, Optional
-from cerebras.cloud.sdk import AsyncCerebras
+import time
+import asyncio
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+import httpx
+from cerebras.cloud.sdk import (
+    AsyncCerebras,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+)
 from app.config import settings
 from app.logging import logger
+from app.utils.errors import LLMError
+from app.utils.metrics import metrics
+from app.utils.tokens import estimate_tokens, messages_tokens
 from app.utils.timing import timeit
+from app.services.model_router import ModelRouter, Route
+from app.services.resilience import (
+    BACKGROUND,
+    INTERACTIVE,
+    CircuitBreaker,
+    FairRateLimiter,
+    LatencyTracker,
+    backoff_delay,
+    hedged,
+    llm_session,
+)
+
+# Call purposes (the `purpose` label) that yield to live turns under the rate limit
+BACKGROUND_PURPOSES = {"summary"}
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, (APIConnectionError, APITimeoutError, asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
 
 class CerebrasService:
-    def __init__(self):
-        self.client = AsyncCerebras(api_key=settings.CEREBRAS_API_KEY)
-        self.model = "llama3.3-70b"
+    def __init__(self, router: Optional[ModelRouter] = None):
+        # One pooled keep-alive HTTP client for every call in this process
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=settings.LLM_CONNECT_TIMEOUT),
+        )
+        self.client = AsyncCerebras(
+            api_key=settings.CEREBRAS_API_KEY,
+            base_url=settings.CEREBRAS_BASE_URL,
+            http_client=self.http_client,
+            max_retries=0,  # retries are handled below, with jitter and the breaker
+            # The SDK's own warm-up opens a throwaway sync connection; warm() below
+            # opens one in the pool we actually use.
+            warm_tcp_connection=False,
+        )
+        # Model and parameters per call purpose/stage
+        self.router = router or ModelRouter.from_settings(settings)
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.LLM_BREAKER_FAILURES,
+            reset_timeout=settings.LLM_BREAKER_RESET,
+        )
+        self.latency = LatencyTracker()
+        self.first_token_latency = LatencyTracker()
+        # Shared by every call in this process; off when LLM_RATE_LIMIT is 0
+        self.limiter = None
+        if settings.LLM_RATE_LIMIT > 0:
+            self.limiter = FairRateLimiter(settings.LLM_RATE_LIMIT, settings.LLM_RATE_BURST or None)
+            metrics.gauge_callback("llm_rate_limit_waiting", lambda: self.limiter.waiting)
+
+    async def warm(self):
+        """Opens a pooled keep-alive connection (DNS + TLS) ahead of the first turn."""
+        if not settings.LLM_WARM_CONNECTION:
+            return
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.client.models.list(), timeout=settings.LLM_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Cerebras warm-up failed: {e!r}")
+            return
+        logger.debug(f"Cerebras connection warmed in {time.perf_counter() - start:.4f} seconds")
+
+    async def aclose(self):
+        await self.http_client.aclose()
+
+    def _hedge_after(self, tracker: LatencyTracker) -> Optional[float]:
+        if not settings.LLM_HEDGING:
+            return None
+        return tracker.percentile(settings.LLM_HEDGE_PERCENTILE)
+
+    def _race(self, call, route: Route, tracker: LatencyTracker, operation: str, labels: Dict[str, str], discard=None):
+        """
+        `call(model)` on the route's model. When that is slow, the route's
+        fallback model joins the race; without one, LLM_HEDGING may send a
+        duplicate to the same model. Either second request takes its own
+        rate-limit token (the first took one in _with_retries).
+        """
+        async def second(model: str):
+            if self.limiter is not None:
+                await self._throttle(labels)
+            return await call(model)
+
+        if route.fallback:
+            return hedged(
+                lambda: call(route.model),
+                route.fallback_after,
+                discard=discard,
+                on_hedge=lambda: metrics.incr("llm_fallbacks", operation=operation, **labels),
+                hedge_factory=lambda: second(route.fallback),
+            )
+        return hedged(
+            lambda: call(route.model),
+            self._hedge_after(tracker),
+            discard=discard,
+            on_hedge=lambda: metrics.incr("llm_hedges", operation=operation),
+            hedge_factory=lambda: second(route.model),
+        )
+
+    async def _throttle(self, labels: Dict[str, str]):
+        background = labels.get("purpose") in BACKGROUND_PURPOSES
+        waited = await self.limiter.acquire(BACKGROUND if background else INTERACTIVE, llm_session.get())
+        if waited:
+            metrics.observe("llm_rate_limit_wait_seconds", waited, priority="background" if background else "interactive")
+
+    async def _with_retries(self, call, operation: str, labels: Dict[str, str]):
+        """Runs `call()` under the breaker with jittered retries; raises LLMError when exhausted."""
+        self.breaker.before_call()
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            try:
+                if self.limiter is not None:
+                    await self._throttle(labels)
+                result = await call()
+            except asyncio.CancelledError:
+                self.breaker.abandon()
+                raise
+            except Exception as e:
+                retryable = _retryable(e)
+                if attempt < settings.LLM_MAX_RETRIES and retryable:
+                    delay = backoff_delay(attempt, settings.LLM_BACKOFF_BASE, settings.LLM_BACKOFF_MAX)
+                    metrics.incr("llm_retries", operation=operation)
+                    logger.warning(f"Cerebras {operation} failed ({e!r}); retry {attempt + 1} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                if not retryable:
+                    # Upstream answered (e.g. a 400); that's our bug, not an outage
+                    self.breaker.record_success()
+                elif self.breaker.record_failure():
+                    metrics.incr("llm_breaker_opens")
+                    logger.error(f"Cerebras circuit breaker opened for {settings.LLM_BREAKER_RESET:.0f}s")
+                metrics.incr("llm_failures", operation=operation)
+                logger.error(f"Cerebras API error: {e!r}")
+                raise LLMError(f"Cerebras {operation} failed: {e!r}") from e
+            self.breaker.record_success()
+            return result
 
     @timeit
     async def chat_completion(
         self, 
         messages: List[Dict[str, str]], 
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        labels: Optional[Dict[str, str]] = None,
+        stop: Optional[List[str]] = None,
     ) -> str:
-        try:
-            response = await self.client.chat.completions.create(
-                messages=messages,
-                model=self.model,
-                temperature=temperature,
-                max_tokens=max_tokens,
+        """
+        `labels` (e.g. purpose, stage) pick the model route and tag the latency
+        and token histograms, along with the model that answered.
+        """
+        extra = {"response_format": response_format} if response_format else {}
+        if stop:
+            extra["stop"] = stop
+        labels = labels or {}
+        route = self.router.route(labels.get("purpose"), labels.get("stage"))
+        temperature, max_tokens = route.params(temperature, max_tokens)
+        start = time.perf_counter()
+
+        async def once(model: str):
+            start = time.perf_counter()
+            response = await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    messages=messages,
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **extra,
+                ),
+                timeout=settings.LLM_TIMEOUT,
             )
-            return response.choices[0].message.content
+            self.latency.record(time.perf_counter() - start)
+            return response, model
+
+        async def attempt():
+            return await self._race(once, route, self.latency, "chat_completion", labels)
+
+        response, model = await self._with_retries(attempt, "chat_completion", labels)
+        labels = dict(labels, model=model)
+        content = response.choices[0].message.content
+        if response.choices[0].finish_reason == "length":
+            metrics.incr("llm_length_stops", **labels)
+        metrics.observe("llm_seconds", time.perf_counter() - start, **labels)
+        self._record_usage(response.usage, messages, content or "", labels)
+        return content
+
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        labels: Optional[Dict[str, str]] = None,
+        stop: Optional[List[str]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Streams the completion as text deltas so callers (TTS) can start
+        consuming the reply before it is fully generated.
+        Retries, hedging and the fallback model only apply until the first
+        delta arrives; once text has been handed to the caller the stream is
+        committed.
+        """
+        extra = {"response_format": response_format} if response_format else {}
+        if stop:
+            extra["stop"] = stop
+        labels = labels or {}
+        route = self.router.route(labels.get("purpose"), labels.get("stage"))
+        temperature, max_tokens = route.params(temperature, max_tokens)
+        start = time.perf_counter()
+
+        async def open_stream(model: str) -> Tuple[AsyncIterator[str], Optional[str], Dict[str, Any], str]:
+            opened = time.perf_counter()
+            usage: Dict[str, Any] = {}
+            deltas = self._deltas(messages, model, temperature, max_tokens, extra, usage)
+            try:
+                first = await asyncio.wait_for(deltas.__anext__(), timeout=settings.LLM_FIRST_TOKEN_TIMEOUT)
+            except StopAsyncIteration:
+                first = None
+            except BaseException:
+                await deltas.aclose()
+                raise
+            self.first_token_latency.record(time.perf_counter() - opened)
+            return deltas, first, usage, model
+
+        async def discard(opened):
+            await opened[0].aclose()
+
+        async def attempt():
+            return await self._race(
+                open_stream, route, self.first_token_latency, "stream_chat_completion", labels, discard=discard
+            )
+
+        deltas, first, usage, model = await self._with_retries(attempt, "stream_chat_completion", labels)
+        labels = dict(labels, model=model)
+        first_token = time.perf_counter() - start
+        metrics.observe("llm_first_token_seconds", first_token, **labels)
+        logger.debug("stream_chat_completion first token after {:.4f} seconds", first_token)
+        parts: List[str] = []
+        try:
+            if first is None:
+                return
+            parts.append(first)
+            yield first
+            async for delta in deltas:
+                parts.append(delta)
+                yield delta
         except Exception as e:
-            logger.error(f"Cerebras API error: {e}")
-            raise e
+            logger.error(f"Cerebras API stream error: {e!r}")
+            raise LLMError(f"Cerebras stream interrupted: {e!r}") from e
+        finally:
+            await deltas.aclose()
+            # Also recorded when the caller stops early (barge-in): that's what we paid for
+            metrics.observe("llm_seconds", time.perf_counter() - start, **labels)
+            if usage.get("finish_reason") == "length":
+                metrics.incr("llm_length_stops", **labels)
+            self._record_usage(usage.get("usage"), messages, "".join(parts), labels)
+        logger.debug("stream_chat_completion took {:.4f} seconds", time.perf_counter() - start)
+
+    @staticmethod
+    def _record_usage(usage, messages: List[Dict[str, str]], completion: str, labels: Dict[str, str]):
+        """Token histograms from the API's usage block, or a local estimate when it's missing."""
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or messages_tokens(messages)
+        completion_tokens = getattr(usage, "completion_tokens", None) or estimate_tokens(completion)
+        metrics.observe("llm_prompt_tokens", prompt_tokens, **labels)
+        metrics.observe("llm_completion_tokens", completion_tokens, **labels)
+
+    async def _deltas(self, messages, model, temperature, max_tokens, extra, usage: Dict[str, Any]) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **extra,
+        )
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage["usage"] = chunk.usage
+                if not chunk.choices:
+                    continue
+                if chunk.choices[0].finish_reason:
+                    # "length" when max_tokens cut the reply short
+                    usage["finish_reason"] = chunk.choices[0].finish_reason
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        finally:
+            await stream.close()
+
 
-cerebras_service = CerebrasService()
+def __getattr__(name: str):
+    # The shared instance lives in app.container; built on first use
+    if name == "cerebras_service":
+        from app.container import services
+        return services.cerebras
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,20 @@
 from typing import List, AsyncIterable, Optional, Any
 import asyncio
-from livekit.agents import llm
-from app.services.cerebras import cerebras_service
-from app.agent.sales_agent import sales_agent
-import app.agent.memory as memory
-from app.agent.stages import SalesStage
-from app.logging import logger
+from livekit.agents import llm, utils, DEFAULT_API_CONNECT_OPTIONS
+from app.container import services
+from app.logging import log_category, logger
+
+llm_log = log_category("llm")
 
 class CerebrasLLM(llm.LLM):
-    def __init__(self):
+    def __init__(self, session_id: str = "livekit_voice"):
         super().__init__()
+        # SalesAgent session this LLM drives; one per LiveKit job/room
+        self.session_id = session_id
 
     @property
     def model(self) -> str:
-        return "llama3.3-70b"
+        return services.model_router.route("generation").model
 
     @property
     def provider(self) -> str:
@@ -31,7 +32,7 @@ class CerebrasLLM(llm.LLM):
             llm=self,
             chat_ctx=chat_ctx,
             tools=tools or [],
-            conn_options=kwargs.get("conn_options")
+            conn_options=kwargs.get("conn_options", DEFAULT_API_CONNECT_OPTIONS)
         )
 
 class CerebrasLLMStream(llm.LLMStream):
@@ -49,77 +50,45 @@ class CerebrasLLMStream(llm.LLMStream):
         """
         Implementation of the abstract method _run from llm.LLMStream.
         """
-        session_id = "livekit_voice"
-        
-        # 1. Sync latest user message to SalesAgent memory
-        user_text = ""
-        if self._chat_ctx.messages:
-            last_msg = self._chat_ctx.messages[-1]
-            if last_msg.role == llm.ChatRole.USER:
-                user_text = last_msg.content
-                sales_agent.update_memory(session_id, "user", user_text)
+        session_id = self._llm.session_id
+        # This task drives the turn
+        services.sales_agent.enter_turn(session_id)
 
-        # 2. Get state & history
-        current_stage = memory.session_memory.get_metadata(session_id, "stage")
-        if isinstance(current_stage, str):
-            current_stage = SalesStage(current_stage)
-        history = memory.session_memory.get_history(session_id)
+        # 1. Latest user message (recorded into SalesAgent memory by the turn)
+        user_text = ""
+        chat_messages = self._chat_ctx.messages()
+        if chat_messages:
+            last_msg = chat_messages[-1]
+            if last_msg.role == "user":
+                user_text = last_msg.text_content or ""
 
-        # 3. Analyze Input
-        analysis = {"intent": "other", "recommended_action": "stay", "extracted_info": {}}
         if user_text:
-            try:
-                from app.agent.analyzer import analyzer
-                logger.info(f"[CerebrasLLM] Analyzing input: '{user_text[:50]}...'")
-                analysis = await analyzer.analyze(user_text, history, current_stage)
-                logger.info(f"[CerebrasLLM-Analyzer] intent={analysis.get('intent')}")
-                
-                from app.agent.intelligence import PRICING_GATE_METADATA_KEY
-                for key, val in analysis.get("extracted_info", {}).items():
-                    if val is not None:
-                        memory.session_memory.set_metadata(session_id, key, val)
-                        if key == "value_accepted" and val is True:
-                             memory.session_memory.set_metadata(session_id, PRICING_GATE_METADATA_KEY, True)
-            except Exception as e:
-                logger.error(f"[CerebrasLLM] Analysis failed: {e}")
+            llm_log.info("[CerebrasLLM] Analyzing input: '{:.50}...'", user_text)
 
-        # 4. Prompting
-        system_prompt, final_stage = sales_agent.prepare_payload(session_id)
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(history)
-
-        if analysis.get("is_vague"):
-            messages.append({"role": "system", "content": "The user was vague. Ask for missing info."})
-
-        # 5. Generate
+        # 2. Analyze, prompt and generate (streamed)
+        # Each delta is pushed as its own chunk so TTS can start speaking on
+        # the first tokens. Memory and stage updates wait for the playback
+        # outcome (the worker reports it via sales_agent.finish_reply); a
+        # barge-in cancels this task, which closes the upstream request.
+        request_id = utils.shortuuid("cerebras_")
+        parts: List[str] = []
         try:
-            logger.info(f"[CerebrasLLM] Calling Cerebras API with {len(messages)} messages")
-            response_text = await cerebras_service.chat_completion(messages)
-            logger.info(f"[CerebrasLLM] Received response: '{response_text[:50]}...'")
-            
-            # Sync assistant response back
-            sales_agent.update_memory(session_id, "assistant", response_text)
-            
-            # Advance Stage Machine logic
-            sales_agent.advance_logic(session_id, final_stage, analysis)
-            
-            # Push results to the stream
-            # We use await send() to ensure it's delivered before closing
-            await self._event_ch.send(
-                llm.ChatChunk(
-                    choices=[
-                        llm.Choice(
-                            delta=llm.ChoiceDelta(role="assistant", content=response_text),
-                            index=0
-                        )
-                    ]
+            async for delta in services.sales_agent.stream_response(user_text, session_id, defer_commit=True):
+                parts.append(delta)
+                await self._event_ch.send(
+                    llm.ChatChunk(
+                        id=request_id,
+                        delta=llm.ChoiceDelta(role="assistant", content=delta),
+                    )
                 )
-            )
+
+            response_text = "".join(parts)
+            llm_log.info("[CerebrasLLM] Received response: '{:.50}...'", response_text)
         except Exception as e:
             logger.error(f"[CerebrasLLM] Chat failed: {e}")
         finally:
             self._event_ch.close()
 
 # Factory function
-def get_llm():
-    return CerebrasLLM()
\ No newline at end of file
+def get_llm(session_id: str = "livekit_voice"):
+    return CerebrasLLM(session_id=session_id)
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Which model (and which parameters) serves each kind of LLM call.
+
+Calls are routed by their `purpose` label (analyzer, analyzer_batch,
+generation, summary) and, where they have one, the stage. Routes are
+layered: the defaults (LLM_MODEL, LLM_FALLBACK_MODEL) under the purpose's
+route under the purpose's route for that stage, e.g.
+
+    LLM_ROUTES='{"analyzer": {"model": "llama3.1-8b", "max_tokens": 300},
+                 "generation": {"fallback": "llama3.1-8b", "fallback_after": 0.6},
+                 "generation:closing": {"max_tokens": 120}}'
+
+so a small fast model classifies while the large one writes replies. A
+route's `fallback` model is raced in when `model` hasn't answered (or, when
+streaming, produced a first token) after `fallback_after` seconds. Every
+combination is resolved once, up front; a lookup is one dict access.
+"""
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from app.agent.stages import SalesStage
+
+PURPOSES = ("analyzer", "analyzer_batch", "generation", "summary")
+# Routes a purpose picks up from another unless it sets its own
+INHERITS = {"analyzer_batch": "analyzer"}
+
+
+@dataclass(frozen=True)
+class Route:
+    model: str
+    temperature: Optional[float] = None  # None: the caller's
+    max_tokens: Optional[int] = None  # cap on the caller's max_tokens
+    fallback: Optional[str] = None
+    fallback_after: Optional[float] = None  # seconds
+
+    def params(self, temperature: float, max_tokens: Optional[int]) -> Tuple[float, Optional[int]]:
+        """The caller's temperature and max_tokens, with this route's applied."""
+        if self.temperature is not None:
+            temperature = self.temperature
+        if self.max_tokens is not None:
+            max_tokens = self.max_tokens if max_tokens is None else min(max_tokens, self.max_tokens)
+        return temperature, max_tokens
+
+
+_FIELDS = {f.name for f in fields(Route)}
+
+
+class ModelRouter:
+    def __init__(self, default: Route, routes: Optional[Mapping[str, Mapping[str, Any]]] = None):
+        routes = dict(routes or {})
+        for name, overrides in routes.items():
+            _validate(name, overrides)
+        self.default = self._checked("default", default)
+        self.routes = routes
+        self._table: Dict[Tuple[Optional[str], Optional[str]], Route] = {}
+        for purpose in PURPOSES:
+            base = default
+            for layer in (INHERITS.get(purpose), purpose):
+                if layer in routes:
+                    base = replace(base, **routes[layer])
+            self._table[purpose, None] = self._checked(purpose, base)
+            for stage in SalesStage:
+                name = f"{purpose}:{stage.value}"
+                if name in routes:
+                    self._table[purpose, stage.value] = self._checked(name, replace(base, **routes[name]))
+                else:
+                    self._table[purpose, stage.value] = self._table[purpose, None]
+
+    @classmethod
+    def from_settings(cls, settings) -> "ModelRouter":
+        return cls(
+            Route(
+                model=settings.LLM_MODEL,
+                fallback=settings.LLM_FALLBACK_MODEL or None,
+                fallback_after=settings.LLM_FALLBACK_AFTER,
+            ),
+            settings.LLM_ROUTES,
+        )
+
+    def route(self, purpose: Optional[str], stage: Optional[str] = None) -> Route:
+        return self._table.get((purpose, stage)) or self.default
+
+    @staticmethod
+    def _checked(name: str, route: Route) -> Route:
+        if route.fallback == route.model:
+            route = replace(route, fallback=None)
+        if route.fallback and not (route.fallback_after and route.fallback_after > 0):
+            raise ValueError(f"LLM route {name!r}: fallback {route.fallback!r} needs a positive fallback_after")
+        return route
+
+
+def _validate(name: str, overrides: Mapping[str, Any]):
+    purpose, _, stage = name.partition(":")
+    if purpose not in PURPOSES:
+        raise ValueError(f"LLM route {name!r}: unknown purpose (expected one of {', '.join(PURPOSES)})")
+    if stage and stage not in SalesStage._value2member_map_:
+        raise ValueError(f"LLM route {name!r}: unknown stage {stage!r}")
+    unknown = set(overrides) - _FIELDS
+    if unknown:
+        raise ValueError(f"LLM route {name!r}: unknown fields {', '.join(sorted(unknown))}")
@@ -0,0 +1,228 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Tuple
+
+from app.utils.errors import LLMError
+
+
+class CircuitOpenError(LLMError):
+    """Raised without calling upstream while the circuit breaker is open"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker. Opens after `failure_threshold` failed calls,
+    rejects calls for `reset_timeout` seconds, then lets a single trial call
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 15.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_in_flight):
+            raise CircuitOpenError("LLM circuit breaker is open")
+        if state == "half_open":
+            self._trial_in_flight = True
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Returns True when this failure (re-)opened the circuit."""
+        self._failures += 1
+        opened = self._trial_in_flight or self._failures >= self.failure_threshold
+        if opened:
+            self._opened_at = self._clock()
+        self._trial_in_flight = False
+        return opened
+
+    def abandon(self):
+        """The call was cancelled by the caller; let another trial through."""
+        self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Rolling window of recent latencies for percentile-based hedging."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# Priority classes for FairRateLimiter, highest first
+INTERACTIVE, BACKGROUND = 0, 1
+
+# Session the current task is working for, so queued upstream calls can be shared out fairly
+llm_session: ContextVar[Optional[str]] = ContextVar("llm_session", default=None)
+
+
+class FairRateLimiter:
+    """
+    Async token bucket (`rate` calls/s, up to `burst` at once) for upstream
+    calls. Callers that have to wait are served by priority class first
+    (live turns before background work such as summaries), then round-robin
+    across sessions within a class, so one busy session can't starve the
+    rest. A background call that has waited `promote_after` seconds is served
+    next regardless, so summaries still progress under sustained load.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, promote_after: float = 5.0, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.promote_after = promote_after
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        # Per priority class: session -> its waiters (future, enqueued at), in round-robin order
+        self._classes: List["OrderedDict[Optional[str], Deque[Tuple[asyncio.Future, float]]]"] = [
+            OrderedDict(), OrderedDict()
+        ]
+        self.waiting = 0
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: int = INTERACTIVE, session: Optional[str] = None) -> float:
+        """Waits for a slot; returns the seconds spent waiting."""
+        if not self.waiting:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+        start = self._clock()
+        future = asyncio.get_running_loop().create_future()
+        self._classes[priority].setdefault(session, deque()).append((future, start))
+        self.waiting += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as the caller gave up: hand the slot back
+                self._tokens = min(self.burst, self._tokens + 1)
+            raise
+        return self._clock() - start
+
+    async def _dispatch(self):
+        while self.waiting:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+            future = self._next()
+            self.waiting -= 1
+            if not future.done():
+                self._tokens -= 1
+                future.set_result(None)
+
+    def _next(self) -> asyncio.Future:
+        background = self._classes[BACKGROUND]
+        order = self._classes
+        if background:
+            _, oldest = next(iter(background.values()))[0]
+            if self._clock() - oldest >= self.promote_after:
+                order = (background,)
+        for sessions in order:
+            if not sessions:
+                continue
+            session, waiters = next(iter(sessions.items()))
+            future, _ = waiters.popleft()
+            if waiters:
+                sessions.move_to_end(session)
+            else:
+                del sessions[session]
+            return future
+        raise RuntimeError("no waiters")
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def hedged(
+    factory: Callable[[], Awaitable[Any]],
+    hedge_after: Optional[float],
+    discard: Optional[Callable[[Any], Awaitable[None]]] = None,
+    on_hedge: Optional[Callable[[], None]] = None,
+    hedge_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+) -> Any:
+    """
+    Runs `factory()`; if it hasn't finished after `hedge_after` seconds, starts
+    a second call (`hedge_factory()`, by default an identical one) and returns
+    whichever succeeds first. The loser is cancelled, or passed to `discard`
+    if it had already produced a result.
+    """
+    first = asyncio.ensure_future(factory())
+    if hedge_after is None:
+        return await first
+
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            if on_hedge:
+                on_hedge()
+            tasks.append(asyncio.ensure_future((hedge_factory or factory)()))
+
+        error = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    winner = task
+                    for other in tasks:
+                        if other is not winner:
+                            await _dispose(other, discard)
+                    return winner.result()
+                error = task.exception()
+        raise error
+    except BaseException:
+        for task in tasks:
+            await _dispose(task, discard)
+        raise
+
+
+async def _dispose(task: asyncio.Future, discard):
+    if not task.done():
+        task.cancel()
+        # wait() doesn't re-raise the loser's error, but still propagates our own cancellation
+        await asyncio.wait([task])
+        return
+    if discard and not task.cancelled() and task.exception() is None:
+        await discard(task.result())
@@ -0,0 +1,37 @@
+from typing import Any, Callable, MutableMapping
+
+from app.storage.base import SessionStore
+
+
+def build_session_store(settings, metadata_factory: Callable[[], MutableMapping[str, Any]] = dict) -> SessionStore:
+    """
+    Creates the session store selected by SESSION_STORE ("memory", "redis" or "sqlite").
+    `metadata_factory` shapes per-session metadata in the in-process store; remote stores keep hashes/rows.
+    """
+    backend = settings.SESSION_STORE.lower()
+    if backend == "memory":
+        from app.storage.in_memory import InMemorySessionStore
+        return InMemorySessionStore(
+            max_sessions=settings.SESSION_MAX_SESSIONS,
+            idle_ttl=settings.SESSION_IDLE_TTL,
+            metadata_factory=metadata_factory,
+        )
+    if backend == "redis":
+        from app.storage.redis_store import RedisSessionStore
+        return RedisSessionStore(url=settings.REDIS_URL, idle_ttl=settings.SESSION_IDLE_TTL)
+    if backend == "sqlite":
+        from app.storage.sqlite_store import SQLiteSessionStore
+        return SQLiteSessionStore(path=settings.SESSION_SQLITE_PATH, idle_ttl=settings.SESSION_IDLE_TTL)
+    raise ValueError(f"Unknown SESSION_STORE '{settings.SESSION_STORE}'")
+
+
+def build_event_log(settings):
+    """The session event log, or None when EVENT_LOG_DIR is unset."""
+    if not settings.EVENT_LOG_DIR:
+        return None
+    from app.storage.event_log import EventLog
+    return EventLog(
+        settings.EVENT_LOG_DIR,
+        segment_bytes=settings.EVENT_LOG_SEGMENT_MB << 20,
+        flush_interval=settings.EVENT_LOG_FLUSH_INTERVAL,
+    )
@@ -0,0 +1,57 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+Message = Dict[str, str]
+
+
+class SessionStore(ABC):
+    """
+    Storage interface behind SessionMemory.
+    A session is an ordered message history plus a flat metadata mapping.
+    Values must be JSON-serializable for the remote backends.
+    """
+
+    # True when calls wait on the network; SessionMemory then runs them off the event loop
+    blocking = False
+
+    @abstractmethod
+    def append_message(self, session_id: str, message: Message):
+        pass
+
+    @abstractmethod
+    def get_history(self, session_id: str) -> List[Message]:
+        pass
+
+    @abstractmethod
+    def get_metadata(self, session_id: str) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def set_metadata(self, session_id: str, values: Dict[str, Any]):
+        """Merges `values` into the session's metadata."""
+        pass
+
+    @abstractmethod
+    def increment(self, session_id: str, key: str, amount: int = 1) -> int:
+        """Atomically increments an integer metadata field (missing counts as 0)."""
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        pass
+
+    @abstractmethod
+    def exists(self, session_id: str) -> bool:
+        """True if the session has any stored state. Must not create the session."""
+        pass
+
+    def load(self, session_id: str) -> Tuple[List[Message], Dict[str, Any]]:
+        """Reads history and metadata together. Remote backends do this in one round trip."""
+        return self.get_history(session_id), self.get_metadata(session_id)
+
+    def count(self) -> Optional[int]:
+        """Number of live sessions, for the active-sessions gauge. None if unknown."""
+        return None
+
+    def close(self):
+        pass
@@ -0,0 +1,308 @@
+"""
+Append-only session event log.
+
+Every state change SessionMemory makes (messages, metadata, stage
+transitions, counters, deletes) plus analyzer results is appended as one
+compact JSON line. A background thread batches the writes into segment
+files, so the hot path only enqueues. Each process writes its own
+segments, named so they sort by start time:
+
+    <dir>/segments/<start_ns>-<pid>-<seq>.jsonl   {"t": ns, "s": session, "e": kind, "d": data}
+    <dir>/snapshots/<xx>/<sha1>.json              full session state as of event time "t"
+
+Recovery loads a session's latest snapshot and replays only the events
+after it, from segments written since. read_events() streams the whole
+log for offline analysis:
+
+    python -m app.storage.event_log .events --kind stage
+"""
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.logging import logger
+from app.storage.base import Message
+
+SNAPSHOT = "snapshot"
+
+
+def _default(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+
+class _Flush:
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_CLOSE = object()
+
+
+class EventLog:
+    """Batched, asynchronous JSONL writer plus snapshot-based session recovery."""
+
+    def __init__(self, directory: str, segment_bytes: int = 64 << 20, flush_interval: float = 0.2, batch_size: int = 1024):
+        self.directory = Path(directory)
+        self.segments_dir = self.directory / "segments"
+        self.snapshots_dir = self.directory / "snapshots"
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._last_t = 0
+        self._seq = 0
+        self._file = None
+        self._segment: Optional[Path] = None
+        self._offset = 0
+        self._closed = False
+        self.failed_batches = 0
+        self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ---------- Hot path ----------
+    def _now(self) -> int:
+        # Strictly increasing within the process, so replay order is exact
+        t = time.time_ns()
+        if t <= self._last_t:
+            t = self._last_t + 1
+        self._last_t = t
+        return t
+
+    def append(self, session_id: str, kind: str, data: Any = None):
+        """Enqueues an event; serialization and I/O happen on the writer thread."""
+        if not self._closed:
+            self._queue.put((self._now(), session_id, kind, data))
+
+    def snapshot(self, session_id: str, history: List[Message], metadata: Dict[str, Any]):
+        """Records the session's full state, ordered after every event appended before it."""
+        self.append(session_id, SNAPSHOT, {"history": history, "metadata": metadata})
+
+    def flush(self, timeout: Optional[float] = 5.0):
+        """Blocks until everything appended so far is written."""
+        if self._closed:
+            return
+        marker = _Flush()
+        self._queue.put(marker)
+        marker.done.wait(timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_CLOSE)
+        self._thread.join(timeout=5.0)
+
+    # ---------- Writer thread ----------
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not isinstance(batch[-1], _Flush) and batch[-1] is not _CLOSE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                # Never take the process down over the log; the batch is lost
+                self.failed_batches += 1
+                logger.error(f"[EventLog] Failed to write {len(batch)} events: {e!r}")
+            for item in batch:
+                if isinstance(item, _Flush):
+                    item.done.set()
+            if batch[-1] is _CLOSE:
+                if self._file is not None:
+                    self._file.close()
+                return
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        self._seq += 1
+        self._segment = self.segments_dir / f"{time.time_ns():020d}-{os.getpid()}-{self._seq:05d}.jsonl"
+        self._file = open(self._segment, "ab")
+        self._offset = 0
+
+    def _write(self, batch: List[Any]):
+        if self._file is None or self._offset >= self.segment_bytes:
+            self._open_segment()
+        lines: List[bytes] = []
+        # Snapshot writes/removals, applied in order once the events before them are on disk
+        snapshots: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+        size = 0
+        for item in batch:
+            if not isinstance(item, tuple):
+                continue
+            t, session_id, kind, data = item
+            if kind == SNAPSHOT:
+                snapshots.append((session_id, {
+                    "session_id": session_id,
+                    "t": t,
+                    "segment": self._segment.name,
+                    "offset": self._offset + size,
+                    **data,
+                }))
+                continue
+            if kind == "delete":
+                snapshots.append((session_id, None))
+            line = (_dumps({"t": t, "s": session_id, "e": kind, "d": data}) + "\n").encode("utf-8")
+            lines.append(line)
+            size += len(line)
+        if lines:
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            self._offset += size
+        for session_id, state in snapshots:
+            path = self._snapshot_path(session_id)
+            if state is None:
+                path.unlink(missing_ok=True)
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(_dumps(state), encoding="utf-8")
+            os.replace(tmp, path)
+
+    # ---------- Recovery ----------
+    def _snapshot_path(self, session_id: str) -> Path:
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return self.snapshots_dir / digest[:2] / f"{digest}.json"
+
+    def has_snapshot(self, session_id: str) -> bool:
+        """
+        Whether a snapshot of the session is on disk, without waiting for
+        queued writes: a session this process is still logging is in its store.
+        """
+        return self._snapshot_path(session_id).exists()
+
+    def recover(self, session_id: str) -> Optional[Tuple[List[Message], Dict[str, Any]]]:
+        """
+        Rebuilds a session as (history, metadata) from its latest snapshot plus
+        the events logged after it. None if the log doesn't have it: every
+        session is snapshotted on its first event and unsnapshotted on delete,
+        so a missing snapshot means there is nothing to replay.
+        """
+        self.flush()
+        path = self._snapshot_path(session_id)
+        if not path.exists():
+            return None
+        state = json.loads(path.read_text(encoding="utf-8"))
+        history: List[Message] = state["history"]
+        metadata: Dict[str, Any] = state["metadata"]
+        since, start = state["t"], (state["segment"], state["offset"])
+        found = True
+
+        # Segments last written before the snapshot can't hold later events
+        # (1s of slack for filesystem timestamp granularity)
+        candidates = [
+            p for p in sorted(self.segments_dir.glob("*.jsonl"))
+            if p.stat().st_mtime_ns >= since - 1_000_000_000
+        ]
+        tail = []
+        for segment in candidates:
+            offset = start[1] if segment.name == start[0] else 0
+            for event in _read_segment(segment, offset, session_id):
+                if event["t"] > since:
+                    tail.append(event)
+        # Events from other processes' segments interleave by time
+        tail.sort(key=lambda e: e["t"])
+        for event in tail:
+            found = True
+            kind, data = event["e"], event["d"]
+            if kind == "message":
+                history.append(data)
+            elif kind == "metadata":
+                metadata.update(data)
+            elif kind == "stage":
+                metadata.update(stage=data["stage"], turns_in_stage=0)
+            elif kind == "increment":
+                metadata[data["key"]] = (metadata.get(data["key"]) or 0) + data["amount"]
+            elif kind == "delete":
+                history, metadata, found = [], {}, False
+        return (history, metadata) if found else None
+
+
+def _read_segment(path: Path, offset: int = 0, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    # Cheap substring test before parsing: most lines belong to other sessions
+    needle = f'"s":{_dumps(session_id)},'.encode("utf-8") if session_id is not None else None
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if needle is not None and needle not in line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A torn last line from a crash mid-write
+                continue
+
+
+def read_events(
+    directory: str,
+    session_id: Optional[str] = None,
+    kinds: Optional[Iterable[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streams events from every segment, one at a time, in segment order
+    (time order within each writer process). Memory use is constant, so
+    this scales to logs far larger than RAM.
+    """
+    kinds = set(kinds) if kinds else None
+    for segment in sorted((Path(directory) / "segments").glob("*.jsonl")):
+        for event in _read_segment(segment, 0, session_id):
+            if kinds is None or event["e"] in kinds:
+                yield event
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a session event log.")
+    parser.add_argument("directory")
+    parser.add_argument("--session")
+    parser.add_argument("--kind", action="append", help="only these event kinds (repeatable)")
+    parser.add_argument("--print", action="store_true", help="print matching events as JSON lines")
+    args = parser.parse_args()
+
+    kinds: Counter = Counter()
+    transitions: Counter = Counter()
+    sessions = set()
+    for event in read_events(args.directory, args.session, args.kind):
+        kinds[event["e"]] += 1
+        sessions.add(event["s"])
+        if event["e"] == "stage":
+            transitions[(event["d"].get("from_stage"), event["d"]["stage"])] += 1
+        if args.print:
+            print(_dumps(event))
+    print(f"{sum(kinds.values())} events, {len(sessions)} sessions")
+    for kind, n in kinds.most_common():
+        print(f"  {kind:<10} {n}")
+    for (src, dst), n in transitions.most_common():
+        print(f"  {src} -> {dst}: {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, MutableMapping, Optional
+
+from app.storage.base import SessionStore, Message
+
+
+class _Entry:
+    __slots__ = ("history", "metadata", "last_access")
+
+    def __init__(self, now: float, metadata: MutableMapping[str, Any]):
+        self.history: List[Message] = []
+        self.metadata = metadata
+        self.last_access = now
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local store bounded by a session count (LRU) and an idle TTL.
+    Entries are kept in access order, so both evictions only look at the head.
+    `metadata_factory` builds each session's metadata mapping (a dict, or a
+    typed object with the same interface such as SessionState).
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        idle_ttl: Optional[float] = 3600,
+        clock=time.monotonic,
+        metadata_factory: Callable[[], MutableMapping[str, Any]] = dict,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._metadata_factory = metadata_factory
+        self._sessions: "OrderedDict[str, _Entry]" = OrderedDict()
+
+    def _entry(self, session_id: str) -> _Entry:
+        now = self._clock()
+        entry = self._sessions.get(session_id)
+        if entry is not None and self._expired(entry, now):
+            del self._sessions[session_id]
+            entry = None
+        if entry is None:
+            entry = _Entry(now, self._metadata_factory())
+            self._sessions[session_id] = entry
+            self._evict(now)
+        else:
+            entry.last_access = now
+            self._sessions.move_to_end(session_id)
+        return entry
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return self.idle_ttl is not None and now - entry.last_access > self.idle_ttl
+
+    def _evict(self, now: float):
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if len(self._sessions) > self.max_sessions or self._expired(oldest, now):
+                self._sessions.popitem(last=False)
+            else:
+                break
+
+    def append_message(self, session_id: str, message: Message):
+        self._entry(session_id).history.append(message)
+
+    def get_history(self, session_id: str) -> List[Message]:
+        # Returned by reference; callers must treat it as read-only.
+        return self._entry(session_id).history
+
+    def get_metadata(self, session_id: str) -> Dict[str, Any]:
+        # Returned by reference, like the history
+        return self._entry(session_id).metadata
+
+    def set_metadata(self, session_id: str, values: Dict[str, Any]):
+        self._entry(session_id).metadata.update(values)
+
+    def increment(self, session_id: str, key: str, amount: int = 1) -> int:
+        metadata = self._entry(session_id).metadata
+        metadata[key] = (metadata.get(key) or 0) + amount
+        return metadata[key]
+
+    def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def exists(self, session_id: str) -> bool:
+        entry = self._sessions.get(session_id)
+        return entry is not None and not self._expired(entry, self._clock())
+
+    def count(self) -> int:
+        self._evict(self._clock())
+        return len(self._sessions)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,107 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.storage.base import SessionStore, Message
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis-protocol store so sessions can be shared across worker processes.
+    History is a list of JSON messages, metadata a hash of JSON values.
+    Every operation is a single pipelined round trip; idle sessions expire
+    via key TTLs, which are refreshed on each write.
+
+    Works with any RESP server (Redis, Valkey, KeyDB, a local fake) and
+    accepts a pre-built `client` for testing.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        idle_ttl: Optional[float] = 3600,
+        prefix: str = "session:",
+        client: Any = None,
+    ):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("SESSION_STORE=redis requires the 'redis' package") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.idle_ttl = int(idle_ttl) if idle_ttl else None
+        self.prefix = prefix
+
+    def _keys(self, session_id: str) -> Tuple[str, str]:
+        base = f"{self.prefix}{session_id}"
+        return f"{base}:history", f"{base}:meta"
+
+    def _expire(self, pipe, *keys: str):
+        if self.idle_ttl:
+            for key in keys:
+                pipe.expire(key, self.idle_ttl)
+
+    @staticmethod
+    def _decode_history(raw: List[bytes]) -> List[Message]:
+        return [json.loads(item) for item in raw]
+
+    @staticmethod
+    def _decode_metadata(raw: Dict[bytes, bytes]) -> Dict[str, Any]:
+        return {
+            (k.decode() if isinstance(k, bytes) else k): json.loads(v)
+            for k, v in raw.items()
+        }
+
+    def append_message(self, session_id: str, message: Message):
+        history_key, meta_key = self._keys(session_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.rpush(history_key, json.dumps(message))
+        self._expire(pipe, history_key, meta_key)
+        pipe.execute()
+
+    def get_history(self, session_id: str) -> List[Message]:
+        history_key, _ = self._keys(session_id)
+        return self._decode_history(self.client.lrange(history_key, 0, -1))
+
+    def get_metadata(self, session_id: str) -> Dict[str, Any]:
+        _, meta_key = self._keys(session_id)
+        return self._decode_metadata(self.client.hgetall(meta_key))
+
+    def load(self, session_id: str) -> Tuple[List[Message], Dict[str, Any]]:
+        history_key, meta_key = self._keys(session_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.lrange(history_key, 0, -1)
+        pipe.hgetall(meta_key)
+        raw_history, raw_meta = pipe.execute()
+        return self._decode_history(raw_history), self._decode_metadata(raw_meta)
+
+    def set_metadata(self, session_id: str, values: Dict[str, Any]):
+        if not values:
+            return
+        history_key, meta_key = self._keys(session_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(meta_key, mapping={k: json.dumps(v) for k, v in values.items()})
+        self._expire(pipe, history_key, meta_key)
+        pipe.execute()
+
+    def increment(self, session_id: str, key: str, amount: int = 1) -> int:
+        history_key, meta_key = self._keys(session_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrby(meta_key, key, amount)
+        self._expire(pipe, history_key, meta_key)
+        return int(pipe.execute()[0])
+
+    def delete(self, session_id: str):
+        self.client.delete(*self._keys(session_id))
+
+    def exists(self, session_id: str) -> bool:
+        return self.client.exists(*self._keys(session_id)) > 0
+
+    def count(self) -> int:
+        # SCAN walks the whole keyspace; fine at scrape intervals, not per turn
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.prefix}*:meta", count=1000))
+
+    def close(self):
+        self.client.close()
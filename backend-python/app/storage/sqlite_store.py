@@ -0,0 +1,148 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.storage.base import SessionStore, Message
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, seq);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at);
+"""
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Single-node durable store on SQLite in WAL mode.
+    Idle sessions are purged every `purge_every` writes.
+    """
+
+    def __init__(self, path: str = "sessions.db", idle_ttl: Optional[float] = 3600, purge_every: int = 500):
+        self.idle_ttl = idle_ttl
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self, begin: str = "BEGIN"):
+        """Runs the block in one transaction under the lock, rolled back if it raises."""
+        with self._lock:
+            self._conn.execute(begin)
+            try:
+                yield
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _touch(self, session_id: str):
+        self._conn.execute(
+            "INSERT INTO sessions (session_id, updated_at) VALUES (?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at",
+            (session_id, time.time()),
+        )
+
+    def _after_write(self):
+        self._writes += 1
+        if self.idle_ttl and self._writes % self.purge_every == 0:
+            self.purge_expired()
+
+    def append_message(self, session_id: str, message: Message):
+        with self._lock:
+            with self._transaction():
+                self._touch(session_id)
+                self._conn.execute(
+                    "INSERT INTO messages (session_id, role, content) VALUES (?, ?, ?)",
+                    (session_id, message["role"], message["content"]),
+                )
+            self._after_write()
+
+    def get_history(self, session_id: str) -> List[Message]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? ORDER BY seq",
+                (session_id,),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def get_metadata(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metadata FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def load(self, session_id: str) -> Tuple[List[Message], Dict[str, Any]]:
+        return self.get_history(session_id), self.get_metadata(session_id)
+
+    def _update_metadata(self, session_id: str, update) -> Dict[str, Any]:
+        with self._lock:
+            with self._transaction("BEGIN IMMEDIATE"):
+                row = self._conn.execute(
+                    "SELECT metadata FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                metadata = json.loads(row[0]) if row else {}
+                update(metadata)
+                self._conn.execute(
+                    "INSERT INTO sessions (session_id, metadata, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(session_id) DO UPDATE SET metadata = excluded.metadata, updated_at = excluded.updated_at",
+                    (session_id, json.dumps(metadata), time.time()),
+                )
+            self._after_write()
+        return metadata
+
+    def set_metadata(self, session_id: str, values: Dict[str, Any]):
+        if values:
+            self._update_metadata(session_id, lambda metadata: metadata.update(values))
+
+    def increment(self, session_id: str, key: str, amount: int = 1) -> int:
+        def bump(metadata):
+            metadata[key] = (metadata.get(key) or 0) + amount
+        return self._update_metadata(session_id, bump)[key]
+
+    def delete(self, session_id: str):
+        with self._transaction():
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row is not None
+
+    def count(self) -> int:
+        cutoff = time.time() - self.idle_ttl if self.idle_ttl else 0
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions WHERE updated_at >= ?", (cutoff,)).fetchone()[0]
+
+    def purge_expired(self):
+        """Deletes sessions idle for longer than `idle_ttl`."""
+        cutoff = time.time() - self.idle_ttl
+        with self._transaction():
+            self._conn.execute(
+                "DELETE FROM messages WHERE session_id IN (SELECT session_id FROM sessions WHERE updated_at < ?)",
+                (cutoff,),
+            )
+            self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+
+    def close(self):
+        self._conn.close()
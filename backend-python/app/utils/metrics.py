@@ -0,0 +1,190 @@
+import bisect
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Seconds; voice turns live between ~50ms and a few seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32)
+WORD_BUCKETS = (10, 20, 30, 40, 50, 65, 80, 100, 150, 200)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if empty)."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry: counters, histograms and gauges.
+    Series are keyed by name plus a sorted tuple of label pairs.
+    """
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, Labels], float] = defaultdict(int)
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._gauges: Dict[Tuple[str, Labels], float] = {}
+        self._gauge_callbacks: Dict[str, Callable[[], Optional[float]]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def incr(self, name: str, value: float = 1, **labels):
+        self._counters[self._key(name, labels)] += value
+
+    def get(self, name: str, **labels) -> float:
+        """Returns the counter for an exact label set, or the total across labels if none given."""
+        if labels:
+            return self._counters.get(self._key(name, labels), 0)
+        return sum(v for (n, _), v in self._counters.items() if n == name)
+
+    # ---------- Histograms ----------
+    def define_histogram(self, name: str, buckets: Tuple[float, ...]):
+        self._buckets[name] = tuple(buckets)
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        hist = self._histograms.get(key)
+        if hist is None:
+            hist = self._histograms[key] = Histogram(self._buckets.get(name, LATENCY_BUCKETS))
+        hist.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        return self._histograms.get(self._key(name, labels))
+
+    # ---------- Gauges ----------
+    def set_gauge(self, name: str, value: float, **labels):
+        self._gauges[self._key(name, labels)] = value
+
+    def add_gauge(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        self._gauges[key] = self._gauges.get(key, 0) + value
+
+    def gauge_callback(self, name: str, fn: Callable[[], Optional[float]]):
+        """Gauge computed at collection time (e.g. store size); None skips it."""
+        self._gauge_callbacks[name] = fn
+
+    def _collect_gauges(self) -> Dict[Tuple[str, Labels], float]:
+        gauges = dict(self._gauges)
+        for name, fn in self._gauge_callbacks.items():
+            try:
+                value = fn()
+            except Exception:
+                value = None
+            if value is not None:
+                gauges[(name, ())] = value
+        return gauges
+
+    # ---------- Export ----------
+    def snapshot(self) -> Dict[str, float]:
+        out = {}
+        for (name, labels), value in self._counters.items():
+            out[_series(name, labels)] = value
+        for (name, labels), value in self._collect_gauges().items():
+            out[_series(name, labels)] = value
+        for (name, labels), hist in self._histograms.items():
+            out[_series(f"{name}_count", labels)] = hist.count
+            out[_series(f"{name}_sum", labels)] = hist.sum
+        return out
+
+    def render_prometheus(self, prefix: str = "sales_agent_") -> str:
+        """Prometheus text exposition format (v0.0.4)."""
+        lines: List[str] = []
+        for kind, series in (("counter", self._counters), ("gauge", self._collect_gauges())):
+            for name in sorted({n for n, _ in series}):
+                metric = prefix + name + ("_total" if kind == "counter" else "")
+                lines.append(f"# TYPE {metric} {kind}")
+                for (n, labels), value in series.items():
+                    if n == name:
+                        lines.append(f"{metric}{_prom_labels(labels)} {_prom_value(value)}")
+        for name in sorted({n for n, _ in self._histograms}):
+            metric = prefix + name
+            lines.append(f"# TYPE {metric} histogram")
+            for (n, labels), hist in self._histograms.items():
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_prom_labels(labels + (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{metric}_bucket{_prom_labels(labels + (('le', '+Inf'),))} {hist.count}")
+                lines.append(f"{metric}_sum{_prom_labels(labels)} {_prom_value(hist.sum)}")
+                lines.append(f"{metric}_count{_prom_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        self._counters.clear()
+        self._histograms.clear()
+        self._gauges.clear()
+
+
+def _series(name: str, labels: Labels) -> str:
+    label_str = ",".join(f"{k}={v}" for k, v in labels)
+    return f"{name}{{{label_str}}}" if label_str else name
+
+
+def _prom_value(value: float) -> str:
+    # Full precision: `:g` keeps 6 significant digits, so large counters and sums lose their tail
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(value)
+
+
+def _prom_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for k, v in labels:
+        v = v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{k}="{v}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+metrics = Metrics()
+metrics.define_histogram("llm_prompt_tokens", TOKEN_BUCKETS)
+metrics.define_histogram("llm_completion_tokens", TOKEN_BUCKETS)
+metrics.define_histogram("analyzer_batch_size", BATCH_BUCKETS)
+metrics.define_histogram("reply_words", WORD_BUCKETS)
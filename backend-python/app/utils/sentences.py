@@ -0,0 +1,111 @@
+"""
+Sentence boundaries in streamed LLM text: what TTS chunking speaks segment
+by segment (app/audio/chunker.py) and where an over-long reply is ended
+(app/agent/reply_length.py).
+"""
+from typing import AsyncIterable, AsyncIterator, List, Optional
+
+TERMINATORS = ".!?…"
+CLAUSE_BREAKS = ",;:—"
+# Closing quotes/brackets stay with the sentence they end
+CLOSERS = "\"')]”’"
+OPENERS = "\"'([“‘"
+# Abbreviations that don't end a sentence. Words that often do ("no", "etc",
+# "Inc", "Co") are left out: splitting after one mid-sentence only costs a pause.
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "approx", "dept", "fig",
+})
+# Month and day names count only capitalized: "Mar. 3rd", but "out in the sun."
+CAPITALIZED_ABBREVIATIONS = frozenset({
+    "Jan", "Feb", "Mar", "Apr", "Jun", "Jul", "Aug", "Sep", "Sept", "Oct", "Nov", "Dec",
+    "Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun",
+})
+
+
+class SentenceChunker:
+    """
+    Incremental sentence/clause segmenter for streamed LLM text.
+
+    A segment closes at a sentence terminator followed by whitespace, or at a
+    clause break (comma, semicolon, colon, dash) once it is at least
+    `clause_chars` long, so long sentences start speaking before they end.
+    Abbreviations ("Dr.", "e.g."), initials, decimals ("3.5"), grouped
+    numbers ("1,000"), times ("10:30") and list markers ("1.") don't split.
+    """
+
+    def __init__(self, clause_chars: int = 60, max_chars: int = 250):
+        self.clause_chars = clause_chars
+        self.max_chars = max_chars
+        self._buf = ""
+        self._pos = 0  # next index to examine
+
+    def push(self, text: str) -> List[str]:
+        """Adds a delta; returns the segments it closed (possibly none)."""
+        self._buf += text
+        segments = []
+        i = self._pos
+        while i < len(self._buf):
+            buf = self._buf
+            ch = buf[i]
+            if ch in TERMINATORS or ch in CLAUSE_BREAKS:
+                end = i + 1
+                while end < len(buf) and buf[end] in CLOSERS:
+                    end += 1
+                if end >= len(buf):
+                    break  # the next character decides
+                if buf[end].isspace() and self._closes(buf, i, end):
+                    segments.append(buf[:end].strip())
+                    self._buf = buf[end:].lstrip()
+                    i = 0
+                    continue
+            elif i >= self.max_chars:
+                # No boundary in sight: cut at the last space
+                cut = buf.rfind(" ", 0, i)
+                if cut > 0:
+                    segments.append(buf[:cut].strip())
+                    self._buf = buf[cut:].lstrip()
+                    i = 0
+                    continue
+            i += 1
+        self._pos = i
+        return [s for s in segments if s]
+
+    @property
+    def pending(self) -> str:
+        """Text after the last closed segment, not yet part of one."""
+        return self._buf
+
+    def flush(self) -> Optional[str]:
+        """Returns whatever is left (end of reply) and resets."""
+        tail = self._buf.strip()
+        self._buf, self._pos = "", 0
+        return tail or None
+
+    def _closes(self, buf: str, i: int, end: int) -> bool:
+        if buf[i] in CLAUSE_BREAKS:
+            return end >= self.clause_chars
+        if buf[i] != ".":
+            return True
+        if i > 0 and buf[i - 1] == ".":
+            return True  # ellipsis
+        words = buf[:i].split()
+        word = words[-1].lstrip(OPENERS) if words else ""
+        if not word:
+            return True
+        if word.lower() in ABBREVIATIONS or word in CAPITALIZED_ABBREVIATIONS or "." in word:
+            return False  # "Dr.", "e.g.", "U.S.", "a.m."
+        if len(word) == 1 and word.isupper():
+            return False  # initial
+        if word.isdigit() and len(words) == 1:
+            return False  # list marker
+        return True
+
+
+async def chunk_text(text: AsyncIterable[str], chunker: SentenceChunker) -> AsyncIterator[str]:
+    """Re-chunks a delta stream into closed segments."""
+    async for delta in text:
+        for segment in chunker.push(delta):
+            yield segment
+    tail = chunker.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,23 @@
+"""
+Handing an async stream from one task to another through a queue: `pump`
+drains the stream in its own task, and the consumer reads items until END,
+raising any exception it finds in its place.
+"""
+import asyncio
+from typing import Any, AsyncIterable
+
+END = object()
+
+
+async def pump(items: AsyncIterable[Any], queue: asyncio.Queue):
+    """Drains `items` into `queue`, ending with END or the error it raised."""
+    try:
+        async for item in items:
+            await queue.put(item)
+        await queue.put(END)
+    except Exception as e:
+        await queue.put(e)
+    finally:
+        aclose = getattr(items, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -8,6 +8,6 @@ def timeit(func):
         start = time.perf_counter()
         result = await func(*args, **kwargs)
         end = time.perf_counter()
-        logger.debug(f"{func.__name__} took {end - start:.4f} seconds")
+        logger.debug("{} took {:.4f} seconds", func.__name__, end - start)
         return result
     return wrapper
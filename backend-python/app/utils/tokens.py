@@ -0,0 +1,20 @@
+from typing import Dict, List
+
+# Per-message framing overhead in chat formats (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local token estimate (~4 characters per token for English BPE vocabularies).
+    Cheap enough to run on every turn; errs slightly high on short words.
+    """
+    return len(text) // 4 + 1
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def messages_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(message_tokens(m) for m in messages)
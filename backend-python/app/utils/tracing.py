@@ -0,0 +1,84 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
+
+from app.config import settings
+from app.logging import logger
+from app.utils.metrics import metrics
+
+tracer = trace.get_tracer("ai_sales_agent")
+
+
+def setup_tracing():
+    """Exports spans over OTLP/HTTP when OTEL_EXPORTER_OTLP_ENDPOINT is set; otherwise spans are no-ops."""
+    if not settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+        return
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry-sdk / the OTLP exporter are not installed")
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+    endpoint = settings.OTEL_EXPORTER_OTLP_ENDPOINT.rstrip("/") + "/v1/traces"
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+    trace.set_tracer_provider(provider)
+    logger.info(f"Exporting traces to {endpoint}")
+
+
+class TurnTrace:
+    """
+    One span per conversational turn with child spans per phase, plus the
+    matching latency histograms tagged by stage.
+    Spans are parented explicitly rather than attached to the current context:
+    a turn runs inside an async generator, and context attached there would
+    leak into the consumer across yields.
+    """
+
+    def __init__(self, session_id: str, stage: str):
+        self.stage = stage
+        self.start = time.perf_counter()
+        self.first_delta: Optional[float] = None
+        self.span = tracer.start_span("sales_agent.turn", attributes={"session.id": session_id, "sales.stage": stage})
+        self._context = trace.set_span_in_context(self.span)
+
+    @contextmanager
+    def phase(self, name: str, metric: Optional[str] = None, stage: Optional[str] = None, **attributes: Any):
+        """Child span around a phase; `metric` also records its duration as a histogram."""
+        stage = stage or self.stage
+        span = tracer.start_span(name, context=self._context, attributes={"sales.stage": stage, **attributes})
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR, str(e)))
+            raise
+        finally:
+            if metric:
+                metrics.observe(metric, time.perf_counter() - start, stage=stage)
+            span.end()
+
+    def start_phase(self, name: str, **attributes: Any):
+        """Child span the caller ends itself (for phases spanning yields)."""
+        return tracer.start_span(name, context=self._context, attributes=attributes)
+
+    def mark_first_delta(self):
+        if self.first_delta is None:
+            self.first_delta = time.perf_counter() - self.start
+            metrics.observe("turn_first_delta_seconds", self.first_delta, stage=self.stage)
+            self.span.add_event("first_delta")
+
+    def end(self, error: Optional[BaseException] = None, **attributes: Dict[str, Any]):
+        metrics.observe("turn_seconds", time.perf_counter() - self.start, stage=self.stage)
+        for key, value in attributes.items():
+            self.span.set_attribute(key, value)
+        if error is not None:
+            self.span.record_exception(error)
+            self.span.set_status(Status(StatusCode.ERROR, str(error)))
+        self.span.end()
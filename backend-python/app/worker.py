@@ -1,83 +1,238 @@
 import os
+import time
 import asyncio
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from livekit.agents import (
+    NOT_GIVEN,
     JobContext,
+    JobProcess,
     WorkerOptions,
     cli,
 )
 from livekit.agents.voice import Agent, AgentSession
 
+# Plugins register themselves on import, which LiveKit requires on the main thread
 from livekit.plugins import (
     silero,      # VAD
     deepgram,    # STT
     cartesia,    # TTS
 )
 
+from app.audio import FillerPolicy, PhraseCache, SegmentedSynthesis
+from app.livekit.admission import Admission
 from app.services.cerebras_livekit import get_llm
 from app.agent.prompts import (
     BASE_AGENT_PROMPT,
     BEHAVIORAL_REFINEMENT_PROMPT,
 )
+from app.config import settings
+from app.container import services
 from app.logging import logger
+from app.utils.metrics import metrics
+from app.utils.tracing import setup_tracing
+
+GREETING = "Hello! I am your AI sales assistant. How can I help you scale today?"
+FILLER_PHRASES = ("Let me see.", "That makes sense.", "Good question.", "Mm-hmm, one moment.")
+VOICE_ID = "79a045e3-1141-4b13-9a1c-7466c051ac9d" # British Male
 
 
 # -----------------------------
 # Custom Agent
 # -----------------------------
 class SalesAgent(Agent):
-    def __init__(self):
+    def __init__(self, fillers: Optional[FillerPolicy] = None):
         super().__init__(
             instructions=f"{BASE_AGENT_PROMPT}\n\n{BEHAVIORAL_REFINEMENT_PROMPT}"
         )
+        self.fillers = fillers
+
+    async def tts_node(self, text, model_settings):
+        def synthesize(chunks):
+            if settings.TTS_CHUNKING:
+                return SegmentedSynthesis(
+                    self.session.tts,
+                    lookahead=settings.TTS_LOOKAHEAD_SEGMENTS,
+                    clause_chars=settings.TTS_CLAUSE_CHARS,
+                    conn_options=self.session.conn_options.tts_conn_options,
+                )(chunks)
+            return Agent.default.tts_node(self, chunks, model_settings)
+
+        frames = synthesize(text) if self.fillers is None else self.fillers.cover(text, synthesize)
+        async for frame in frames:
+            yield frame
+
+
+# -----------------------------
+# Process Prewarm
+# -----------------------------
+def prewarm(proc: JobProcess):
+    """
+    Runs once per worker process, before it is handed a job (idle processes are
+    prewarmed ahead of demand). Loads the VAD model and builds the STT/TTS
+    clients and the sales agent that every job in this process reuses; their
+    connections are opened at job start, on the job's event loop.
+    """
+    start = time.perf_counter()
+    setup_tracing()
+    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["stt"] = deepgram.STT(
+        api_key=os.environ.get("DEEPGRAM_API_KEY"),
+    )
+    proc.userdata["tts"] = cartesia.TTS(
+        api_key=os.environ.get("CARTESIA_API_KEY"),
+        voice=VOICE_ID,
+        sample_rate=24000,
+    )
+    proc.userdata["phrases"] = PhraseCache(settings.AUDIO_CACHE_DIR, proc.userdata["tts"], VOICE_ID)
+    # The agent stack is built here, in the job process, never in the dispatching main process
+    services.warm()
+    elapsed = time.perf_counter() - start
+    metrics.observe("worker_prewarm_seconds", elapsed)
+    logger.info(f"Worker process {proc.pid} prewarmed in {elapsed:.2f}s")
 
 
 # -----------------------------
 # Worker Entrypoint
 # -----------------------------
+def session_id_for(ctx: JobContext) -> str:
+    """One SalesAgent session per LiveKit job, so concurrent rooms never share state."""
+    return f"livekit:{ctx.job.room.name}:{ctx.job.id}"
+
+
+def _log_failure(what: str):
+    """Done-callback for a background task: logs its exception instead of dropping it."""
+    def callback(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"{what} failed: {task.exception()!r}")
+    return callback
+
+
 async def entrypoint(ctx: JobContext):
+    job_start = time.perf_counter()
     logger.info(f"Starting agent for job {ctx.job.id}")
+    stt_client, tts_client = ctx.proc.userdata["stt"], ctx.proc.userdata["tts"]
+
+    # Open provider connections (TLS + websocket) while the room connects
+    tts_client.prewarm()
+    stt_client.prewarm()
+    llm_warmup = asyncio.create_task(services.cerebras.warm())
+    # Nothing awaits it (the greeting doesn't need the LLM), so failures are logged here
+    llm_warmup.add_done_callback(_log_failure("LLM warm-up"))
+    # Disk hits after the first job on this host; misses render in the background
+    phrases: PhraseCache = ctx.proc.userdata["phrases"]
+    greeting_audio = asyncio.create_task(phrases.render(GREETING))
+    prerender = asyncio.create_task(phrases.prerender([*FILLER_PHRASES, settings.LLM_HOLDING_PHRASE]))
+    prerender.add_done_callback(_log_failure("Phrase prerender"))
+
+    # Session lifecycle follows the job
+    session_id = session_id_for(ctx)
+    await services.session_memory.offload(services.session_memory.clear_session, session_id)
+
+    async def cleanup_session():
+        services.sales_agent.drop_reply(session_id)
+        await services.session_memory.offload(services.session_memory.clear_session, session_id)
+        logger.info(f"Cleared session {session_id}")
+        # Job processes are reused, so this is the process's registry so far
+        logger.info(f"Metrics after {session_id}: {metrics.snapshot()}")
+
+    ctx.add_shutdown_callback(cleanup_session)
 
     # Connect to LiveKit room
     await ctx.connect()
+    connected = time.perf_counter()
 
-    # Create Agent Session
-    # Using specific Cartesia settings to increase reliability on Windows
+    # Create Agent Session from the process's prewarmed components
     session = AgentSession(
-        vad=silero.VAD.load(),
-        stt=deepgram.STT(
-            api_key=os.environ.get("DEEPGRAM_API_KEY"),
-        ),
-        llm=get_llm(),
-        tts=cartesia.TTS(
-            api_key=os.environ.get("CARTESIA_API_KEY"),
-            voice="79a045e3-1141-4b13-9a1c-7466c051ac9d", # British Male
-            sample_rate=24000,
-        ),
+        vad=ctx.proc.userdata["vad"],
+        stt=stt_client,
+        llm=get_llm(session_id),
+        tts=tts_client,
         allow_interruptions=True,
     )
 
+    first_audio = asyncio.get_running_loop().create_future()
+
+    @session.on("agent_state_changed")
+    def _on_agent_state(ev):
+        if ev.new_state == "speaking" and not first_audio.done():
+            first_audio.set_result(time.perf_counter())
+
+    # Replies reach memory and move the stage only as far as the caller heard them.
+    # Submitted from the event callback, so it lands before the next turn's own store work.
+    def finish_reply(spoken: str, interrupted: bool):
+        done = services.session_memory.offload(services.sales_agent.finish_reply, session_id, spoken, interrupted)
+        done.add_done_callback(_log_failure("Reply commit"))
+
+    @session.on("conversation_item_added")
+    def _on_item(ev):
+        item = ev.item
+        if getattr(item, "role", None) == "assistant":
+            finish_reply(item.text_content or "", item.interrupted)
+
+    @session.on("speech_created")
+    def _on_speech(ev):
+        # Cut off before any audio played: no conversation item is added
+        def _on_done(handle):
+            if handle.interrupted:
+                finish_reply("", True)
+
+        if ev.source == "generate_reply":
+            ev.speech_handle.add_done_callback(_on_done)
+
+    fillers = None
+    if settings.FILLERS_ENABLED:
+        fillers = FillerPolicy(phrases, FILLER_PHRASES, threshold=settings.FILLER_THRESHOLD)
+
     # Start agent
     await session.start(
         room=ctx.room,
-        agent=SalesAgent(),
+        agent=SalesAgent(fillers=fillers),
     )
+    started = time.perf_counter()
     logger.info("Agent session started")
 
-    # Give a small delay for connections to warm up on Windows
-    await asyncio.sleep(2)
+    # Greet once someone is actually there to hear it, instead of a fixed delay
+    try:
+        await asyncio.wait_for(ctx.wait_for_participant(), timeout=settings.GREETING_READY_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"No participant joined within {settings.GREETING_READY_TIMEOUT:.0f}s. Greeting anyway.")
+    ready = time.perf_counter()
 
     # ✅ Initial greeting with error handling
     try:
         logger.info("Sending initial greeting...")
-        await session.say(
-            "Hello! I am your AI sales assistant. How can I help you scale today?",
+        try:
+            await greeting_audio
+            audio = phrases.frames(GREETING)
+        except Exception as e:
+            logger.warning(f"Cached greeting unavailable ({e!r}). Synthesizing it live.")
+            audio = NOT_GIVEN
+        session.say(
+            GREETING,
+            audio=audio,
             allow_interruptions=True,
         )
-        logger.info("Greeting sent successfully.")
+        try:
+            heard = await asyncio.wait_for(first_audio, timeout=settings.GREETING_READY_TIMEOUT)
+        except asyncio.TimeoutError:
+            metrics.incr("job_greeting_unheard")
+            logger.warning(
+                f"[Startup] job={ctx.job.id} no audio heard within {settings.GREETING_READY_TIMEOUT:.0f}s of the greeting"
+            )
+            return
+        metrics.observe("job_connect_seconds", connected - job_start)
+        metrics.observe("job_session_start_seconds", started - connected)
+        metrics.observe("job_participant_wait_seconds", ready - started)
+        metrics.observe("job_first_audio_seconds", heard - job_start)
+        logger.info(
+            f"[Startup] job={ctx.job.id} first audio after {heard - job_start:.2f}s "
+            f"(connect {connected - job_start:.2f}s, session {started - connected:.2f}s, "
+            f"participant wait {ready - started:.2f}s, greeting {heard - ready:.2f}s)"
+        )
     except Exception as e:
         logger.error(f"Failed to send greeting: {e}")
 
@@ -86,6 +241,7 @@ async def entrypoint(ctx: JobContext):
 # CLI bootstrap
 # -----------------------------
 if __name__ == "__main__":
+    admission = Admission.from_settings(settings)
     cli.run_app(
-        WorkerOptions(entrypoint_fnc=entrypoint)
+        WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm, **admission.worker_options(settings))
     )
@@ -0,0 +1,108 @@
+"""
+Analyzer micro-batching (ANALYZER_BATCH) versus one analyzer call per turn,
+with many sessions talking at once. Drives ConversationAnalyzer through the
+real Cerebras client against the in-process mock, whose response time grows
+with the completion's length (a batch answer is longer), with and without a
+client-side rate limit standing in for the account's request quota.
+
+    python -m benchmarks.analyzer_batch --sessions 200 --turns 5 --quota 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+PORT = 8112
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+os.environ["CEREBRAS_BASE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ["LLM_WARM_CONNECTION"] = "false"
+os.environ["INTENT_PRECLASSIFIER"] = "false"
+os.environ["RESPONSE_CACHE"] = "false"
+os.environ["ANALYZER_STREAMING"] = "false"
+
+import benchmarks.env  # noqa: F401
+from benchmarks.mock_cerebras import Faults, create_app
+
+import uvicorn
+
+from app.agent.analyzer import AnalyzerBatcher
+from app.agent.stages import SalesStage
+from app.container import services
+from app.services.resilience import FairRateLimiter
+from app.utils.metrics import metrics
+
+UTTERANCES = [
+    "We mostly lose leads after hours", "I'm the operations lead at a clinic", "How much does it cost?",
+    "That sounds useful", "Not sure, maybe", "We use a call center today", "Can it book meetings?",
+]
+HISTORY = [
+    {"role": "assistant", "content": "Hi! What does your team do today when a call comes in after hours?"},
+    {"role": "user", "content": "Mostly voicemail, honestly."},
+    {"role": "assistant", "content": "Got it. And roughly how many of those calls turn into customers?"},
+]
+
+
+async def session(i: int, turns: int, think: float, latencies: list):
+    rng = random.Random(i)
+    await asyncio.sleep(rng.uniform(0, think))
+    for turn in range(turns):
+        start = time.perf_counter()
+        await services.analyzer.analyze(rng.choice(UTTERANCES), HISTORY, SalesStage.PROBLEM)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * think)
+
+
+async def run(label: str, args, batcher, quota: float):
+    services.analyzer.batcher = batcher
+    services.cerebras.limiter = FairRateLimiter(quota) if quota else None
+    metrics.reset()
+    latencies: list = []
+    start = time.perf_counter()
+    await asyncio.gather(*(session(i, args.turns, args.think, latencies) for i in range(args.sessions)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    # Batched turns ride on analyzer_batch_requests; the rest are their own calls
+    upstream = (metrics.get("analyzer_requests") - metrics.get("analyzer_requests", mode="batched")
+                + metrics.get("analyzer_batch_requests"))
+    print(
+        f"{label:<22} {len(latencies) / elapsed:6.1f} turns/s  p50={statistics.median(latencies) * 1000:6.0f}ms  "
+        f"p99={latencies[int(len(latencies) * 0.99)] * 1000:6.0f}ms  upstream calls={upstream:5.0f}  "
+        f"fallbacks={metrics.get('analyzer_batch_fallbacks'):.0f}"
+    )
+
+
+async def main_async(args):
+    faults = Faults(latency=args.latency, jitter=args.latency / 4, completion_token_delay=args.word_delay)
+    server = uvicorn.Server(uvicorn.Config(create_app(faults), host="127.0.0.1", port=PORT, log_level="warning", timeout_graceful_shutdown=1))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        print(f"{args.sessions} sessions x {args.turns} turns, think time ~{args.think:.1f}s, "
+              f"upstream {args.latency * 1000:.0f}ms + {args.word_delay * 1000:.1f}ms/word")
+        for quota in (0, args.quota):
+            print(f"-- quota: {f'{quota:.0f} calls/s' if quota else 'none'}")
+            await run("one call per turn", args, None, quota)
+            for window, size in ((5, 8), (20, 16)):
+                await run(f"batched {window}ms/{size}", args, AnalyzerBatcher(window / 1000, size), quota)
+    finally:
+        await services.cerebras.aclose()
+        server.should_exit = True
+        await serve
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--think", type=float, default=1.0, help="seconds between a session's turns (mean)")
+    parser.add_argument("--latency", type=float, default=0.15, help="upstream time to first token")
+    parser.add_argument("--word-delay", type=float, default=0.001, help="upstream decode seconds per completion word")
+    parser.add_argument("--quota", type=float, default=100, help="upstream calls/s allowed in the rate-limited run")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Concurrent load on the HTTP API, in-process through the ASGI app.
+
+    python -m benchmarks.api_load --sessions 200 --turns 3
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import benchmarks.env  # noqa: F401
+from benchmarks.fake_llm import FakeCerebras, install
+
+import httpx
+
+from app.api import app
+
+UTTERANCES = ["hello", "I run sales at a small agency", "we miss too many calls", "how much is it?"]
+
+
+async def session(client: httpx.AsyncClient, turns: int, latencies: list):
+    session_id = (await client.post("/session/new", json={})).json()["session_id"]
+    for turn in range(turns):
+        start = time.perf_counter()
+        r = await client.post("/message", json={"text": UTTERANCES[turn % len(UTTERANCES)], "session_id": session_id})
+        r.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    await client.delete(f"/session/{session_id}")
+
+
+async def run(sessions: int, turns: int):
+    latencies: list = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(session(client, turns, latencies) for _ in range(sessions)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"sessions={sessions:<5} turns={len(latencies):<6} turns/sec={len(latencies) / elapsed:8.1f}  "
+        f"p50={statistics.median(latencies) * 1000:6.0f}ms  p99={p99 * 1000:6.0f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 50, 200])
+    parser.add_argument("--turns", type=int, default=3)
+    args = parser.parse_args()
+    install(FakeCerebras())
+    for sessions in args.sessions:
+        asyncio.run(run(sessions, args.turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Dummy credentials so app settings load without a real .env."""
+import os
+
+for key in ("CEREBRAS_API_KEY", "CARTESIA_API_KEY", "LIVEKIT_API_KEY", "LIVEKIT_API_SECRET", "LIVEKIT_URL"):
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
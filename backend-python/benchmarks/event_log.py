@@ -0,0 +1,92 @@
+"""
+Session event log: hot-path cost of logging, recovery time with and
+without snapshots, and bulk read throughput. Sessions are driven through
+SessionMemory directly (no LLM), then rebuilt from the log in a fresh
+store and compared with the originals.
+
+    python -m benchmarks.event_log --sessions 500 --turns 40
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import benchmarks.env  # noqa: F401
+
+from app.agent.memory import SessionMemory
+from app.agent.stages import SalesStage
+from app.storage.event_log import EventLog, read_events
+from app.storage.in_memory import InMemorySessionStore
+
+STAGES = list(SalesStage)
+
+
+def drive(memory: SessionMemory, sessions: int, turns: int) -> float:
+    """Runs a scripted conversation per session; returns seconds spent in SessionMemory calls."""
+    start = time.perf_counter()
+    for turn in range(turns):
+        for i in range(sessions):
+            sid = f"bench:{i}"
+            memory.add_message(sid, "user", f"user message {turn} for session {i}, about our sales pipeline")
+            memory.record(sid, "analysis", {"intent": "sharing_pain", "recommended_action": "stay"})
+            memory.set_metadata(sid, "pain_points", f"pain {turn}")
+            memory.add_message(sid, "assistant", f"assistant reply {turn}: that makes sense, tell me more about it.")
+            if turn % 8 == 7:
+                memory.advance_stage(sid, STAGES[(turn // 8 + 1) % len(STAGES)])
+    return time.perf_counter() - start
+
+
+def recover_all(log: EventLog, sessions: int, original: SessionMemory) -> tuple:
+    latencies, mismatches = [], 0
+    for i in range(sessions):
+        sid = f"bench:{i}"
+        start = time.perf_counter()
+        state = log.recover(sid)
+        latencies.append(time.perf_counter() - start)
+        history, metadata = original.store.load(sid)
+        expected = {k: (v.value if isinstance(v, SalesStage) else v) for k, v in metadata.items()}
+        if state is None or state[0] != history or state[1] != expected:
+            mismatches += 1
+    return latencies, mismatches
+
+
+def run(args, snapshot_every: int, directory: str):
+    log = EventLog(directory, flush_interval=0.05)
+    memory = SessionMemory(InMemorySessionStore(max_sessions=args.sessions * 2), events=log, snapshot_every=snapshot_every)
+    elapsed = drive(memory, args.sessions, args.turns)
+    log.flush(timeout=None)
+    sample = max(1, args.sessions // 50)
+    latencies, mismatches = recover_all(log, sample, memory)
+    log.close()
+    return elapsed, latencies, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--snapshot-every", type=int, default=50)
+    args = parser.parse_args()
+    calls = args.sessions * args.turns * 4 + args.sessions * (args.turns // 8)
+
+    baseline = drive(SessionMemory(InMemorySessionStore(max_sessions=args.sessions * 2)), args.sessions, args.turns)
+    print(f"{args.sessions} sessions x {args.turns} turns, {calls} memory calls")
+    print(f"no event log          {baseline / calls * 1e6:6.2f}us/call")
+
+    for label, every in (("snapshots", args.snapshot_every), ("no snapshots", 10**9)):
+        with tempfile.TemporaryDirectory() as directory:
+            elapsed, latencies, mismatches = run(args, every, directory)
+            print(
+                f"event log ({label:<12}) {elapsed / calls * 1e6:6.2f}us/call  "
+                f"recover p50={statistics.median(latencies) * 1000:7.2f}ms max={max(latencies) * 1000:7.2f}ms  "
+                f"mismatches={mismatches}"
+            )
+            if every == args.snapshot_every:
+                start = time.perf_counter()
+                events = sum(1 for _ in read_events(directory))
+                read = time.perf_counter() - start
+                print(f"read_events           {events} events in {read:.2f}s ({events / read:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Deterministic local stand-in for `services.cerebras`.
+
+Installs itself over the singleton's methods so every caller (analyzer,
+SalesAgent, CerebrasLLMStream) hits the fake without code changes.
+Set dummy API keys before importing app modules, e.g. via `benchmarks.env`.
+"""
+import asyncio
+import json
+import random
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from app.utils.tokens import estimate_tokens, messages_tokens
+
+REPLY = "Got it, thanks for sharing that. So what does your team use today to handle inbound calls?"
+BATCH_TURN = re.compile(r"^### Conversation (\S+)\n.*?^Latest User Message: (.*?)$", re.M | re.S)
+
+
+@dataclass
+class LatencyModel:
+    """
+    Lognormal latency around `median` (sigma=0 is fixed), plus a `tail_rate`
+    share of requests that take `tail` seconds instead.
+    Parsed from specs like "0.08" or "0.08,sigma=0.4,tail_rate=0.02,tail=1.5".
+    """
+
+    median: float
+    sigma: float = 0.0
+    tail_rate: float = 0.0
+    tail: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        median, *options = spec.split(",")
+        return cls(float(median), **{k: float(v) for k, v in (o.split("=") for o in options)})
+
+    def sample(self, rng: random.Random) -> float:
+        if self.tail_rate and rng.random() < self.tail_rate:
+            return self.tail
+        if not self.sigma:
+            return self.median
+        return rng.lognormvariate(0, self.sigma) * self.median
+
+
+Latency = Union[float, LatencyModel]
+
+
+class FakeCerebras:
+    def __init__(self, analyzer_latency: Latency = 0.05, first_token_latency: Latency = 0.08,
+                 token_interval: float = 0.005, jitter: float = 0.0, seed: int = 0,
+                 scripted: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.analyzer_latency = analyzer_latency
+        self.first_token_latency = first_token_latency
+        self.token_interval = token_interval
+        self.jitter = jitter
+        # user text -> analyzer output, for replaying stored conversations
+        self.scripted = scripted or {}
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.last_generation_messages: List[Dict[str, str]] = []
+
+    def _delay(self, base: Latency) -> float:
+        if isinstance(base, LatencyModel):
+            return base.sample(self._rng)
+        if not self.jitter:
+            return base
+        return max(0.0, self._rng.lognormvariate(0, self.jitter) * base)
+
+    def _count(self, messages: List[Dict[str, str]], completion: str):
+        self.prompt_tokens += messages_tokens(messages)
+        self.completion_tokens += estimate_tokens(completion)
+
+    def analysis_for_turn(self, user_text: str) -> Dict[str, Any]:
+        scripted = self.scripted.get(user_text)
+        if scripted is None:
+            return self.analysis_for(user_text)
+        return dict(self.analysis_for(user_text), **scripted)
+
+    @staticmethod
+    def analysis_for(user_text: str) -> Dict[str, Any]:
+        text = user_text.lower()
+        if any(w in text for w in ("price", "cost")):
+            intent = "pricing_query"
+        elif text.strip(" .!") in ("yes", "yeah", "okay", "sure"):
+            intent = "affirmation"
+        elif "problem" in text or "miss" in text:
+            intent = "sharing_pain"
+        else:
+            intent = "providing_info"
+        return {
+            "intent": intent,
+            "extracted_info": {},
+            "is_vague": False,
+            "recommended_action": "advance" if intent != "providing_info" else "stay",
+        }
+
+    async def chat_completion(self, messages: List[Dict[str, str]], temperature: float = 0.7,
+                              max_tokens: Optional[int] = None, **kwargs) -> str:
+        self.calls += 1
+        await asyncio.sleep(self._delay(self.analyzer_latency))
+        prompt = messages[-1]["content"]
+        if "Latest User Message:" not in prompt:
+            # Summarizer and other free-text callers
+            reply = "- Caller runs a small agency\n- Misses inbound calls after hours\n- Open to a demo"
+        elif "### Conversation " in prompt:
+            # Batched analyzer: one analysis per conversation, tagged with its id
+            reply = json.dumps({"results": [
+                dict(self.analysis_for_turn(text.strip()), id=cid) for cid, text in BATCH_TURN.findall(prompt)
+            ]})
+        else:
+            user_text = prompt.rsplit("Latest User Message:", 1)[-1].strip()
+            reply = json.dumps(self.analysis_for_turn(user_text))
+        self._count(messages, reply)
+        return reply
+
+    async def stream_chat_completion(self, messages: List[Dict[str, str]], temperature: float = 0.7,
+                                     max_tokens: Optional[int] = None, **kwargs) -> AsyncIterator[str]:
+        self.calls += 1
+        prompt = messages[-1]["content"]
+        if "Latest User Message:" in prompt:
+            # Streaming analyzer: emit the JSON in small chunks
+            await asyncio.sleep(self._delay(self.first_token_latency))
+            user_text = prompt.rsplit("Latest User Message:", 1)[-1].strip()
+            payload = json.dumps(self.analysis_for_turn(user_text))
+            self._count(messages, payload)
+            for i in range(0, len(payload), 8):
+                await asyncio.sleep(self.token_interval)
+                yield payload[i:i + 8]
+            return
+        self.last_generation_messages = messages
+        self._count(messages, REPLY)
+        await asyncio.sleep(self._delay(self.first_token_latency))
+        for i, word in enumerate(REPLY.split(" ")):
+            if i:
+                await asyncio.sleep(self.token_interval)
+            yield word if i == 0 else f" {word}"
+
+
+def install(fake: FakeCerebras):
+    from app.container import services
+    services.cerebras.chat_completion = fake.chat_completion
+    services.cerebras.stream_chat_completion = fake.stream_chat_completion
+    return fake
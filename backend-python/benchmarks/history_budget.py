@@ -0,0 +1,63 @@
+"""
+Prompt size over a long call, with and without the history budget.
+
+    python -m benchmarks.history_budget --turns 60
+"""
+import argparse
+import asyncio
+
+import benchmarks.env  # noqa: F401
+from benchmarks.fake_llm import FakeCerebras, install
+
+from app.agent.history import history_manager
+from app.utils.tokens import estimate_tokens, MESSAGE_OVERHEAD_TOKENS
+from app.container import services
+
+UTTERANCES = [
+    "We're a twelve person real estate agency in Leeds.",
+    "Honestly the biggest problem is we miss calls when everyone is out on viewings.",
+    "We tried an answering service but leads complained it felt robotic.",
+    "How does your system know which listing the caller is asking about?",
+    "What would something like this cost for a team our size?",
+]
+
+
+def prompt_tokens(messages) -> int:
+    return sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+async def run(turns: int, budgeted: bool):
+    session_id = f"bench-history-{budgeted}"
+    services.session_memory.clear_session(session_id)
+    if not budgeted:
+        history_manager.token_budget = 10 ** 9
+        history_manager.keep_turns = 10 ** 6
+    fake = install(FakeCerebras(analyzer_latency=0, first_token_latency=0, token_interval=0))
+    sizes = []
+    for turn in range(turns):
+        await services.sales_agent.generate_response(UTTERANCES[turn % len(UTTERANCES)], session_id)
+        # Let background summarization land, as it would between spoken turns
+        await asyncio.sleep(0)
+        sizes.append(prompt_tokens(fake.last_generation_messages))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=60)
+    args = parser.parse_args()
+    budget, keep = history_manager.token_budget, history_manager.keep_turns
+
+    budgeted = asyncio.run(run(args.turns, budgeted=True))
+    full = asyncio.run(run(args.turns, budgeted=False))
+    history_manager.token_budget, history_manager.keep_turns = budget, keep
+
+    print(f"budget={budget} tokens, keep_turns={keep}")
+    print(f"{'turn':>5} {'full history':>13} {'budgeted':>9}")
+    for turn in range(9, args.turns, 10):
+        print(f"{turn + 1:>5} {full[turn]:>13} {budgeted[turn]:>9}")
+    print(f"{'max':>5} {max(full):>13} {max(budgeted):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Startup cost of each entry point, measured in a fresh interpreter per run:
+the import itself (what the CLI prompt, the API process and the worker's
+dispatching main process wait for) and import + services.warm() (what a
+first turn, or a worker job process's prewarm, waits for). It also lists
+which heavy dependencies the bare import already loads.
+
+    python -m benchmarks.import_time --runs 5
+    python -m benchmarks.import_time --save startup.json
+    python -m benchmarks.import_time --check startup.json --tolerance 0.25   # exits 1 on regression
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import benchmarks.env  # noqa: F401  (dummy keys, inherited by the child interpreters)
+
+ENTRY_POINTS = ("app.main", "app.api", "app.worker")
+HEAVY = ("cerebras.cloud.sdk", "httpx", "fastapi", "livekit.agents", "livekit.plugins.silero", "app.agent.sales_agent")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+loaded = [name for name in {heavy!r} if name in sys.modules]
+from app.container import services
+services.warm()
+print(json.dumps({{"import_ms": (imported - start) * 1000, "ready_ms": (time.perf_counter() - start) * 1000, "loaded": loaded}}))
+"""
+
+
+def measure(module: str, runs: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)], capture_output=True, text=True
+        )
+        if result.returncode:
+            raise RuntimeError(f"{module}: {result.stderr.strip().splitlines()[-1]}")
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        "module": module,
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "ready_ms": statistics.median(s["ready_ms"] for s in samples),
+        "loaded": samples[0]["loaded"],
+    }
+
+
+def check(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Import time may not grow by more than `tolerance`, and the bare import may not load new heavy modules."""
+    failures = []
+    previous = {r["module"]: r for r in baseline["results"]}
+    for result in results:
+        base = previous.get(result["module"])
+        if base is None:
+            continue
+        if result["import_ms"] > base["import_ms"] * (1 + tolerance):
+            failures.append(f"{result['module']}: import {result['import_ms']:.0f}ms > baseline {base['import_ms']:.0f}ms")
+        added = sorted(set(result["loaded"]) - set(base["loaded"]))
+        if added:
+            failures.append(f"{result['module']}: import now loads {', '.join(added)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--save", type=Path, help="write results as a baseline")
+    parser.add_argument("--check", type=Path, help="compare against a baseline and exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = []
+    for module in ENTRY_POINTS:
+        result = measure(module, args.runs)
+        print(
+            f"{module:<11} import={result['import_ms']:6.0f}ms  import+warm={result['ready_ms']:6.0f}ms  "
+            f"import loads: {', '.join(result['loaded']) or '-'}"
+        )
+        results.append(result)
+
+    if args.save:
+        args.save.write_text(json.dumps({"results": results}, indent=2))
+    if args.check:
+        failures = check(results, json.loads(args.check.read_text()), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
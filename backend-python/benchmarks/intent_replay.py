@@ -0,0 +1,56 @@
+"""
+Replays a labelled corpus through the local intent pre-classifier and
+reports, per confidence threshold, how many analyzer LLM calls would be
+skipped and how often the local label agrees with the LLM label.
+
+Corpus lines are JSON: {"text": ..., "stage": ..., "intent": <LLM label>}.
+
+    python -m benchmarks.intent_replay --thresholds 0.7 0.8 0.85 0.9 --analyzer-ms 350
+"""
+import argparse
+import json
+from pathlib import Path
+
+import benchmarks.env  # noqa: F401
+
+from app.agent.intent_classifier import intent_classifier
+from app.agent.stages import SalesStage
+
+DEFAULT_CORPUS = Path(__file__).parent / "data" / "intent_corpus.jsonl"
+
+
+def load(path: Path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.7, 0.8, 0.85, 0.9])
+    parser.add_argument("--analyzer-ms", type=float, default=350, help="typical analyzer LLM latency")
+    parser.add_argument("--show-disagreements", action="store_true")
+    args = parser.parse_args()
+
+    rows = load(args.corpus)
+    scored = []
+    for row in rows:
+        result, confidence = intent_classifier.classify(row["text"], SalesStage(row["stage"]))
+        scored.append((row, result, confidence))
+
+    print(f"corpus={args.corpus.name} turns={len(rows)}")
+    print(f"{'threshold':>9} {'hit rate':>9} {'agreement':>10} {'saved ms/turn':>14}")
+    for threshold in args.thresholds:
+        hits = [(row, result) for row, result, conf in scored if result is not None and conf >= threshold]
+        agree = sum(1 for row, result in hits if result["intent"] == row["intent"])
+        hit_rate = len(hits) / len(rows) if rows else 0.0
+        agreement = agree / len(hits) if hits else 1.0
+        print(f"{threshold:>9.2f} {hit_rate:>9.1%} {agreement:>10.1%} {hit_rate * args.analyzer_ms:>14.0f}")
+        if args.show_disagreements:
+            for row, result in hits:
+                if result["intent"] != row["intent"]:
+                    print(f"    [{row['stage']}] '{row['text']}': local={result['intent']} llm={row['intent']}")
+
+
+if __name__ == "__main__":
+    main()
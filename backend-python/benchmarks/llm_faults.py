@@ -0,0 +1,115 @@
+"""
+Drives the real CerebrasService against the in-process mock server under
+injected faults and reports success rate and latency per client policy.
+
+    python -m benchmarks.llm_faults --requests 300 --error-rate 0.05 --hang-rate 0.02 --tail-rate 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("LOG_LEVEL", "CRITICAL")  # injected faults would flood the retry warnings
+
+import benchmarks.env  # noqa: F401
+from benchmarks.mock_cerebras import Faults, create_app
+
+import uvicorn
+
+from app.config import settings
+from app.utils.errors import LLMError
+from app.utils.metrics import metrics
+
+PORT = 8111
+
+POLICIES = {
+    "no-retry": dict(LLM_MAX_RETRIES=0, LLM_HEDGING=False),
+    "retry": dict(LLM_MAX_RETRIES=2, LLM_HEDGING=False),
+    "retry+hedge": dict(LLM_MAX_RETRIES=2, LLM_HEDGING=True),
+}
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+async def one(service, latencies: list, failures: list):
+    start = time.perf_counter()
+    try:
+        async for _ in service.stream_chat_completion(MESSAGES):
+            pass
+    except LLMError:
+        failures.append(time.perf_counter() - start)
+        return
+    latencies.append(time.perf_counter() - start)
+
+
+async def run_policy(name: str, overrides: dict, requests: int, concurrency: int):
+    from app.services.cerebras import CerebrasService
+
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    metrics.reset()
+    service = CerebrasService()
+    # the breaker would short-circuit the whole run under sustained faults
+    service.breaker.failure_threshold = 10**9
+    latencies: list = []
+    failures: list = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with semaphore:
+            await one(service, latencies, failures)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await service.aclose()
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+    p50 = statistics.median(latencies) if latencies else 0.0
+    print(
+        f"{name:<12} ok={len(latencies) / requests:6.1%}  p50={p50 * 1000:6.0f}ms  p99={p99 * 1000:6.0f}ms  "
+        f"retries={metrics.get('llm_retries', operation='stream_chat_completion'):<4.0f} "
+        f"hedges={metrics.get('llm_hedges', operation='stream_chat_completion'):<4.0f} wall={elapsed:5.1f}s"
+    )
+
+
+async def main_async(args):
+    faults = Faults(
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        hang_rate=args.hang_rate,
+        tail_rate=args.tail_rate,
+    )
+    server = uvicorn.Server(uvicorn.Config(create_app(faults), host="127.0.0.1", port=PORT, log_level="warning", timeout_graceful_shutdown=1))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    settings.CEREBRAS_BASE_URL = f"http://127.0.0.1:{PORT}"
+    settings.LLM_FIRST_TOKEN_TIMEOUT = args.first_token_timeout
+    settings.LLM_BACKOFF_BASE = 0.05
+    settings.LLM_WARM_CONNECTION = False
+    try:
+        for name, overrides in POLICIES.items():
+            await run_policy(name, overrides, args.requests, args.concurrency)
+    finally:
+        server.should_exit = True
+        await serve
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--throttle-rate", type=float, default=0.02)
+    parser.add_argument("--hang-rate", type=float, default=0.02)
+    parser.add_argument("--tail-rate", type=float, default=0.05)
+    parser.add_argument("--first-token-timeout", type=float, default=1.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Runs N simulated LiveKit rooms concurrently on one worker process and
+checks that each room's session state stays isolated.
+
+    python -m benchmarks.load_rooms --rooms 1 10 100 --turns 5
+"""
+import argparse
+import asyncio
+import time
+
+import benchmarks.env  # noqa: F401
+from benchmarks.fake_llm import FakeCerebras, install
+
+from livekit.agents import llm
+
+from app.container import services
+from app.services.cerebras_livekit import get_llm
+
+
+async def run_room(room: int, turns: int) -> int:
+    session_id = f"livekit:room-{room}:job-{room}"
+    services.session_memory.clear_session(session_id)
+    cerebras_llm = get_llm(session_id)
+    chat_ctx = llm.ChatContext()
+    for turn in range(turns):
+        chat_ctx.add_message(role="user", content=f"room {room} says hello {turn}")
+        reply = []
+        async with cerebras_llm.chat(chat_ctx=chat_ctx) as stream:
+            async for chunk in stream:
+                if chunk.delta and chunk.delta.content:
+                    reply.append(chunk.delta.content)
+        chat_ctx.add_message(role="assistant", content="".join(reply))
+
+    history = services.session_memory.get_history(session_id)
+    users = [m["content"] for m in history if m["role"] == "user"]
+    assert users == [f"room {room} says hello {t}" for t in range(turns)], f"room {room} state leaked"
+    services.session_memory.clear_session(session_id)
+    return turns
+
+
+async def run(rooms: int, turns: int):
+    start = time.perf_counter()
+    done = await asyncio.gather(*(run_room(r, turns) for r in range(rooms)))
+    elapsed = time.perf_counter() - start
+    total = sum(done)
+    print(f"rooms={rooms:<5} turns={total:<6} elapsed={elapsed:6.2f}s  turns/sec={total / elapsed:8.1f}  isolated=ok")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+    install(FakeCerebras())
+    for rooms in args.rooms:
+        asyncio.run(run(rooms, args.turns))
+
+
+if __name__ == "__main__":
+    main()
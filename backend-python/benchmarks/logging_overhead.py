@@ -0,0 +1,108 @@
+"""
+Event-loop cost of logging per turn. Replays the stored conversations
+against a zero-latency fake LLM, so the loop is busy all the time and
+time per turn is CPU per turn, once per logging configuration. The
+overhead is measured against a run with INFO lines disabled.
+
+    python -m benchmarks.logging_overhead --sessions 100
+    python -m benchmarks.logging_overhead --write-latency 100   # stdout blocks 100us per write
+
+Lines go to `--output` (default /dev/null). `--write-latency` makes each
+write block, as stdout does when the terminal or log collector lags.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import benchmarks.env  # noqa: F401
+from benchmarks.fake_llm import FakeCerebras, install
+from benchmarks.replay import CONVERSATIONS, load_conversations, run, scripted_analyses
+
+from loguru import logger
+
+from app.logging import setup_logging
+
+# label -> setup_logging arguments (None: INFO lines off)
+CONFIGS = {
+    "off (WARNING)": None,
+    "text": dict(log_format="text", enqueue=False),
+    "text, loguru enqueue": "loguru-enqueue",
+    "text, queued": dict(log_format="text", enqueue=True),
+    "json": dict(log_format="json", enqueue=False),
+    "json, queued": dict(log_format="json", enqueue=True),
+    "json, queued, sampled": dict(log_format="json", enqueue=True, sample="flow=0.1,guardrail=0.1,turn=0.1"),
+}
+
+
+class SlowStream:
+    """Stream whose writes block (releasing the GIL, like a full pipe) for `latency` seconds."""
+
+    def __init__(self, stream, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text: str):
+        time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class LineCounter:
+    def __init__(self):
+        self.lines = 0
+
+    def __call__(self, message):
+        self.lines += 1
+
+
+def configure(config, stream):
+    if config is None:
+        setup_logging(log_format="text", enqueue=False, sample="", level="WARNING", stream=stream)
+    elif config == "loguru-enqueue":
+        setup_logging(log_format="text", enqueue=False, sample="", level="INFO", stream=stream)
+        # Same sink, through loguru's own (pickling) queue
+        logger.remove()
+        logger.add(stream, colorize=True, level="INFO", enqueue=True)
+    else:
+        setup_logging(level="INFO", stream=stream, **{"sample": "", **config})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=3, help="runs per configuration; the fastest counts")
+    parser.add_argument("--output", default=os.devnull)
+    parser.add_argument("--write-latency", type=float, default=0.0, help="microseconds each write blocks")
+    args = parser.parse_args()
+
+    conversations = load_conversations(CONVERSATIONS)
+    fake = install(FakeCerebras(analyzer_latency=0.0, first_token_latency=0.0, token_interval=0.0,
+                                scripted=scripted_analyses(conversations)))
+    stream = open(args.output, "w")
+    if args.write_latency:
+        stream = SlowStream(stream, args.write_latency / 1e6)
+
+    # Warm-up, and how many lines one turn writes
+    counter = LineCounter()
+    setup_logging(log_format="text", enqueue=False, sample="", level="INFO", stream=stream)
+    logger.add(counter, level="INFO")
+    turns = asyncio.run(run(args.sessions, conversations, fake, "agent"))["turns"]
+    print(f"{args.sessions} sessions, {turns} turns, {counter.lines / turns:.1f} INFO lines per turn")
+
+    baseline = None
+    print(f"{'config':<24} {'us/turn':>8} {'logging us/turn':>16}")
+    for label, config in CONFIGS.items():
+        configure(config, stream)
+        best = min(1e6 / asyncio.run(run(args.sessions, conversations, fake, "agent"))["turns_per_sec"]
+                   for _ in range(args.rounds))
+        logger.complete()
+        baseline = best if baseline is None else baseline
+        print(f"{label:<24} {best:8.0f} {best - baseline:16.0f}")
+    setup_logging(level="WARNING")
+
+
+if __name__ == "__main__":
+    main()
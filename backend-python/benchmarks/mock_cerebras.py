@@ -0,0 +1,151 @@
+"""
+OpenAI-compatible mock of the Cerebras chat endpoint with injectable latency
+and faults, for exercising the real client (pool, deadlines, retries, hedging,
+breaker) without the network.
+
+    python -m benchmarks.mock_cerebras --port 8100 --error-rate 0.05 --hang-rate 0.02
+    CEREBRAS_BASE_URL=http://127.0.0.1:8100 python -m app.main
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLY = "Thanks for sharing that. What does your team use today to handle inbound calls?"
+
+
+@dataclass
+class Faults:
+    latency: float = 0.15       # seconds before the first token / full response
+    jitter: float = 0.05
+    tail_rate: float = 0.0      # share of requests that take tail_latency instead
+    tail_latency: float = 2.0
+    token_delay: float = 0.01
+    completion_token_delay: float = 0.0  # non-streaming: extra seconds per completion word (decode time)
+    error_rate: float = 0.0     # HTTP 500
+    throttle_rate: float = 0.0  # HTTP 429
+    hang_rate: float = 0.0      # never answers (until the client gives up)
+
+
+def create_app(faults: Faults = None) -> FastAPI:
+    faults = faults or Faults()
+    app = FastAPI(title="Mock Cerebras")
+    app.state.faults = faults
+    app.state.requests = 0
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "llama3.3-70b", "object": "model", "created": 0, "owned_by": "mock"}]}
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        roll = random.random()
+        if roll < faults.error_rate:
+            return JSONResponse({"error": {"message": "injected failure"}}, status_code=500)
+        roll -= faults.error_rate
+        if roll < faults.throttle_rate:
+            return JSONResponse({"error": {"message": "injected throttle"}}, status_code=429)
+        roll -= faults.throttle_rate
+        if roll < faults.hang_rate:
+            await asyncio.sleep(3600)
+
+        delay = faults.tail_latency if random.random() < faults.tail_rate else faults.latency
+        await asyncio.sleep(max(0.0, delay + random.uniform(-faults.jitter, faults.jitter)))
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "llama3.3-70b")
+        content = _content(body)
+        if not body.get("stream"):
+            if faults.completion_token_delay:
+                await asyncio.sleep(faults.completion_token_delay * len(content.split(" ")))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "system_fingerprint": "mock",
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                "usage": {
+                    "prompt_tokens": _prompt_tokens(body),
+                    "completion_tokens": len(content.split(" ")),
+                    "total_tokens": _prompt_tokens(body) + len(content.split(" ")),
+                },
+            }
+
+        async def events():
+            for i, word in enumerate(content.split(" ")):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "system_fingerprint": "mock",
+                    "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(faults.token_delay)
+            words = len(content.split(" "))
+            usage = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "system_fingerprint": "mock",
+                "choices": [],
+                "usage": {"prompt_tokens": _prompt_tokens(body), "completion_tokens": words, "total_tokens": _prompt_tokens(body) + words},
+            }
+            yield f"data: {json.dumps(usage)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def _prompt_tokens(body: dict) -> int:
+    return sum(len(m.get("content") or "") // 4 + 1 for m in body.get("messages", []))
+
+
+def _content(body: dict) -> str:
+    if body.get("response_format"):
+        analysis = {
+            "intent": "other",
+            "is_vague": False,
+            "recommended_action": "stay",
+            "extracted_info": {
+                "role": None, "company": None, "pain_points": None, "value_accepted": None,
+                "concerns_addressed": None, "meeting_intent": None, "meeting_locked": None,
+            },
+        }
+        prompt = body["messages"][-1]["content"]
+        ids = re.findall(r"^### Conversation (\S+)$", prompt, re.M)
+        if ids:
+            # Batched analyzer prompt
+            return json.dumps({"results": [dict(analysis, id=cid) for cid in ids]})
+        return json.dumps(analysis)
+    return REPLY
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8100)
+    for field, default in Faults.__dataclass_fields__.items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=float, default=default.default)
+    args = parser.parse_args()
+    faults = Faults(**{field: getattr(args, field) for field in Faults.__dataclass_fields__})
+    uvicorn.run(create_app(faults), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
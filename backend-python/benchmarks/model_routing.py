@@ -0,0 +1,195 @@
+"""
+Model routing policies, replayed end to end. The stored conversations run
+through the real CerebrasService (router, fallback racing, retries) against
+a fake SDK client that answers as each model would: the large model slower
+and with an occasional stall, the small one fast but sometimes picking the
+wrong intent. Per policy: turns/sec, p50/p99 turn latency, tokens per turn
+on each model (losing fallback races included), fallbacks raced per turn,
+and agreement with the first policy (large model everywhere): the share of
+analyzer intents that match the large model's, and of turns that end in the
+same stage.
+
+    python -m benchmarks.model_routing --sessions 200
+    python -m benchmarks.model_routing --large-latency 0.3,sigma=0.3,tail_rate=0.1,tail=3.0 --fallback-after 0.4
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import zlib
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import benchmarks.env  # noqa: F401
+from benchmarks.fake_llm import FakeCerebras, LatencyModel
+from benchmarks.replay import CONVERSATIONS, load_conversations, scripted_analyses
+
+from app.agent.schemas import ANALYZER_INTENTS
+from app.container import services
+from app.services.cerebras import CerebrasService
+from app.services.model_router import ModelRouter, Route
+from app.services.resilience import llm_session
+from app.utils.metrics import metrics
+from app.utils.tokens import estimate_tokens, messages_tokens
+
+LARGE, SMALL = "llama3.3-70b", "llama3.1-8b"
+
+
+@dataclass
+class ModelProfile:
+    latency: LatencyModel  # to the full response, or to the first token when streaming
+    token_interval: float
+    error_rate: float = 0.0  # share of analyses with the wrong intent
+
+
+class FakeModelClient:
+    """Stands in for AsyncCerebras: `chat.completions.create` answers as the named model would."""
+
+    def __init__(self, profiles: Dict[str, ModelProfile], fake: FakeCerebras, seed: int = 0):
+        self.profiles = profiles
+        self.fake = fake
+        self.rng = random.Random(seed)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.tokens = {model: 0 for model in profiles}
+        self.analyses = 0
+        self.agreed = 0
+
+    async def create(self, messages, model, temperature=None, max_tokens=None, stream=False, **kwargs):
+        profile = self.profiles[model]
+        text = "".join([delta async for delta in self.fake.stream_chat_completion(messages)])
+        text = self._answer(model, profile, messages[-1]["content"], text)
+        words = text.split(" ")
+        # Roughly a token per word
+        finish_reason = "length" if max_tokens and len(words) > max_tokens else "stop"
+        text = " ".join(words[:max_tokens])
+        self.tokens[model] += messages_tokens(messages) + estimate_tokens(text)
+        if stream:
+            return FakeStream(self._chunks(profile, text, finish_reason))
+        await asyncio.sleep(profile.latency.sample(self.rng))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text), finish_reason=finish_reason)],
+            usage=SimpleNamespace(prompt_tokens=messages_tokens(messages), completion_tokens=estimate_tokens(text)),
+        )
+
+    def _answer(self, model: str, profile: ModelProfile, prompt: str, text: str) -> str:
+        if "Latest User Message:" not in prompt or "### Conversation " in prompt:
+            return text
+        self.analyses += 1
+        # Same session and prompt, same answer, so policies differ only where their prompts do
+        rng = random.Random(zlib.crc32(f"{model}\0{llm_session.get()}\0{prompt}".encode()))
+        if rng.random() >= profile.error_rate:
+            self.agreed += 1
+            return text
+        analysis = json.loads(text)
+        analysis["intent"] = rng.choice([i for i in ANALYZER_INTENTS if i != analysis["intent"]])
+        analysis["recommended_action"] = rng.choice(("stay", "advance"))
+        return json.dumps(analysis)
+
+    async def _chunks(self, profile: ModelProfile, text: str, finish_reason: str):
+        await asyncio.sleep(profile.latency.sample(self.rng))
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(profile.token_interval)
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(
+                delta=SimpleNamespace(content=word if i == 0 else f" {word}"),
+                finish_reason=finish_reason if i == len(words) - 1 else None,
+            )])
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __aiter__(self):
+        return self.chunks
+
+    async def close(self):
+        await self.chunks.aclose()
+
+
+def policies(fallback_after: float) -> Dict[str, Tuple[Route, Dict[str, Dict[str, Any]]]]:
+    small_helpers = {"analyzer": {"model": SMALL}, "summary": {"model": SMALL, "max_tokens": 200}}
+    fallback = {"generation": {"fallback": SMALL, "fallback_after": fallback_after}}
+    return {
+        "large everywhere": (Route(LARGE), {}),
+        "small everywhere": (Route(SMALL), {}),
+        "small analyzer/summary": (Route(LARGE), small_helpers),
+        "+ generation fallback": (Route(LARGE), {**small_helpers, **fallback}),
+        "+ closing capped": (Route(LARGE), {**small_helpers, **fallback, "generation:closing": {"max_tokens": 12}}),
+    }
+
+
+def use(router: ModelRouter, client: FakeModelClient):
+    # Swap in a service on the new routes; callers look services.cerebras up per call
+    cerebras = CerebrasService(router)
+    cerebras.client = client
+    services.__dict__["model_router"] = router
+    services.__dict__["cerebras"] = cerebras
+
+
+async def run(sessions: int, conversations: List[Dict[str, Any]]) -> Tuple[List[float], Dict[Tuple[int, int], str], float]:
+    latencies: List[float] = []
+    stages: Dict[Tuple[int, int], str] = {}
+
+    async def converse(i: int, conversation: Dict[str, Any]):
+        session_id = f"routing:{i}"
+        services.session_memory.clear_session(session_id)
+        for t, turn in enumerate(conversation["turns"]):
+            start = time.perf_counter()
+            await services.sales_agent.generate_response(turn["user"], session_id)
+            latencies.append(time.perf_counter() - start)
+            stages[i, t] = services.session_memory.get_metadata(session_id, "stage").value
+        services.session_memory.clear_session(session_id)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(converse(i, conversations[i % len(conversations)]) for i in range(sessions)))
+    return latencies, stages, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--large-latency", type=LatencyModel.parse, default=LatencyModel(0.25, sigma=0.3, tail_rate=0.05, tail=2.0))
+    parser.add_argument("--small-latency", type=LatencyModel.parse, default=LatencyModel(0.08, sigma=0.3))
+    parser.add_argument("--small-error-rate", type=float, default=0.08)
+    parser.add_argument("--fallback-after", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    conversations = load_conversations(CONVERSATIONS)
+    profiles = {
+        LARGE: ModelProfile(args.large_latency, token_interval=0.01),
+        SMALL: ModelProfile(args.small_latency, token_interval=0.003, error_rate=args.small_error_rate),
+    }
+    fake = FakeCerebras(analyzer_latency=0.0, first_token_latency=0.0, token_interval=0.0,
+                        scripted=scripted_analyses(conversations))
+
+    print(f"{args.sessions} sessions; large={args.large_latency}, small={args.small_latency} "
+          f"with {args.small_error_rate:.0%} wrong intents; fallback after {args.fallback_after}s")
+    print(f"{'policy':<24} {'turns/s':>8} {'p50':>7} {'p99':>7} {'large tok/turn':>15} {'small tok/turn':>15} "
+          f"{'fallbacks/turn':>15} {'intent agree':>13} {'stage agree':>12}")
+    reference = None
+    for label, (default, routes) in policies(args.fallback_after).items():
+        client = FakeModelClient(profiles, fake, seed=args.seed)
+        use(ModelRouter(default, routes), client)
+        fallbacks = metrics.get("llm_fallbacks")
+        latencies, stages, elapsed = asyncio.run(run(args.sessions, conversations))
+        reference = stages if reference is None else reference
+        turns = len(latencies)
+        latencies.sort()
+        same_stage = sum(stages[k] == reference[k] for k in stages) / turns
+        print(
+            f"{label:<24} {turns / elapsed:8.0f} {statistics.median(latencies) * 1000:5.0f}ms "
+            f"{latencies[min(turns - 1, int(turns * 0.99))] * 1000:5.0f}ms "
+            f"{client.tokens[LARGE] / turns:15.0f} {client.tokens[SMALL] / turns:15.0f} "
+            f"{(metrics.get('llm_fallbacks') - fallbacks) / turns:15.2f} "
+            f"{client.agreed / max(client.analyses, 1):13.1%} {same_stage:12.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
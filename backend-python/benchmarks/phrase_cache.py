@@ -0,0 +1,109 @@
+"""
+Time to first audio frame for fixed phrases: live synthesis through a
+stand-in TTS (configurable first-byte latency) versus the on-disk phrase
+cache, plus a filler covering a slow LLM.
+
+    python -m benchmarks.phrase_cache --tts-ttfb 0.25 --llm-first-token 1.5
+"""
+import argparse
+import asyncio
+import contextlib
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+import benchmarks.env  # noqa: F401
+
+from livekit import rtc
+
+from app.audio import FillerPolicy, PhraseCache
+
+SAMPLE_RATE = 24000
+PHRASES = ["Hello! I am your AI sales assistant. How can I help you scale today?", "Let me see.", "That makes sense."]
+
+
+class FakeTTS:
+    """Emits silence at ~15 chars/sec of speech after `ttfb` seconds, like a streaming TTS API."""
+
+    provider = "fake"
+    model = "fake-tts"
+    sample_rate = SAMPLE_RATE
+    num_channels = 1
+
+    def __init__(self, ttfb: float):
+        self.ttfb = ttfb
+
+    def _frames(self, text: str):
+        samples = int(len(text) / 15 * SAMPLE_RATE)
+        frame = SAMPLE_RATE // 50
+        for _ in range(0, samples, frame):
+            yield rtc.AudioFrame(bytes(frame * 2), SAMPLE_RATE, 1, frame)
+
+    @contextlib.asynccontextmanager
+    async def synthesize(self, text: str):
+        async def events():
+            await asyncio.sleep(self.ttfb)
+            for frame in self._frames(text):
+                yield SimpleNamespace(frame=frame)
+        yield events()
+
+    async def tts_node(self, text):
+        async for delta in text:
+            await asyncio.sleep(self.ttfb)
+            for frame in self._frames(delta):
+                yield frame
+
+
+async def first_frame(frames) -> float:
+    start = time.perf_counter()
+    async for _ in frames:
+        return time.perf_counter() - start
+    return float("nan")
+
+
+async def live(tts: FakeTTS, text: str) -> float:
+    async def frames():
+        async with tts.synthesize(text) as stream:
+            async for event in stream:
+                yield event.frame
+    return await first_frame(frames())
+
+
+async def slow_reply(delay: float):
+    await asyncio.sleep(delay)
+    yield "Thanks for waiting, here's how it works."
+
+
+async def main_async(args):
+    tts = FakeTTS(args.tts_ttfb)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PhraseCache(cache_dir, tts, voice="bench")
+        start = time.perf_counter()
+        await cache.prerender(PHRASES)
+        print(f"prerender ({len(PHRASES)} phrases, cold): {(time.perf_counter() - start) * 1000:6.0f}ms")
+
+        live_ms = [await live(tts, PHRASES[0]) * 1000 for _ in range(args.runs)]
+        cached_ms = [await first_frame(cache.frames(PHRASES[0])) * 1000 for _ in range(args.runs)]
+        print(f"greeting first frame  live TTS: p50={statistics.median(live_ms):7.2f}ms")
+        print(f"greeting first frame  cached:   p50={statistics.median(cached_ms):7.2f}ms")
+
+        policy = FillerPolicy(cache, PHRASES[1:], threshold=args.filler_threshold, seed=0)
+        without = await first_frame(tts.tts_node(slow_reply(args.llm_first_token)))
+        covered = await first_frame(policy.cover(slow_reply(args.llm_first_token), tts.tts_node))
+        print(f"slow LLM ({args.llm_first_token:.1f}s) first audio  no filler: {without * 1000:7.0f}ms")
+        print(f"slow LLM ({args.llm_first_token:.1f}s) first audio  filler:    {covered * 1000:7.0f}ms")
+        cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tts-ttfb", type=float, default=0.25)
+    parser.add_argument("--llm-first-token", type=float, default=1.5)
+    parser.add_argument("--filler-threshold", type=float, default=1.0)
+    parser.add_argument("--runs", type=int, default=20)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
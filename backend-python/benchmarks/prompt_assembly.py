@@ -0,0 +1,77 @@
+"""
+Microbenchmark: per-turn system prompt assembly, legacy concatenation vs
+the precompiled prefix in PromptCompiler.
+
+    python -m benchmarks.prompt_assembly
+"""
+import timeit
+
+import benchmarks.env  # noqa: F401
+
+from app.agent.prompt_compiler import prompt_compiler
+from app.agent.prompts import (
+    BASE_AGENT_PROMPT,
+    VOICE_CONVERSATION_WRAPPER,
+    STAGE_PROMPTS,
+    PRICING_GATE_MODIFIER,
+    SEMANTIC_LOCK_MODIFIER,
+    NUDGE_MODIFIER,
+    CLOSING_STEP_MODIFIER,
+    BEHAVIORAL_REFINEMENT_PROMPT,
+)
+from app.agent.stages import SalesStage
+from app.container import services
+
+SESSION = "bench-prompt"
+
+
+def legacy_prepare_payload(session_id: str):
+    """The pre-compiler assembly: eight metadata reads and repeated concatenation."""
+    sm = services.session_memory
+    sm.get_metadata(session_id, "mode")
+    current_stage = sm.get_metadata(session_id, "stage")
+    value_presented = sm.get_metadata(session_id, "value_presented") or False
+    is_locked = sm.get_metadata(session_id, "session_locked") or False
+    turns = sm.turns_in_stage(session_id)
+    nudge_text = ""
+    if 2 < turns <= 4 and current_stage != SalesStage.CLOSING:
+        nudge_text = NUDGE_MODIFIER.format(goal=STAGE_PROMPTS.get(current_stage, ""))
+    role = sm.get_metadata(session_id, "role")
+    company = sm.get_metadata(session_id, "company")
+    pain_points = sm.get_metadata(session_id, "pain_points")
+    context_summary = f"\n[USER CONTEXT]\n- Role: {role or 'Unknown'}\n- Company: {company or 'Unknown'}\n- Identified Pain Points: {pain_points or 'None yet'}"
+    system_prompt = BASE_AGENT_PROMPT + context_summary
+    stage_instruction = STAGE_PROMPTS.get(current_stage, "")
+    system_prompt += SEMANTIC_LOCK_MODIFIER.format(stage=current_stage.value, goal=stage_instruction)
+    system_prompt += f"\nValue Presented: {value_presented}"
+    system_prompt += PRICING_GATE_MODIFIER
+    if nudge_text:
+        system_prompt += nudge_text
+    if is_locked:
+        system_prompt += CLOSING_STEP_MODIFIER
+    system_prompt += f"\n\n{BEHAVIORAL_REFINEMENT_PROMPT}"
+    system_prompt += f"\n\n{VOICE_CONVERSATION_WRAPPER}"
+    return system_prompt, current_stage
+
+
+def main(number: int = 50000):
+    services.session_memory.clear_session(SESSION)
+    services.session_memory.set_metadata(SESSION, "role", "Head of Sales")
+    services.session_memory.set_metadata(SESSION, "company", "Acme Realty")
+
+    legacy = timeit.timeit(lambda: legacy_prepare_payload(SESSION), number=number)
+    compiled = timeit.timeit(lambda: services.sales_agent.prepare_payload(SESSION), number=number)
+
+    first, _ = services.sales_agent.prepare_payload(SESSION)
+    services.session_memory.set_metadata(SESSION, "pain_points", "missed calls")
+    second, _ = services.sales_agent.prepare_payload(SESSION)
+    prefix = prompt_compiler.prefix(SalesStage.GREETING, locked=False, nudge=False)
+
+    print(f"prompt size: {len(first)} chars, static prefix {len(prefix)} chars")
+    print(f"legacy   : {legacy / number * 1e6:7.2f} us/turn")
+    print(f"compiled : {compiled / number * 1e6:7.2f} us/turn  ({legacy / compiled:.1f}x)")
+    print(f"prefix byte-identical across turns: {first.startswith(prefix) and second.startswith(prefix)}")
+
+
+if __name__ == "__main__":
+    main()
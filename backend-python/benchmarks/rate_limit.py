@@ -0,0 +1,59 @@
+"""
+Fair queuing in the LLM rate limiter: one session flooding the limiter
+(e.g. a retry storm) next to many ordinary sessions and background
+summaries. Compares how long each kind of caller waits under the fair
+limiter with a plain FIFO token bucket (every caller in one queue).
+
+    python -m benchmarks.rate_limit --rate 50 --quiet-sessions 20
+"""
+import argparse
+import asyncio
+import statistics
+
+import benchmarks.env  # noqa: F401
+
+from app.services.resilience import BACKGROUND, INTERACTIVE, FairRateLimiter
+
+
+async def caller(limiter, waits, priority, session, fifo):
+    waited = await limiter.acquire(priority, None if fifo else session)
+    waits.append(waited)
+
+
+async def scenario(args, fifo: bool):
+    limiter = FairRateLimiter(args.rate, burst=1)
+    noisy, quiet, background = [], [], []
+    tasks = [asyncio.create_task(caller(limiter, noisy, INTERACTIVE, "noisy", fifo)) for _ in range(args.flood)]
+    tasks += [asyncio.create_task(caller(limiter, background, BACKGROUND if not fifo else INTERACTIVE, f"bg{i}", fifo))
+              for i in range(args.summaries)]
+    for _ in range(args.rounds):
+        await asyncio.sleep(args.interval)
+        tasks += [asyncio.create_task(caller(limiter, quiet, INTERACTIVE, f"quiet{i}", fifo)) for i in range(args.quiet_sessions)]
+    await asyncio.gather(*tasks)
+    return noisy, quiet, background
+
+
+def summary(label, waits):
+    waits = sorted(waits)
+    return (f"{label} p50={statistics.median(waits) * 1000:6.0f}ms "
+            f"p99={waits[int(len(waits) * 0.99)] * 1000:6.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=float, default=50, help="calls/s")
+    parser.add_argument("--flood", type=int, default=150, help="calls the noisy session queues at once")
+    parser.add_argument("--quiet-sessions", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between a quiet session's calls")
+    parser.add_argument("--summaries", type=int, default=10, help="background calls queued at the start")
+    args = parser.parse_args()
+    print(f"rate={args.rate:.0f}/s, 1 session queues {args.flood} calls, {args.quiet_sessions} sessions call every "
+          f"{args.interval}s, {args.summaries} background summaries")
+    for label, fifo in (("fifo", True), ("fair", False)):
+        noisy, quiet, background = asyncio.run(scenario(args, fifo))
+        print(f"{label:<5} {summary('quiet sessions', quiet)}  {summary('noisy session', noisy)}  {summary('background', background)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Replays the stored conversations in benchmarks/data/conversations.jsonl
+through the agent against the fake LLM, at increasing concurrency, and
+reports turns/sec, p50/p99 turn latency, tokens per turn and retained
+memory per session. Also checks each conversation ends in its expected stage.
+
+    python -m benchmarks.replay --sessions 1 100 1000
+    python -m benchmarks.replay --path livekit --first-token-latency 0.08,sigma=0.4,tail_rate=0.02,tail=1.0
+    python -m benchmarks.replay --save baseline.json
+    python -m benchmarks.replay --check baseline.json --tolerance 0.15   # regression gate, exits 1 on failure
+
+`--path agent` drives SalesAgent.generate_response, `--path livekit`
+drives CerebrasLLMStream through get_llm(); both share the same fake.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import benchmarks.env  # noqa: F401
+from benchmarks.fake_llm import FakeCerebras, LatencyModel, install
+
+from livekit.agents import llm
+
+from app.agent.stages import SalesStage
+from app.container import services
+from app.services.cerebras_livekit import get_llm
+
+CONVERSATIONS = Path(__file__).parent / "data" / "conversations.jsonl"
+
+
+def load_conversations(path: Path) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def scripted_analyses(conversations: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {turn["user"]: turn["analysis"] for c in conversations for turn in c["turns"] if "analysis" in turn}
+
+
+async def agent_turns(session_id: str, conversation: Dict[str, Any], latencies: List[float]):
+    for turn in conversation["turns"]:
+        start = time.perf_counter()
+        await services.sales_agent.generate_response(turn["user"], session_id)
+        latencies.append(time.perf_counter() - start)
+
+
+async def livekit_turns(session_id: str, conversation: Dict[str, Any], latencies: List[float]):
+    cerebras_llm = get_llm(session_id)
+    chat_ctx = llm.ChatContext()
+    for turn in conversation["turns"]:
+        chat_ctx.add_message(role="user", content=turn["user"])
+        start = time.perf_counter()
+        reply = []
+        async with cerebras_llm.chat(chat_ctx=chat_ctx) as stream:
+            async for chunk in stream:
+                if chunk.delta and chunk.delta.content:
+                    reply.append(chunk.delta.content)
+        latencies.append(time.perf_counter() - start)
+        # What the worker reports once the reply has played out
+        services.sales_agent.finish_reply(session_id, "".join(reply), interrupted=False)
+        chat_ctx.add_message(role="assistant", content="".join(reply))
+
+
+def deep_size(obj, seen=None) -> int:
+    """Approximate retained bytes of an object graph (containers, __slots__, __dict__)."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    else:
+        if hasattr(obj, "__dict__"):
+            size += deep_size(vars(obj), seen)
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_size(getattr(obj, slot), seen)
+    return size
+
+
+def session_bytes(session_ids: List[str]) -> float:
+    """Mean retained bytes per session in the in-memory store (0 for remote stores)."""
+    sessions = getattr(services.session_memory.store, "_sessions", None)
+    if sessions is None or not session_ids:
+        return 0.0
+    # Enum members are shared, not owned by a session
+    shared = {id(stage) for stage in SalesStage}
+    return sum(deep_size(sessions[sid], set(shared)) for sid in session_ids if sid in sessions) / len(session_ids)
+
+
+async def run(sessions: int, conversations: List[Dict[str, Any]], fake: FakeCerebras, path: str) -> Dict[str, Any]:
+    runner = agent_turns if path == "agent" else livekit_turns
+    latencies: List[float] = []
+    session_ids = [f"replay:{sessions}:{i}" for i in range(sessions)]
+    assigned = [conversations[i % len(conversations)] for i in range(sessions)]
+    for session_id in session_ids:
+        services.session_memory.clear_session(session_id)
+    prompt_before, completion_before = fake.prompt_tokens, fake.completion_tokens
+
+    start = time.perf_counter()
+    await asyncio.gather(*(runner(sid, conv, latencies) for sid, conv in zip(session_ids, assigned)))
+    elapsed = time.perf_counter() - start
+
+    wrong = [
+        conv["name"] for sid, conv in zip(session_ids, assigned)
+        if conv.get("expected_stage")
+        and services.session_memory.get_metadata_snapshot(sid)["stage"].value != conv["expected_stage"]
+    ]
+    gc.collect()
+    per_session = session_bytes(session_ids)
+    for session_id in session_ids:
+        services.session_memory.clear_session(session_id)
+
+    latencies.sort()
+    turns = len(latencies)
+    return {
+        "sessions": sessions,
+        "turns": turns,
+        "turns_per_sec": turns / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(turns - 1, int(turns * 0.99))] * 1000,
+        "tokens_per_turn": (fake.prompt_tokens - prompt_before + fake.completion_tokens - completion_before) / turns,
+        "bytes_per_session": per_session,
+        "stage_mismatches": sorted(set(wrong)),
+    }
+
+
+def report(result: Dict[str, Any]):
+    mismatches = ",".join(result["stage_mismatches"]) or "none"
+    print(
+        f"sessions={result['sessions']:<5} turns={result['turns']:<6} turns/sec={result['turns_per_sec']:8.1f}  "
+        f"p50={result['p50_ms']:6.0f}ms  p99={result['p99_ms']:6.0f}ms  tokens/turn={result['tokens_per_turn']:6.0f}  "
+        f"mem/session={result['bytes_per_session'] / 1024:6.1f}KiB  stage_mismatches={mismatches}"
+    )
+
+
+def check(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Compares against a saved run; throughput may not drop, nor latency/memory grow, by more than `tolerance`."""
+    failures = []
+    previous = {r["sessions"]: r for r in baseline["results"]}
+    for result in results:
+        base = previous.get(result["sessions"])
+        if result["stage_mismatches"]:
+            failures.append(f"sessions={result['sessions']}: wrong final stage in {result['stage_mismatches']}")
+        if base is None:
+            continue
+        if result["turns_per_sec"] < base["turns_per_sec"] * (1 - tolerance):
+            failures.append(f"sessions={result['sessions']}: turns/sec {result['turns_per_sec']:.1f} < baseline {base['turns_per_sec']:.1f}")
+        for key in ("p50_ms", "p99_ms", "tokens_per_turn", "bytes_per_session"):
+            if base[key] and result[key] > base[key] * (1 + tolerance):
+                failures.append(f"sessions={result['sessions']}: {key} {result[key]:.1f} > baseline {base[key]:.1f}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--path", choices=["agent", "livekit"], default="agent")
+    parser.add_argument("--conversations", type=Path, default=CONVERSATIONS)
+    parser.add_argument("--analyzer-latency", type=LatencyModel.parse, default=LatencyModel(0.05, sigma=0.3))
+    parser.add_argument("--first-token-latency", type=LatencyModel.parse, default=LatencyModel(0.08, sigma=0.3))
+    parser.add_argument("--token-interval", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", type=Path, help="write results as a baseline")
+    parser.add_argument("--check", type=Path, help="compare against a baseline and exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    conversations = load_conversations(args.conversations)
+    fake = install(FakeCerebras(
+        analyzer_latency=args.analyzer_latency,
+        first_token_latency=args.first_token_latency,
+        token_interval=args.token_interval,
+        seed=args.seed,
+        scripted=scripted_analyses(conversations),
+    ))
+    print(f"path={args.path} conversations={len(conversations)}")
+    results = []
+    for sessions in args.sessions:
+        result = asyncio.run(run(sessions, conversations, fake, args.path))
+        report(result)
+        results.append(result)
+
+    if args.save:
+        args.save.write_text(json.dumps({"path": args.path, "results": results}, indent=2))
+    if args.check:
+        baseline = json.loads(args.check.read_text())
+        if baseline.get("path") != args.path:
+            print(f"note: baseline was recorded with --path {baseline.get('path')}")
+        failures = check(results, baseline, args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Reply length control on generated replies: words spoken, generation time
+and speaking time per reply, with the controller off and on. Replies are
+drawn to look like the model's: mostly 2–3 sentences, with a `--ramble`
+share running to 6–10 sentences, some of them in a second paragraph. The
+fake stream honours max_tokens (~1.3 tokens a word) and stop sequences as
+the API does.
+
+    python -m benchmarks.reply_length --replies 2000 --ramble 0.15
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+import benchmarks.env  # noqa: F401
+
+from app.agent.reply_length import ReplyLengthController
+from app.agent.stages import SalesStage
+from app.config import settings
+from app.utils.metrics import metrics
+
+SENTENCES = (
+    "Totally fair question.",
+    "Most teams we work with were missing a third of their inbound calls.",
+    "Our agent picks up every call in under a second, day or night.",
+    "It qualifies the lead and books the meeting straight into your calendar.",
+    "One agency cut missed calls by seventy percent in two weeks.",
+    "Would it help to see how that works for a team your size?",
+    "Honestly, the setup takes about a day.",
+    "You keep full control over what it says and when it hands off to a person.",
+)
+WORDS_PER_SECOND = 2.5  # speaking rate
+TOKENS_PER_WORD = 1.3
+
+
+def reply(rng: random.Random, ramble: float) -> str:
+    if rng.random() < ramble:
+        sentences = rng.sample(SENTENCES, rng.randint(6, 8)) + rng.sample(SENTENCES, rng.randint(0, 2))
+        if rng.random() < 0.5:
+            split = rng.randint(2, 4)
+            return " ".join(sentences[:split]) + "\n\n" + " ".join(sentences[split:])
+        return " ".join(sentences)
+    return " ".join(rng.sample(SENTENCES, rng.randint(2, 3)))
+
+
+async def stream(text: str, token_interval: float, max_tokens: Optional[int] = None,
+                 stop: Optional[List[str]] = None) -> AsyncIterator[str]:
+    for sequence in stop or ():
+        text = text.split(sequence, 1)[0]
+    words = text.split(" ")
+    if max_tokens:
+        words = words[:int(max_tokens / TOKENS_PER_WORD)]
+    for i, word in enumerate(words):
+        await asyncio.sleep(token_interval * TOKENS_PER_WORD)
+        yield word if i == 0 else f" {word}"
+
+
+async def measure(replies: List[str], stage: SalesStage, controller: Optional[ReplyLengthController],
+                  token_interval: float) -> Dict[str, float]:
+    words, seconds, cut = [], [], 0
+    for text in replies:
+        start = time.perf_counter()
+        params = controller.request_params(stage) if controller else {}
+        limit = controller.start(stage) if controller else None
+        deltas = stream(text, token_interval, **params)
+        parts = []
+        # As SalesAgent's turn loop consumes it
+        async for delta in deltas:
+            last = limit is not None and limit.ends(delta)
+            parts.append(limit.head if last else delta)
+            if last:
+                break
+        await deltas.aclose()
+        spoken = "".join(parts).strip()
+        seconds.append(time.perf_counter() - start)
+        words.append(len(spoken.split()))
+        cut += not spoken.endswith((".", "?", "!"))
+    words.sort()
+    return {
+        "words": statistics.mean(words),
+        "p95_words": words[int(len(words) * 0.95)],
+        "generation_ms": statistics.mean(seconds) * 1000,
+        "speech_s": statistics.mean(words) / WORDS_PER_SECOND,
+        "mid_sentence": cut / len(replies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replies", type=int, default=2000)
+    parser.add_argument("--ramble", type=float, default=0.15, help="share of replies that run to 6-10 sentences")
+    parser.add_argument("--stage", choices=[s.value for s in SalesStage], default="solution")
+    parser.add_argument("--token-interval", type=float, default=0.0005, help="seconds per token")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    replies = [reply(rng, args.ramble) for _ in range(args.replies)]
+    stage = SalesStage(args.stage)
+    controller = ReplyLengthController(settings.REPLY_BUDGETS, settings.REPLY_STOP)
+    print(f"{args.replies} replies at stage {stage.value}, {args.ramble:.0%} rambling; budget {controller.budgets[stage]}")
+    print(f"{'controller':<11} {'words':>6} {'p95':>5} {'gen ms':>7} {'speech s':>9} {'mid-sentence':>13}")
+    for label, active in (("off", None), ("on", controller)):
+        result = asyncio.run(measure(replies, stage, active, args.token_interval))
+        print(f"{label:<11} {result['words']:6.1f} {result['p95_words']:5d} {result['generation_ms']:7.1f} "
+              f"{result['speech_s']:9.1f} {result['mid_sentence']:13.1%}")
+    overruns = {limit: metrics.get("reply_budget_overruns", stage=stage.value, limit=limit) for limit in ("words", "seconds")}
+    print(f"budget overruns: {overruns['words']:.0f} on words, {overruns['seconds']:.0f} on time")
+
+
+if __name__ == "__main__":
+    main()
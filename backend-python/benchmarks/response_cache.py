@@ -0,0 +1,112 @@
+"""
+Response cache: match quality of the local embedding on paraphrases and
+near misses, lookup cost, and what the cache saves when the stored
+conversations are replayed through the agent (fake LLM). The replay runs
+twice with the cache on: "cold" starts empty, "warm" reuses what the cold
+pass stored, which is closer to steady state in production.
+
+    python -m benchmarks.response_cache --sessions 100 --entries 5000
+"""
+import argparse
+import asyncio
+import time
+
+import benchmarks.env  # noqa: F401
+from benchmarks.fake_llm import FakeCerebras, install
+from benchmarks.replay import CONVERSATIONS, load_conversations, run, scripted_analyses
+
+from app.agent.response_cache import ResponseCache, response_cache
+from app.agent.stages import SalesStage
+from app.utils.metrics import metrics
+
+# (cached utterance, incoming utterance, same question?)
+PAIRS = [
+    ("How much does it cost?", "how much does this cost", True),
+    ("How does it work?", "So how does this work?", True),
+    ("Who are you?", "who are you guys", True),
+    ("What's the price?", "whats the price", True),
+    ("How much is it?", "Um, how much is that?", True),
+    ("Is it expensive?", "is it expensive", True),
+    ("Can I get a demo?", "can I get a demo please", True),
+    ("What do you do?", "Okay, what do you do?", True),
+    ("What does it cost?", "What does it do?", False),
+    ("How does it work?", "How does billing work?", False),
+    ("What do you do?", "What do you sell?", False),
+    ("How much does it cost?", "How much does it cost per month?", False),
+    ("Can I get a demo?", "Can I get a discount?", False),
+    ("Do you integrate with Salesforce?", "Do you integrate with HubSpot?", False),
+    ("Is it expensive?", "Isn't it expensive?", False),
+    ("How does it work?", "How did it work?", False),
+]
+
+
+def match_quality(thresholds):
+    print("threshold  paraphrases matched  false matches")
+    positives = sum(1 for *_, same in PAIRS if same)
+    for threshold in thresholds:
+        hits = false_hits = 0
+        for cached, incoming, same in PAIRS:
+            cache = ResponseCache(similarity=threshold)
+            cache.put(cache.key("generation", SalesStage.QUALIFICATION, "p", cached), cached)
+            if cache.get(cache.key("generation", SalesStage.QUALIFICATION, "p", incoming)) is not None:
+                hits += same
+                false_hits += not same
+        print(f"{threshold:9.2f}  {hits:>10}/{positives:<9}  {false_hits:>6}/{len(PAIRS) - positives}")
+
+
+def lookup_cost(entries: int, rounds: int = 2000):
+    cache = ResponseCache(max_entries=entries)
+    stage = SalesStage.QUALIFICATION
+    for i in range(entries):
+        cache.put(cache.key("generation", stage, "p", f"question number {i} about the product"), "reply")
+    cache.put(cache.key("generation", stage, "p", "how does it work"), "reply")
+    cases = {
+        "exact hit": "How does it work?",
+        "semantic hit": "so how does this work",
+        "miss": "what integrations do you support",
+    }
+    for label, text in cases.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            cache.get(cache.key("generation", stage, "p", text))
+        print(f"{label:<13} {(time.perf_counter() - start) / rounds * 1e6:7.1f}us  ({entries} entries in the bucket)")
+
+
+def replay(sessions: int, conversations, fake: FakeCerebras, enabled: bool, label: str):
+    response_cache.enabled = enabled
+    calls_before = fake.calls
+    hits_before, misses_before = metrics.get("response_cache_hits"), metrics.get("response_cache_misses")
+    result = asyncio.run(run(sessions, conversations, fake, "agent"))
+    hits = metrics.get("response_cache_hits") - hits_before
+    lookups = hits + metrics.get("response_cache_misses") - misses_before
+    mismatches = ",".join(result["stage_mismatches"]) or "none"
+    print(
+        f"{label:<10} LLM calls/turn={(fake.calls - calls_before) / result['turns']:5.2f}  "
+        f"hit rate={hits / lookups if lookups else 0:6.1%}  p50={result['p50_ms']:5.0f}ms  "
+        f"p99={result['p99_ms']:5.0f}ms  stage_mismatches={mismatches}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--entries", type=int, default=5000)
+    args = parser.parse_args()
+
+    match_quality((0.8, 0.85, 0.92, 1.0))
+    print()
+    lookup_cost(args.entries)
+    print()
+
+    conversations = load_conversations(CONVERSATIONS)
+    fake = install(FakeCerebras(scripted=scripted_analyses(conversations)))
+    print(f"replay: {args.sessions} sessions, {len(conversations)} conversations")
+    replay(args.sessions, conversations, fake, False, "no cache")
+    response_cache.clear()
+    replay(args.sessions, conversations, fake, True, "cold")
+    replay(args.sessions, conversations, fake, True, "warm")
+    print(f"cache entries: {len(response_cache)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Session memory at scale: bytes per resident session and SessionMemory
+ops/sec with per-session metadata held as a plain dict versus SessionState
+(__slots__), on the in-process store. Each session looks like a text-channel
+call a few turns in: created_at, a mode, a stage past greeting, extracted
+role/company/pain points, and 6 messages. Sessions rebuilt from the event
+log are measured too: through restore(), which interns roles and rebuilds
+the message dicts, and as the decoder's dicts stored as-is (what restore()
+used to do).
+
+    python -m benchmarks.session_state --sessions 100000
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+import benchmarks.env  # noqa: F401
+
+from app.agent.memory import SessionMemory
+from app.agent.session_state import SessionState
+from app.agent.stages import SalesStage
+from app.storage.in_memory import InMemorySessionStore
+
+TURNS = (
+    ("Hi, who is this?", "Hey! I'm with ConvergsAI, we help sales teams answer every inbound call."),
+    ("I run sales at a real estate agency.", "Nice, how many inbound calls does your team get a day?"),
+    ("About fifty, and we miss a lot of them.", "That adds up fast. What happens to the ones you miss?"),
+)
+
+
+def populate(memory: SessionMemory, sessions: int, how: str = "live"):
+    for i in range(sessions):
+        sid = f"session-{i}"
+        memory.set_metadata(sid, "created_at", f"2026-10-18T12:{i % 60:02d}:00+00:00")
+        memory.set_metadata(sid, "mode", "SDR")
+        memory.advance_stage(sid, SalesStage.PROBLEM)
+        memory.set_metadata(sid, "role", "Head of Sales")
+        memory.set_metadata(sid, "company", f"Agency {i}")
+        memory.set_metadata(sid, "pain_points", "missed inbound calls")
+        if how != "live":
+            # As rebuilt from the event log: messages decoded from JSON
+            history = json.loads(json.dumps([
+                {"role": role, "content": f"{text} ({i})"}
+                for user, reply in TURNS for role, text in (("user", user), ("assistant", reply))
+            ]))
+            if how == "restored":
+                memory.restore(sid, history, {})
+            else:
+                for message in history:
+                    memory.store.append_message(sid, message)
+        else:
+            for user, reply in TURNS:
+                memory.add_message(sid, "user", f"{user} ({i})")
+                memory.add_message(sid, "assistant", f"{reply} ({i})")
+
+
+def bytes_per_session(factory: Callable, sessions: int, how: str) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    memory = SessionMemory(InMemorySessionStore(max_sessions=sessions, idle_ttl=None, metadata_factory=factory))
+    populate(memory, sessions, how)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / sessions
+
+
+def ops(memory: SessionMemory, sessions: int, typed: bool, rounds: int = 200_000) -> Dict[str, float]:
+    rng = random.Random(0)
+    ids = [f"session-{rng.randrange(sessions)}" for _ in range(rounds)]
+    read = memory.state if typed else memory.get_metadata_snapshot
+
+    def turn(sid: str):
+        memory.add_message(sid, "user", "sounds good")
+        memory.get_metadata(sid, "stage")
+        read(sid)  # prepare_payload
+        read(sid)  # advance_logic
+        memory.set_metadata(sid, "pain_points", "missed calls")
+        memory.add_message(sid, "assistant", "great, let's set up a time")
+
+    cases = {
+        "get_metadata": lambda sid: memory.get_metadata(sid, "stage"),
+        "state/snapshot": read,
+        "set_metadata": lambda sid: memory.set_metadata(sid, "role", "VP Sales"),
+        "turn mix": turn,
+    }
+    results = {}
+    for label, op in cases.items():
+        start = time.perf_counter()
+        for sid in ids:
+            op(sid)
+        results[label] = rounds / (time.perf_counter() - start)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    variants = {"dict": dict, "SessionState": SessionState}
+    print(f"{args.sessions} resident sessions (6 messages each)")
+    print(f"{'metadata':<13} {'live':>7} {'restored':>9} {'raw json':>9}  (bytes/session)  {'live sessions/GiB':>17}")
+    for label, factory in variants.items():
+        sizes = [bytes_per_session(factory, args.sessions, how) for how in ("live", "restored", "raw json")]
+        print(f"{label:<13} {sizes[0]:7.0f} {sizes[1]:9.0f} {sizes[2]:9.0f}  {'':15}  {2**30 / sizes[0]:17,.0f}")
+
+    print()
+    print(f"{'metadata':<13} " + " ".join(f"{name:>15}" for name in ("get_metadata", "state/snapshot", "set_metadata", "turn mix")) + "   (ops/sec)")
+    for label, factory in variants.items():
+        memory = SessionMemory(InMemorySessionStore(max_sessions=args.sessions, idle_ttl=None, metadata_factory=factory))
+        populate(memory, args.sessions)
+        results = ops(memory, args.sessions, typed=factory is SessionState)
+        print(f"{label:<13} " + " ".join(f"{value:15,.0f}" for value in results.values()))
+        del memory
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main()
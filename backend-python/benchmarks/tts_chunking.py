@@ -0,0 +1,131 @@
+"""
+First-audio latency of sentence-chunked TTS versus synthesizing the whole
+reply once the LLM is done, with a stand-in LLM token stream and TTS; plus
+how quickly a barge-in stops the chunked pipeline and how much it drops.
+
+    python -m benchmarks.tts_chunking --tts-ttfb 0.2 --token-interval 0.03
+"""
+import argparse
+import asyncio
+import contextlib
+import statistics
+import time
+from types import SimpleNamespace
+
+import benchmarks.env  # noqa: F401
+
+from benchmarks.phrase_cache import FakeTTS
+
+from app.audio import SegmentedSynthesis
+from app.utils.metrics import metrics
+
+REPLY = (
+    "Great question! Our platform plugs into the CRM you already use, e.g. Salesforce or HubSpot, "
+    "and most teams are live within 2.5 days. Pricing starts at $1,200 a month for up to 10 seats, "
+    "which includes onboarding, a dedicated success manager, and 24/7 support. "
+    "Would it help if I walked you through a quick example based on your current pipeline?"
+)
+FRAME_SECONDS = 0.02
+
+
+class PacedTTS(FakeTTS):
+    """FakeTTS that synthesizes `speedup` times faster than real time and counts concurrent requests."""
+
+    def __init__(self, ttfb: float, speedup: float):
+        super().__init__(ttfb)
+        self.speedup = speedup
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    @contextlib.asynccontextmanager
+    async def synthesize(self, text: str, **_):
+        async def events():
+            self.requests += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            try:
+                await asyncio.sleep(self.ttfb)
+                for frame in self._frames(text):
+                    await asyncio.sleep(FRAME_SECONDS / self.speedup)
+                    yield SimpleNamespace(frame=frame)
+            finally:
+                self.in_flight -= 1
+        yield events()
+
+
+async def llm_tokens(first_token: float, interval: float):
+    await asyncio.sleep(first_token)
+    words = REPLY.split(" ")
+    for i, word in enumerate(words):
+        yield word if i == 0 else " " + word
+        await asyncio.sleep(interval)
+
+
+async def whole_reply(tts: PacedTTS, text):
+    reply = "".join([delta async for delta in text])
+    async with tts.synthesize(reply) as stream:
+        async for event in stream:
+            yield event.frame
+
+
+async def play(frames, playback: float, stop_after: int = 0):
+    """Consumes frames at `playback` x real time; returns (first frame s, last frame s, frames)."""
+    start = time.perf_counter()
+    first, count = None, 0
+    async for _ in frames:
+        count += 1
+        if first is None:
+            first = time.perf_counter() - start
+        if stop_after and count >= stop_after:
+            break
+        await asyncio.sleep(FRAME_SECONDS / playback)
+    return first, time.perf_counter() - start, count
+
+
+async def main_async(args):
+    tts = PacedTTS(args.tts_ttfb, args.tts_speedup)
+    chunked = SegmentedSynthesis(tts, lookahead=args.lookahead)
+    whole_first, chunked_first, chunked_total, whole_total = [], [], [], []
+    for _ in range(args.runs):
+        first, total, _ = await play(whole_reply(tts, llm_tokens(args.llm_first_token, args.token_interval)), args.playback)
+        whole_first.append(first)
+        whole_total.append(total)
+        tts.peak = 0
+        first, total, _ = await play(chunked(llm_tokens(args.llm_first_token, args.token_interval)), args.playback)
+        chunked_first.append(first)
+        chunked_total.append(total)
+
+    audio_seconds = len(REPLY) / 15
+    print(f"reply: {len(REPLY)} chars, ~{audio_seconds:.1f}s of speech, played at {args.playback:.0f}x")
+    print(f"whole reply   first audio p50={statistics.median(whole_first) * 1000:6.0f}ms  done p50={statistics.median(whole_total) * 1000:6.0f}ms")
+    print(f"chunked       first audio p50={statistics.median(chunked_first) * 1000:6.0f}ms  done p50={statistics.median(chunked_total) * 1000:6.0f}ms  "
+          f"peak concurrent syntheses={tts.peak} (lookahead={args.lookahead})")
+
+    # Barge-in a few frames into the first segment
+    requests_before = tts.requests
+    flushed_before = metrics.get("tts_segments_flushed")
+    frames = chunked(llm_tokens(args.llm_first_token, args.token_interval))
+    await play(frames, args.playback, stop_after=5)
+    start = time.perf_counter()
+    await frames.aclose()
+    stop_ms = (time.perf_counter() - start) * 1000
+    await asyncio.sleep(0)
+    print(f"barge-in      stopped in {stop_ms:.2f}ms, syntheses started={tts.requests - requests_before}, "
+          f"dropped={metrics.get('tts_segments_flushed') - flushed_before:.0f}, still running={tts.in_flight}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-first-token", type=float, default=0.3)
+    parser.add_argument("--token-interval", type=float, default=0.03, help="seconds per word")
+    parser.add_argument("--tts-ttfb", type=float, default=0.2)
+    parser.add_argument("--tts-speedup", type=float, default=10, help="synthesis speed vs. real time")
+    parser.add_argument("--playback", type=float, default=10, help="playback speed vs. real time")
+    parser.add_argument("--lookahead", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
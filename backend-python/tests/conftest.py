@@ -0,0 +1,6 @@
+"""Dummy credentials so app settings load without a real .env (as benchmarks/env.py)."""
+import os
+
+for key in ("CEREBRAS_API_KEY", "CARTESIA_API_KEY", "LIVEKIT_API_KEY", "LIVEKIT_API_SECRET", "LIVEKIT_URL"):
+    os.environ.setdefault(key, "test")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
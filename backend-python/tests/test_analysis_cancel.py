@@ -0,0 +1,30 @@
+import asyncio
+
+from app.agent.analyzer import AnalysisStream
+from app.agent.sales_agent import SalesAgent
+from app.agent.stages import SalesStage
+
+
+def test_cancelled_turn_cancels_the_analysis():
+    async def run():
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def analysis(stream):
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        pending = AnalysisStream(analysis)
+        turn = asyncio.create_task(
+            SalesAgent()._analyze("s", "how much is it", [], SalesStage.QUALIFICATION, pending)
+        )
+        await started.wait()
+        turn.cancel()
+        await asyncio.gather(turn, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert pending._early.cancelled()
+
+    asyncio.run(run())
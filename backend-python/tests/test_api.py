@@ -0,0 +1,21 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import app
+
+
+@pytest.fixture
+def client():
+    # Not entered as a context manager: the lifespan (tracing, LLM warm-up) isn't needed here
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/message", "/message/stream"])
+@pytest.mark.parametrize("text", ["", "   ", "\n\t"])
+def test_blank_text_is_rejected(client, path, text):
+    assert client.post(path, json={"text": text, "session_id": "s"}).status_code == 422
+
+
+def test_new_session(client):
+    body = client.post("/session/new", json={"mode": "support"}).json()
+    assert body["success"] and body["session_id"]
@@ -0,0 +1,84 @@
+import pytest
+
+from app.agent.memory import SessionMemory
+from app.agent.session_state import SessionState
+from app.agent.stages import SalesStage
+from app.storage.event_log import EventLog, read_events
+from app.storage.in_memory import InMemorySessionStore
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = EventLog(str(tmp_path), flush_interval=0.01)
+    yield log
+    log.close()
+
+
+def memory(log, snapshot_every=4, max_sessions=100):
+    store = InMemorySessionStore(metadata_factory=SessionState)
+    return SessionMemory(store, events=log, snapshot_every=snapshot_every, max_sessions=max_sessions)
+
+
+def converse(memory, session_id, turns):
+    for turn in range(turns):
+        memory.add_message(session_id, "user", f"user {turn}")
+        memory.record(session_id, "analysis", {"intent": "sharing_pain"})
+        memory.set_metadata(session_id, "pain_points", [f"pain {turn}"])
+        memory.add_message(session_id, "assistant", f"reply {turn}")
+        if turn == 3:
+            memory.advance_stage(session_id, SalesStage.PROBLEM)
+
+
+def expected(memory, session_id):
+    history, metadata = memory.store.load(session_id)
+    return history, {k: (v.value if isinstance(v, SalesStage) else v) for k, v in metadata.items()}
+
+
+@pytest.mark.parametrize("snapshot_every", [1, 4, 10**9])
+def test_recover_matches_the_store(log, snapshot_every):
+    original = memory(log, snapshot_every)
+    converse(original, "a", 6)
+    converse(original, "b", 3)
+    assert log.recover("a") == expected(original, "a")
+    assert log.recover("b") == expected(original, "b")
+
+
+def test_recovered_session_restores_into_a_fresh_store(log):
+    original = memory(log)
+    converse(original, "a", 5)
+    restarted = memory(log)
+    restarted.restore("a", *log.recover("a"))
+    assert restarted.get_history("a") == original.get_history("a")
+    assert restarted.get_metadata("a", "stage") == SalesStage.PROBLEM
+    assert restarted.get_metadata("a", "pain_points") == ["pain 4"]
+
+
+def test_unknown_and_deleted_sessions_recover_as_none(log):
+    original = memory(log)
+    converse(original, "a", 2)
+    log.flush()
+    assert log.has_snapshot("a")
+    assert not log.has_snapshot("never-seen")
+    assert log.recover("never-seen") is None
+    original.clear_session("a")
+    assert log.recover("a") is None
+    assert not log.has_snapshot("a")
+
+
+def test_read_events_filters_by_session_and_kind(tmp_path, log):
+    original = memory(log)
+    converse(original, "a", 2)
+    converse(original, "b", 1)
+    log.flush()
+    kinds = [e["e"] for e in read_events(str(tmp_path), session_id="a", kinds={"message"})]
+    assert kinds == ["message"] * 4
+
+
+def test_snapshot_counters_are_bounded(log):
+    original = memory(log, snapshot_every=10**9, max_sessions=3)
+    for i in range(10):
+        original.add_message(f"s{i}", "user", "hi")
+    assert len(original._since_snapshot) == 3
+    # A session whose counter was dropped snapshots again and still recovers
+    original.add_message("s0", "assistant", "hello")
+    assert log.recover("s0") == expected(original, "s0")
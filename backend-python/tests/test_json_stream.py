@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from app.agent.json_stream import IncrementalJSONParser
+
+ANALYSIS = {
+    "intent": "sharing_pain",
+    "is_vague": False,
+    "recommended_action": "advance",
+    "confidence": 0.85,
+    "extracted_info": {"role": "owner", "pain_points": ["missed calls", "no \"follow-up\""]},
+    "note": None,
+}
+
+
+def feed_all(parser, chunks):
+    emitted = []
+    for chunk in chunks:
+        emitted.extend(parser.feed(chunk))
+    return emitted
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_fields_match_json_loads_at_any_chunking(size):
+    text = json.dumps(ANALYSIS)
+    parser = IncrementalJSONParser()
+    emitted = feed_all(parser, [text[i:i + size] for i in range(0, len(text), size)])
+    assert parser.done
+    assert parser.fields == ANALYSIS
+    assert [key for key, _ in emitted] == list(ANALYSIS)
+
+
+def test_emits_fields_as_soon_as_they_close():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"intent": "pricing_') == []
+    assert parser.feed('query", "is_vague": tr') == [("intent", "pricing_query")]
+    # A literal is only complete at the comma or brace after it
+    assert parser.feed("ue") == []
+    assert parser.feed(', "extracted_info": {"role": "cto"') == [("is_vague", True)]
+    assert parser.feed("}}") == [("extracted_info", {"role": "cto"})]
+    assert parser.done
+
+
+def test_skips_text_before_the_object():
+    parser = IncrementalJSONParser()
+    feed_all(parser, ["```json\n", '{"intent": "other"}', "\n```"])
+    assert parser.fields == {"intent": "other"}
+
+
+def test_parse_buffer_falls_back_to_the_whole_text():
+    parser = IncrementalJSONParser()
+    parser.feed('Sure! {"intent": "greeting", "is_vague": false} Hope that helps.')
+    assert parser.parse_buffer() == {"intent": "greeting", "is_vague": False}
+    with pytest.raises(ValueError):
+        IncrementalJSONParser().parse_buffer()
@@ -0,0 +1,66 @@
+import asyncio
+
+from app.services.resilience import BACKGROUND, INTERACTIVE, FairRateLimiter
+
+
+async def grant_order(limiter, callers):
+    """Queues `callers` ((priority, session) pairs) in order and returns the order they are served in."""
+    await limiter.acquire()  # takes the one token, so every call below has to queue
+    served = []
+
+    async def call(i, priority, session):
+        await limiter.acquire(priority, session)
+        served.append(i)
+
+    tasks = []
+    for i, (priority, session) in enumerate(callers):
+        tasks.append(asyncio.create_task(call(i, priority, session)))
+        await asyncio.sleep(0)  # queued before the next one
+    await asyncio.gather(*tasks)
+    return served
+
+
+def one_token(rate=500.0, **kwargs):
+    return FairRateLimiter(rate, burst=1, **kwargs)
+
+
+def test_burst_is_served_without_waiting():
+    async def run():
+        limiter = FairRateLimiter(1000, burst=3)
+        return [await limiter.acquire() for _ in range(3)]
+
+    assert asyncio.run(run()) == [0.0, 0.0, 0.0]
+
+
+def test_sessions_are_served_round_robin():
+    callers = [(INTERACTIVE, "noisy")] * 4 + [(INTERACTIVE, "quiet")]
+    # The quiet session's one call goes second, not behind the noisy session's backlog
+    assert asyncio.run(grant_order(one_token(), callers)) == [0, 4, 1, 2, 3]
+
+
+def test_interactive_calls_go_before_background_ones():
+    callers = [(BACKGROUND, None), (BACKGROUND, None), (INTERACTIVE, "a")]
+    assert asyncio.run(grant_order(one_token(), callers)) == [2, 0, 1]
+
+
+def test_background_calls_waiting_too_long_are_promoted():
+    callers = [(BACKGROUND, None), (INTERACTIVE, "a"), (INTERACTIVE, "b")]
+    assert asyncio.run(grant_order(one_token(promote_after=0.0), callers)) == [0, 1, 2]
+
+
+def test_cancelled_waiter_does_not_take_a_slot():
+    async def run():
+        limiter = FairRateLimiter(50, burst=1)
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire(INTERACTIVE, "a"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(limiter.acquire(INTERACTIVE, "b"))
+        await asyncio.sleep(0)
+        first.cancel()
+        waited = await second
+        return waited, limiter.waiting
+
+    waited, waiting = asyncio.run(run())
+    # One token's worth (20ms), not two
+    assert waited < 0.035
+    assert waiting == 0
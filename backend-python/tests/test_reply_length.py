@@ -0,0 +1,65 @@
+import pytest
+
+from app.agent.reply_length import ReplyLengthController
+from app.agent.stages import SalesStage
+
+REPLY = "Totally fair question. Most teams miss a third of their calls. Ours picks up every one. Want to see it?"
+
+
+def spoken(limit, deltas):
+    """The text the turn keeps, as SalesAgent's loop consumes the deltas."""
+    parts = []
+    for delta in deltas:
+        if limit.ends(delta):
+            parts.append(limit.head)
+            break
+        parts.append(delta)
+    return "".join(parts)
+
+
+def words(text):
+    return [w if i == 0 else f" {w}" for i, w in enumerate(text.split(" "))]
+
+
+def controller(**budget):
+    return ReplyLengthController({"solution": budget}, stop=["\n\n"])
+
+
+def test_word_budget_ends_at_the_next_sentence_boundary():
+    limit = controller(max_words=6, max_seconds=None).start(SalesStage.SOLUTION)
+    assert spoken(limit, words(REPLY)) == "Totally fair question. Most teams miss a third of their calls."
+    assert limit.over == "words"
+
+
+def test_reply_within_budget_is_untouched():
+    limit = controller(max_words=100, max_seconds=60).start(SalesStage.SOLUTION)
+    assert spoken(limit, words(REPLY)) == REPLY
+    assert limit.over is None
+
+
+def test_head_keeps_the_part_of_a_delta_before_the_boundary():
+    limit = controller(max_words=2, max_seconds=None).start(SalesStage.SOLUTION)
+    assert spoken(limit, ["Totally fair", " question. Most", " teams miss."]) == "Totally fair question."
+
+
+def test_time_budget(monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr("app.agent.reply_length.time.perf_counter", lambda: next(clock))
+    limit = controller(max_words=None, max_seconds=2).start(SalesStage.SOLUTION)
+    assert spoken(limit, words(REPLY)) == "Totally fair question."
+    assert limit.over == "seconds"
+
+
+def test_request_params_and_disabled_controller():
+    assert controller(max_tokens=50).request_params(SalesStage.SOLUTION) == {"max_tokens": 50, "stop": ["\n\n"]}
+    off = ReplyLengthController(enabled=False)
+    assert off.request_params(SalesStage.SOLUTION) == {}
+    assert off.start(SalesStage.SOLUTION) is None
+    assert ReplyLengthController({"closing": {"max_words": None, "max_seconds": None}}).start(SalesStage.CLOSING) is None
+
+
+def test_rejects_unknown_budgets():
+    with pytest.raises(ValueError):
+        ReplyLengthController({"pitch": {"max_words": 10}})
+    with pytest.raises(ValueError):
+        ReplyLengthController({"solution": {"max_sentences": 2}})
@@ -0,0 +1,55 @@
+from app.agent.response_cache import ResponseCache, previous_reply
+from app.agent.stages import SalesStage
+
+STAGE = SalesStage.QUALIFICATION
+
+
+def conversation(question, answer):
+    return [
+        {"role": "system", "content": "You are an SDR."},
+        {"role": "assistant", "content": "Hi, this is Alex from Closer."},
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": question},
+        {"role": "user", "content": answer},
+    ]
+
+
+def key(cache, messages, purpose="generation"):
+    return cache.key(purpose, STAGE, "prompt", messages[-1]["content"], previous_reply(messages))
+
+
+def test_same_answer_to_different_questions_misses():
+    cache = ResponseCache()
+    demo = conversation("Shall I book you a demo for Tuesday?", "yes")
+    owner = conversation("Are you the owner of the business?", "Yes.")
+    for purpose in ("generation", "analyzer"):
+        cache.put(key(cache, demo, purpose), "Great, you're booked for Tuesday.")
+        assert cache.get(key(cache, owner, purpose)) is None
+        assert cache.get(key(cache, conversation("Shall I book you a demo for Tuesday?", "Yes!"), purpose)) is not None
+
+
+def test_paraphrase_after_the_same_reply_hits():
+    cache = ResponseCache(similarity=0.9)
+    cache.put(key(cache, conversation("Anything else?", "How much does it cost?")), "It starts at $99.")
+    assert cache.get(key(cache, conversation("Anything else?", "um how much does this cost"))) == "It starts at $99."
+
+
+def test_previous_reply():
+    assert previous_reply(conversation("Are you the owner?", "yes")) == "Are you the owner?"
+    assert previous_reply([{"role": "system", "content": "x"}, {"role": "user", "content": "hi"}]) == ""
+
+
+def test_skipped_stages_and_empty_text_have_no_key():
+    cache = ResponseCache(skip_stages=[STAGE])
+    assert cache.key("generation", STAGE, "prompt", "yes", "Are you the owner?") is None
+    assert ResponseCache().key("generation", STAGE, "prompt", "  ", "") is None
+
+
+def test_negation_blocks_a_semantic_hit():
+    cache = ResponseCache()
+    question = "Would a demo help?"
+    cache.put(key(cache, conversation(question, "I am really interested in booking a demo for my team")), "Great!")
+    assert cache.get(key(cache, conversation(question, "I am not interested in booking a demo for my team"))) is None
+    assert cache.get(key(cache, conversation(question, "I'm really interested in booking a demo for my team"))) == "Great!"
+    cache.put(key(cache, conversation(question, "I don't need a demo")), "No problem.")
+    assert cache.get(key(cache, conversation(question, "well I do not need a demo"))) == "No problem."
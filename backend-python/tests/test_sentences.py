@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.utils.sentences import SentenceChunker, chunk_text
+
+
+def segments(text, chunk_size=1, **kwargs):
+    chunker = SentenceChunker(**kwargs)
+    out = []
+    for i in range(0, len(text), chunk_size):
+        out.extend(chunker.push(text[i:i + chunk_size]))
+    tail = chunker.flush()
+    return out + ([tail] if tail else [])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1000])
+def test_splits_at_sentence_ends(chunk_size):
+    text = "Totally fair question. How many calls do you miss a week? Most teams miss a third!"
+    assert segments(text, chunk_size) == [
+        "Totally fair question.", "How many calls do you miss a week?", "Most teams miss a third!",
+    ]
+
+
+@pytest.mark.parametrize("text", [
+    "Dr. Smith runs the clinic.",
+    "We met on Mar. 3rd at the office.",
+    "Prices start at 3.5 dollars a call.",
+    "It handled 1,000 calls by 10:30 today.",
+    "Ask about the U.S. plan, e.g. the monthly one.",
+    "Talk to J. Doe about it.",
+])
+def test_abbreviations_numbers_and_initials_do_not_split(text):
+    assert segments(text, clause_chars=1000) == [text]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("No. We don't charge setup.", ["No.", "We don't charge setup."]),
+    ("Enjoy the sun. Talk soon.", ["Enjoy the sun.", "Talk soon."]),
+    ("We work with Acme etc. It works.", ["We work with Acme etc.", "It works."]),
+])
+def test_sentence_final_words_still_split(text, expected):
+    assert segments(text) == expected
+
+
+def test_long_sentences_split_at_clause_breaks():
+    text = "Our agent picks up every call in under a second, day or night, and books the meeting."
+    assert segments(text, clause_chars=40) == [
+        "Our agent picks up every call in under a second,", "day or night, and books the meeting.",
+    ]
+
+
+def test_pending_holds_the_unclosed_text():
+    chunker = SentenceChunker()
+    assert chunker.push("Sure thing. Let me") == ["Sure thing."]
+    assert chunker.pending == "Let me"
+
+
+def test_chunk_text_flushes_the_tail():
+    async def deltas():
+        for delta in ("Hi there. ", "Quick question"):
+            yield delta
+
+    async def collect():
+        return [s async for s in chunk_text(deltas(), SentenceChunker())]
+
+    assert asyncio.run(collect()) == ["Hi there.", "Quick question"]
@@ -0,0 +1,47 @@
+import pytest
+
+from app.agent.session_state import DEFAULTS, SessionState
+from app.agent.stages import SalesStage
+
+
+def test_defaults_read_like_the_dict_they_replace():
+    state = SessionState()
+    assert state.to_dict() == DEFAULTS
+    assert state["stage"] is SalesStage.GREETING
+    assert state.get("role") is None
+    assert state.get("role", "unknown") == "unknown"
+    assert "stage" in state and "role" not in state
+    with pytest.raises(KeyError):
+        state["role"]
+
+
+def test_fields_and_extra_keys():
+    state = SessionState({"role": "owner", "custom_prompt": "be brief"})
+    state["company"] = "Acme"
+    assert state["role"] == "owner"
+    assert state["custom_prompt"] == "be brief"
+    assert list(state.keys()) == [*DEFAULTS, "role", "company", "custom_prompt"]
+    assert dict(state) == state.to_dict()
+
+
+def test_none_counts_as_unset():
+    state = SessionState({"role": "owner", "custom_prompt": "x"})
+    state["role"] = None
+    state["custom_prompt"] = None
+    assert "role" not in state and "custom_prompt" not in state
+    assert state.to_dict() == DEFAULTS
+
+
+def test_stage_round_trips_as_its_string_value():
+    # Remote stores and the event log hand the stage back as a string
+    state = SessionState({"stage": "objection"})
+    assert state["stage"] is SalesStage.OBJECTION
+    state.update({"stage": SalesStage.CLOSING, "turns_in_stage": 3})
+    assert state.get("stage") is SalesStage.CLOSING
+    assert state["turns_in_stage"] == 3
+
+
+def test_no_per_instance_dict():
+    state = SessionState()
+    with pytest.raises(AttributeError):
+        state.__dict__
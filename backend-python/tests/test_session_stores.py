@@ -0,0 +1,100 @@
+"""The same contract over every SessionStore backend; Redis runs against fakeredis."""
+import asyncio
+import threading
+
+import fakeredis
+import pytest
+
+from app.agent.memory import SessionMemory
+from app.agent.session_state import SessionState
+from app.agent.stages import SalesStage
+from app.storage.in_memory import InMemorySessionStore
+from app.storage.redis_store import RedisSessionStore
+from app.storage.sqlite_store import SQLiteSessionStore
+
+
+@pytest.fixture(params=["memory", "memory+state", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        store = InMemorySessionStore()
+    elif request.param == "memory+state":
+        store = InMemorySessionStore(metadata_factory=SessionState)
+    elif request.param == "sqlite":
+        store = SQLiteSessionStore(path=str(tmp_path / "sessions.db"))
+    else:
+        store = RedisSessionStore(client=fakeredis.FakeRedis())
+    yield store
+    store.close()
+
+
+def test_history_and_metadata_round_trip(store):
+    store.append_message("a", {"role": "user", "content": "hi"})
+    store.append_message("a", {"role": "assistant", "content": "hello"})
+    store.set_metadata("a", {"role": "owner", "pain_points": ["missed calls"]})
+    store.set_metadata("a", {"company": "Acme"})
+    history, metadata = store.load("a")
+    assert history == store.get_history("a") == [
+        {"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"},
+    ]
+    assert metadata["role"] == "owner"
+    assert metadata["company"] == "Acme"
+    assert metadata["pain_points"] == ["missed calls"]
+    assert store.get_metadata("a")["company"] == "Acme"
+
+
+def test_increment(store):
+    assert store.increment("a", "turns_in_stage") == 1
+    assert store.increment("a", "turns_in_stage", 2) == 3
+    assert int(store.get_metadata("a")["turns_in_stage"]) == 3
+
+
+def test_sessions_are_isolated_and_deletable(store):
+    assert not store.exists("a")
+    store.append_message("a", {"role": "user", "content": "hi"})
+    store.set_metadata("a", {"role": "owner"})
+    store.set_metadata("b", {"stage": SalesStage.PROBLEM.value})
+    assert store.exists("a") and store.exists("b")
+    assert store.get_history("b") == []
+    if store.count() is not None:
+        assert store.count() == 2
+    store.delete("a")
+    assert not store.exists("a")
+    assert store.exists("b")
+
+
+def test_redis_keys_expire_when_idle():
+    client = fakeredis.FakeRedis()
+    store = RedisSessionStore(client=client, idle_ttl=60, prefix="t:")
+    store.append_message("a", {"role": "user", "content": "hi"})
+    store.set_metadata("a", {"role": "owner"})
+    assert 0 < client.ttl("t:a:history") <= 60
+    assert 0 < client.ttl("t:a:meta") <= 60
+
+
+def test_sqlite_rolls_back_a_failed_append(tmp_path):
+    store = SQLiteSessionStore(path=str(tmp_path / "sessions.db"))
+    with pytest.raises(KeyError):
+        store.append_message("a", {"role": "user"})
+    assert not store.exists("a")
+    # The connection isn't left inside the failed transaction
+    store.append_message("a", {"role": "user", "content": "hi"})
+    assert store.get_history("a") == [{"role": "user", "content": "hi"}]
+    store.close()
+
+
+@pytest.mark.parametrize("blocking", [False, True])
+def test_offload_runs_blocking_stores_off_the_loop(blocking):
+    store = RedisSessionStore(client=fakeredis.FakeRedis()) if blocking else InMemorySessionStore()
+    memory = SessionMemory(store=store)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        # Submitted in order, run in order
+        first = memory.offload(memory.add_message, "a", "user", "hi")
+        history = memory.offload(memory.get_history, "a")
+        await first
+        assert [m["content"] for m in await history] == ["hi"]
+        return loop_thread, await memory.offload(threading.get_ident)
+
+    loop_thread, store_thread = asyncio.run(run())
+    assert (store_thread != loop_thread) == blocking
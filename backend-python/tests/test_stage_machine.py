@@ -0,0 +1,117 @@
+"""
+The compiled SDR flow must decide every turn exactly as the hardcoded
+advance logic it replaced (SalesAgent.advance_logic / _advance_stage before
+the stage machine), which is reproduced here as the reference.
+"""
+import itertools
+
+import pytest
+
+from app.agent.flows import FLOWS
+from app.agent.schemas import ANALYZER_INTENTS
+from app.agent.stage_machine import FlowError, StageMachine
+from app.agent.stages import SalesStage
+
+S = SalesStage
+
+# ---------- The rules before the stage machine ----------
+OLD_EXIT_CONDITIONS = {
+    S.GREETING: [],
+    S.QUALIFICATION: ["role", "company"],
+    S.PROBLEM: ["pain_points"],
+    S.SOLUTION: ["value_accepted"],
+    S.OBJECTION: ["concerns_addressed"],
+    S.CLOSING: ["meeting_locked"],
+}
+OLD_ALLOWED_ADVANCE_INTENTS = {
+    S.GREETING: {"greeting", "information_request", "affirmation", "pricing_query", "sharing_pain", "other"},
+    S.QUALIFICATION: {"providing_info", "affirmation"},
+    S.PROBLEM: {"sharing_pain", "affirmation"},
+    S.SOLUTION: {"interest", "affirmation"},
+    S.OBJECTION: {"acceptance", "affirmation"},
+}
+OLD_TRANSITIONS = {
+    S.GREETING: [S.QUALIFICATION],
+    S.QUALIFICATION: [S.PROBLEM],
+    S.PROBLEM: [S.SOLUTION],
+    S.SOLUTION: [S.OBJECTION],
+    S.OBJECTION: [S.CLOSING],
+    S.CLOSING: [],
+}
+OLD_JUMPS = {"pricing_query": S.QUALIFICATION, "sharing_pain": S.PROBLEM, "affirmation": S.QUALIFICATION}
+
+
+def old_step(stage, analysis, meta):
+    """(stage to move to or None, lock the session)"""
+    if stage == S.CLOSING:
+        return None, bool(meta.get("meeting_locked"))
+
+    intent = analysis.get("intent")
+    should_advance = analysis.get("recommended_action") == "advance"
+    if should_advance and intent not in OLD_ALLOWED_ADVANCE_INTENTS.get(stage, set()):
+        should_advance = False
+    for field in OLD_EXIT_CONDITIONS.get(stage, []):
+        if not meta.get(field):
+            should_advance = False
+            break
+
+    target = OLD_JUMPS.get(intent) if stage == S.GREETING else None
+    if not (should_advance or target):
+        return None, False
+    if target:
+        return target, False
+    allowed = OLD_TRANSITIONS.get(stage, [])
+    return (allowed[0] if allowed else None), False
+
+
+def old_nudge(stage, turns):
+    return 2 < turns <= 4 and stage != S.CLOSING
+
+
+# ---------- Equivalence ----------
+GUARDED = sorted({field for fields in OLD_EXIT_CONDITIONS.values() for field in fields})
+# Every combination of the guarded fields being set or not
+METAS = [
+    {field: "yes" for field, present in zip(GUARDED, mask) if present}
+    for mask in itertools.product((False, True), repeat=len(GUARDED))
+]
+
+
+@pytest.fixture(scope="module")
+def machine():
+    return StageMachine(FLOWS)
+
+
+@pytest.mark.parametrize("intent", [*ANALYZER_INTENTS, None])
+@pytest.mark.parametrize("stage", list(SalesStage), ids=lambda s: s.value)
+def test_sdr_flow_matches_old_rules(machine, stage, intent):
+    for action, meta in itertools.product(("advance", "stay"), METAS):
+        analysis = {"intent": intent, "recommended_action": action}
+        step = machine.step("sdr", stage, analysis, meta)
+        assert (step.to, step.lock) == old_step(stage, analysis, meta), (action, meta, step.reason)
+
+
+@pytest.mark.parametrize("stage", list(SalesStage), ids=lambda s: s.value)
+def test_sdr_nudges_match_old_rule(machine, stage):
+    for turns in range(8):
+        assert bool(machine.nudge("sdr", stage, turns)) == old_nudge(stage, turns), turns
+
+
+def test_unknown_mode_uses_default_flow(machine):
+    analysis = {"intent": "sharing_pain", "recommended_action": "stay"}
+    assert machine.step("no-such-mode", S.GREETING, analysis, {}).to == S.PROBLEM
+    assert machine.step(None, S.GREETING, analysis, {}).to == S.PROBLEM
+    assert machine.step("SDR", S.GREETING, analysis, {}).to == S.PROBLEM
+
+
+def test_support_flow_skips_qualification(machine):
+    analysis = {"intent": "affirmation", "recommended_action": "advance"}
+    assert machine.step("support", S.GREETING, analysis, {}).to == S.PROBLEM
+    # Not a stage of this flow
+    assert machine.step("support", S.QUALIFICATION, analysis, {"role": "x", "company": "y"}).to is None
+
+
+def test_rejects_jump_to_undeclared_stage():
+    flow = {"initial": "greeting", "stages": {"greeting": {"jumps": {"objection": "closing"}}}}
+    with pytest.raises(FlowError):
+        StageMachine({"sdr": flow})